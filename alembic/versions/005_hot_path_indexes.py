@@ -0,0 +1,65 @@
+"""hot path indexes
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _index_exists(conn, table: str, index: str) -> bool:
+    """Проверка наличия индекса (SQLite и PostgreSQL)."""
+    if conn.dialect.name == "sqlite":
+        r = conn.execute(sa.text(f"SELECT name FROM sqlite_master WHERE type='index' AND name='{index}'"))
+        return r.fetchone() is not None
+    from sqlalchemy import inspect
+    return index in [i["name"] for i in inspect(conn).get_indexes(table)]
+
+
+# (имя, таблица, колонки, условие частичного индекса)
+_INDEXES = [
+    # Лента исполнителя: status = 'open' AND city = ? ORDER BY id DESC (бот и Mini App)
+    ("ix_tenders_status_city_id", "tenders", ["status", "city", "id"], None),
+    # Частичный индекс только по открытым тендерам: фильтр по городу и категории
+    ("ix_tenders_open_city_category_id", "tenders", ["city", "category", "id"], "status = 'open'"),
+    # Проверка «уже откликался» и выбор остальных откликов по тендеру
+    ("ix_tender_applications_tender_user", "tender_applications", ["tender_id", "user_id"], None),
+    # «Мои отклики»: user_id = ? ORDER BY id DESC
+    ("ix_tender_applications_user_id", "tender_applications", ["user_id", "id"], None),
+    # Агрегаты рейтинга по исполнителю
+    ("ix_reviews_to_user_id", "reviews", ["to_user_id"], None),
+    # Проверка «отзыв уже оставлен» по отклику
+    ("ix_reviews_application_id", "reviews", ["application_id"], None),
+    # Рассылка при публикации: status = 'active' AND city = ?
+    ("ix_users_status_city", "users", ["status", "city"], None),
+    # Последнее сообщение тикета и история чата
+    ("ix_support_messages_ticket_created", "support_messages", ["ticket_id", "created_at"], None),
+    # Открытый тикет пользователя и счётчик новых тикетов
+    ("ix_support_tickets_user_status", "support_tickets", ["user_id", "status"], None),
+    ("ix_support_tickets_status", "support_tickets", ["status"], None),
+]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    for name, table, columns, where in _INDEXES:
+        if _index_exists(conn, table, name):
+            continue
+        kwargs = {}
+        if where is not None:
+            kwargs["postgresql_where"] = sa.text(where)
+            kwargs["sqlite_where"] = sa.text(where)
+        op.create_index(name, table, columns, **kwargs)
+
+
+def downgrade() -> None:
+    for name, table, _columns, _where in reversed(_INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,75 @@
+"""notification outbox and batches
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _table_exists(conn, name: str) -> bool:
+    """Проверка наличия таблицы (SQLite и PostgreSQL)."""
+    if conn.dialect.name == "sqlite":
+        r = conn.execute(sa.text(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{name}'"))
+        return r.fetchone() is not None
+    from sqlalchemy import inspect
+    return name in inspect(conn).get_table_names()
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if not _table_exists(conn, "notification_batches"):
+        op.create_table(
+            "notification_batches",
+            sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column("kind", sa.String(32), nullable=False),
+            sa.Column("tender_id", sa.Integer(), nullable=True),
+            sa.Column("total", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("sent", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("failed", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("report_chat_id", sa.BigInteger(), nullable=True),
+            sa.Column("report_message_id", sa.Integer(), nullable=True),
+            sa.Column("report_text", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("finished_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["tender_id"], ["tenders.id"], ondelete="SET NULL"),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    if not _table_exists(conn, "notification_outbox"):
+        op.create_table(
+            "notification_outbox",
+            sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column("batch_id", sa.Integer(), nullable=True),
+            sa.Column("chat_id", sa.BigInteger(), nullable=False),
+            sa.Column("text", sa.Text(), nullable=False),
+            sa.Column("reply_markup", sa.JSON(), nullable=True),
+            sa.Column("status", sa.String(16), nullable=False, server_default="pending"),
+            sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("next_attempt_at", sa.DateTime(), nullable=True),
+            sa.Column("last_error", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("sent_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["batch_id"], ["notification_batches.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index(
+            "ix_notification_outbox_status_next_attempt",
+            "notification_outbox",
+            ["status", "next_attempt_at", "id"],
+        )
+        op.create_index("ix_notification_outbox_batch_id", "notification_outbox", ["batch_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_notification_outbox_batch_id", table_name="notification_outbox")
+    op.drop_index("ix_notification_outbox_status_next_attempt", table_name="notification_outbox")
+    op.drop_table("notification_outbox")
+    op.drop_table("notification_batches")
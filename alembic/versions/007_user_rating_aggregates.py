@@ -0,0 +1,43 @@
+"""user rating aggregates
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _column_exists(conn, table: str, column: str) -> bool:
+    if conn.dialect.name == "sqlite":
+        r = conn.execute(sa.text(f"PRAGMA table_info({table})"))
+        return any(row[1] == column for row in r)
+    from sqlalchemy import inspect
+    return column in [c["name"] for c in inspect(conn).get_columns(table)]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if not _column_exists(conn, "users", "rating_sum"):
+        with op.batch_alter_table("users") as batch_op:
+            batch_op.add_column(sa.Column("rating_sum", sa.Integer(), nullable=False, server_default="0"))
+            batch_op.add_column(sa.Column("rating_count", sa.Integer(), nullable=False, server_default="0"))
+    # Заполняем агрегаты по уже существующим отзывам (отзывы на удалённых пользователей не учитываются)
+    conn.execute(sa.text(
+        "UPDATE users SET "
+        "rating_sum = COALESCE((SELECT SUM(r.rating) FROM reviews r WHERE r.to_user_id = users.id), 0), "
+        "rating_count = (SELECT COUNT(r.id) FROM reviews r WHERE r.to_user_id = users.id)"
+    ))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("rating_count")
+        batch_op.drop_column("rating_sum")
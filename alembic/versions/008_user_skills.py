@@ -0,0 +1,59 @@
+"""user_skills table
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-16
+
+"""
+import json
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _table_exists(conn, name: str) -> bool:
+    """Проверка наличия таблицы (SQLite и PostgreSQL)."""
+    if conn.dialect.name == "sqlite":
+        r = conn.execute(sa.text(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{name}'"))
+        return r.fetchone() is not None
+    from sqlalchemy import inspect
+    return inspect(conn).has_table(name)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if _table_exists(conn, "user_skills"):
+        return
+    user_skills = op.create_table(
+        "user_skills",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("skill", sa.String(128), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "skill"),
+    )
+    op.create_index("ix_user_skills_skill_user_id", "user_skills", ["skill", "user_id"])
+
+    # Переносим навыки из JSON-колонки users.skills
+    rows = []
+    for user_id, skills in conn.execute(sa.text("SELECT id, skills FROM users WHERE skills IS NOT NULL")):
+        if isinstance(skills, str):
+            try:
+                skills = json.loads(skills)
+            except ValueError:
+                continue
+        if not isinstance(skills, list):
+            continue
+        for skill in dict.fromkeys(s[:128] for s in skills if isinstance(s, str) and s):
+            rows.append({"user_id": user_id, "skill": skill})
+    if rows:
+        op.bulk_insert(user_skills, rows)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_skills_skill_user_id", table_name="user_skills")
+    op.drop_table("user_skills")
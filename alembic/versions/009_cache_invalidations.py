@@ -0,0 +1,43 @@
+"""cache_invalidations table (cache invalidation bus for SQLite)
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _table_exists(conn, name: str) -> bool:
+    """Проверка наличия таблицы (SQLite и PostgreSQL)."""
+    if conn.dialect.name == "sqlite":
+        r = conn.execute(sa.text(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{name}'"))
+        return r.fetchone() is not None
+    from sqlalchemy import inspect
+    return inspect(conn).has_table(name)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if _table_exists(conn, "cache_invalidations"):
+        return
+    op.create_table(
+        "cache_invalidations",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("cache_key", sa.String(255), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_cache_invalidations_created_at", "cache_invalidations", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_cache_invalidations_created_at", table_name="cache_invalidations")
+    op.drop_table("cache_invalidations")
@@ -0,0 +1,35 @@
+"""tender_applications.created_at index (dashboard statistics)
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _index_exists(conn, table: str, index: str) -> bool:
+    """Проверка наличия индекса (SQLite и PostgreSQL)."""
+    if conn.dialect.name == "sqlite":
+        r = conn.execute(sa.text(f"SELECT name FROM sqlite_master WHERE type='index' AND name='{index}'"))
+        return r.fetchone() is not None
+    from sqlalchemy import inspect
+    return index in [i["name"] for i in inspect(conn).get_indexes(table)]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    # Отклики за сегодня / за неделю: created_at >= ? — без индекса это полный просмотр таблицы
+    if not _index_exists(conn, "tender_applications", "ix_tender_applications_created_at"):
+        op.create_index("ix_tender_applications_created_at", "tender_applications", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tender_applications_created_at", table_name="tender_applications")
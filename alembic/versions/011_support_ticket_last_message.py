@@ -0,0 +1,55 @@
+"""support_tickets: last message preview and unread counter
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "011"
+down_revision: Union[str, None] = "010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _column_exists(conn, table: str, column: str) -> bool:
+    if conn.dialect.name == "sqlite":
+        r = conn.execute(sa.text(f"PRAGMA table_info({table})"))
+        return any(row[1] == column for row in r)
+    from sqlalchemy import inspect
+    return column in [c["name"] for c in inspect(conn).get_columns(table)]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if not _column_exists(conn, "support_tickets", "last_message_text"):
+        with op.batch_alter_table("support_tickets") as batch_op:
+            batch_op.add_column(sa.Column("last_message_text", sa.String(256), nullable=True))
+            batch_op.add_column(sa.Column("last_message_at", sa.DateTime(), nullable=True))
+            batch_op.add_column(sa.Column("last_message_author", sa.String(16), nullable=True))
+            batch_op.add_column(sa.Column("unread_count", sa.Integer(), nullable=False, server_default="0"))
+    # Заполняем по существующей переписке: последнее сообщение тикета и сообщения пользователя после последнего ответа админа
+    last_msg = (
+        "(SELECT {col} FROM support_messages m WHERE m.ticket_id = support_tickets.id "
+        "ORDER BY m.created_at DESC, m.id DESC LIMIT 1)"
+    )
+    conn.execute(sa.text(
+        "UPDATE support_tickets SET "
+        f"last_message_text = {last_msg.format(col='SUBSTR(m.text, 1, 256)')}, "
+        f"last_message_at = {last_msg.format(col='m.created_at')}, "
+        f"last_message_author = {last_msg.format(col='m.author')}, "
+        "unread_count = (SELECT COUNT(m.id) FROM support_messages m "
+        "WHERE m.ticket_id = support_tickets.id AND m.author = 'user' AND m.id > COALESCE("
+        "(SELECT MAX(a.id) FROM support_messages a WHERE a.ticket_id = support_tickets.id AND a.author = 'admin'), 0))"
+    ))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("support_tickets") as batch_op:
+        batch_op.drop_column("unread_count")
+        batch_op.drop_column("last_message_author")
+        batch_op.drop_column("last_message_at")
+        batch_op.drop_column("last_message_text")
@@ -0,0 +1,38 @@
+"""tenders, tender_applications: updated_at (версия для ETag в API Mini App)
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "012"
+down_revision: Union[str, None] = "011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _column_exists(conn, table: str, column: str) -> bool:
+    if conn.dialect.name == "sqlite":
+        r = conn.execute(sa.text(f"PRAGMA table_info({table})"))
+        return any(row[1] == column for row in r)
+    from sqlalchemy import inspect
+    return column in [c["name"] for c in inspect(conn).get_columns(table)]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    for table in ("tenders", "tender_applications"):
+        if not _column_exists(conn, table, "updated_at"):
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.add_column(sa.Column("updated_at", sa.DateTime(), nullable=True))
+            conn.execute(sa.text(f"UPDATE {table} SET updated_at = created_at WHERE updated_at IS NULL"))
+
+
+def downgrade() -> None:
+    for table in ("tender_applications", "tenders"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("updated_at")
@@ -0,0 +1,90 @@
+"""tenders: full-text search (PostgreSQL tsvector + GIN, SQLite FTS5)
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "013"
+down_revision: Union[str, None] = "012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Русская морфология: заголовок весомее описания
+_PG_SEARCH_VECTOR = (
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B')"
+)
+
+
+def _column_exists(conn, table: str, column: str) -> bool:
+    if conn.dialect.name == "sqlite":
+        r = conn.execute(sa.text(f"PRAGMA table_info({table})"))
+        return any(row[1] == column for row in r)
+    from sqlalchemy import inspect
+    return column in [c["name"] for c in inspect(conn).get_columns(table)]
+
+
+def _table_exists(conn, name: str) -> bool:
+    if conn.dialect.name == "sqlite":
+        r = conn.execute(sa.text(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{name}'"))
+        return r.fetchone() is not None
+    from sqlalchemy import inspect
+    return name in inspect(conn).get_table_names()
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name == "postgresql":
+        # Генерируемая колонка пересчитывается самим PostgreSQL при INSERT/UPDATE
+        if not _column_exists(conn, "tenders", "search_vector"):
+            op.execute(
+                f"ALTER TABLE tenders ADD COLUMN search_vector tsvector "
+                f"GENERATED ALWAYS AS ({_PG_SEARCH_VECTOR}) STORED"
+            )
+        op.execute("CREATE INDEX IF NOT EXISTS ix_tenders_search_vector ON tenders USING GIN (search_vector)")
+        return
+
+    # SQLite: FTS5 поверх tenders (external content), синхронизация триггерами.
+    # Стеммера для русского в SQLite нет — поиск идёт по префиксам слов (см. TenderSearchService).
+    # Внимание: пересоздание таблицы tenders (batch-миграция с recreate) удаляет триггеры — их нужно вернуть.
+    if not _table_exists(conn, "tenders_fts"):
+        op.execute(
+            "CREATE VIRTUAL TABLE tenders_fts USING fts5("
+            "title, description, content='tenders', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute("INSERT INTO tenders_fts(tenders_fts) VALUES ('rebuild')")
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS tenders_fts_ai AFTER INSERT ON tenders BEGIN "
+        "INSERT INTO tenders_fts(rowid, title, description) VALUES (new.id, new.title, new.description); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS tenders_fts_ad AFTER DELETE ON tenders BEGIN "
+        "INSERT INTO tenders_fts(tenders_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS tenders_fts_au AFTER UPDATE OF title, description ON tenders BEGIN "
+        "INSERT INTO tenders_fts(tenders_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); "
+        "INSERT INTO tenders_fts(rowid, title, description) VALUES (new.id, new.title, new.description); "
+        "END"
+    )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_tenders_search_vector")
+        op.execute("ALTER TABLE tenders DROP COLUMN IF EXISTS search_vector")
+        return
+    for trigger in ("tenders_fts_ai", "tenders_fts_ad", "tenders_fts_au"):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS tenders_fts")
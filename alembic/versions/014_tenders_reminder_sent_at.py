@@ -0,0 +1,52 @@
+"""tenders.reminder_sent_at, index for the deadline scheduler
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "014"
+down_revision: Union[str, None] = "013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _column_exists(conn, table: str, column: str) -> bool:
+    if conn.dialect.name == "sqlite":
+        r = conn.execute(sa.text(f"PRAGMA table_info({table})"))
+        return any(row[1] == column for row in r)
+    from sqlalchemy import inspect
+    return column in [c["name"] for c in inspect(conn).get_columns(table)]
+
+
+def _index_exists(conn, table: str, index: str) -> bool:
+    """Проверка наличия индекса (SQLite и PostgreSQL)."""
+    if conn.dialect.name == "sqlite":
+        r = conn.execute(sa.text(f"SELECT name FROM sqlite_master WHERE type='index' AND name='{index}'"))
+        return r.fetchone() is not None
+    from sqlalchemy import inspect
+    return index in [i["name"] for i in inspect(conn).get_indexes(table)]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    # ADD COLUMN без пересоздания таблицы: триггеры FTS5 (миграция 013) сохраняются
+    if not _column_exists(conn, "tenders", "reminder_sent_at"):
+        op.add_column("tenders", sa.Column("reminder_sent_at", sa.DateTime(), nullable=True))
+    # Планировщик выбирает открытые тендеры со сроком до горизонта
+    if not _index_exists(conn, "tenders", "ix_tenders_open_deadline"):
+        op.create_index(
+            "ix_tenders_open_deadline", "tenders", ["deadline"],
+            postgresql_where=sa.text("status = 'open' AND deadline IS NOT NULL"),
+            sqlite_where=sa.text("status = 'open' AND deadline IS NOT NULL"),
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tenders_open_deadline", table_name="tenders")
+    with op.batch_alter_table("tenders") as batch_op:
+        batch_op.drop_column("reminder_sent_at")
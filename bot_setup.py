@@ -0,0 +1,118 @@
+# bot_setup.py — сборка бота и диспетчера (общая для polling и webhook)
+import hashlib
+import logging
+
+from aiogram import Bot, Dispatcher
+from aiogram.client.default import DefaultBotProperties
+from aiogram.enums import ParseMode
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def check_token() -> None:
+    """Проверка токена перед запуском: не заглушка и формат числа:строка."""
+    t = (settings.BOT_TOKEN or "").strip()
+    if not t or "ЗАМЕНИТЕ" in t or "токен" in t.lower() or "token" in t.lower():
+        raise SystemExit(
+            "В файле .env указан неверный BOT_TOKEN.\n"
+            "Получите токен у @BotFather и впишите в .env: BOT_TOKEN=ваш_токен"
+        )
+    if ":" not in t or len(t) < 20:
+        raise SystemExit(
+            "BOT_TOKEN в .env не похож на токен Telegram (формат: 123456789:ABC...).\n"
+            "Проверьте .env или получите новый токен в @BotFather (/newbot или /revoke)."
+        )
+
+
+def create_bot() -> Bot:
+    return Bot(
+        token=settings.BOT_TOKEN,
+        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+    )
+
+
+def create_dispatcher() -> Dispatcher:
+    """Диспетчер с middleware и роутерами (импорты внутри — после миграций)."""
+    from handlers import router
+    from middlewares.db import DbSessionMiddleware
+    from middlewares.fsm_cancel import FSMCancelMiddleware
+    from middlewares.menu_refresh import MenuRefreshMiddleware
+    from middlewares.user_context import UserContextMiddleware
+    from middlewares.error_handler import ErrorHandlerMiddleware
+    from middlewares.rate_limiter import RateLimiterMiddleware
+    from utils.ui_manager import FSMDeleteUserMessageMiddleware
+    from utils.state_backend import close_state_backend, create_fsm_storage
+
+    # FSM в общем хранилище: шаги регистрации не теряются при нескольких процессах бота
+    dp = Dispatcher(storage=create_fsm_storage())
+    dp.shutdown.register(close_state_backend)
+
+    # Порядок middleware важен!
+    # 1. ErrorHandler - должен быть первым для перехвата всех ошибок
+    dp.message.middleware(ErrorHandlerMiddleware())
+    dp.callback_query.middleware(ErrorHandlerMiddleware())
+
+    # 2. RateLimiter - ограничение частоты запросов (один экземпляр: общий лимит для сообщений и callback'ов)
+    rate_limiter = RateLimiterMiddleware()
+    dp.message.middleware(rate_limiter)
+    dp.callback_query.middleware(rate_limiter)
+
+    # 3. FSMCancel - отмена FSM при нажатии кнопок меню
+    dp.message.middleware(FSMCancelMiddleware())
+    dp.callback_query.middleware(FSMCancelMiddleware())
+
+    # 4. DbSession - сессии БД (должен быть перед middleware, которые используют БД)
+    dp.message.middleware(DbSessionMiddleware())
+    dp.callback_query.middleware(DbSessionMiddleware())
+
+    # 5. UserContext - пользователь БД один раз на обновление (data['db_user'], использует session)
+    dp.message.middleware(UserContextMiddleware())
+    dp.callback_query.middleware(UserContextMiddleware())
+
+    # 6. MenuRefresh - автоматическое обновление меню (использует session и db_user)
+    dp.message.middleware(MenuRefreshMiddleware())
+    dp.callback_query.middleware(MenuRefreshMiddleware())
+
+    # 7. FSMDeleteUserMessage - удаление сообщений пользователя в FSM
+    dp.message.middleware(FSMDeleteUserMessageMiddleware())
+
+    dp.include_router(router)
+    return dp
+
+
+class BotServices:
+    """Фоновые задачи процесса бота (рассылка из outbox, слушатель инвалидации кэша, сроки тендеров)."""
+
+    def __init__(self, bot: Bot):
+        from services.deadline_scheduler import DeadlineScheduler
+        from services.outbox import OutboxWorker
+        self._outbox_worker = OutboxWorker(bot)
+        self._deadline_scheduler = DeadlineScheduler()
+
+    def start(self) -> None:
+        from services.cache_bus import start_cache_listener
+        self._outbox_worker.start()
+        # Изменения пользователей из веб-панели и Mini App сбрасывают кэш бота
+        start_cache_listener()
+        # Изменения сроков приходят событиями шины — после запуска слушателя
+        self._deadline_scheduler.start()
+
+    async def stop(self) -> None:
+        from services.cache_bus import stop_cache_listener
+        await self._deadline_scheduler.stop()
+        await self._outbox_worker.stop()
+        await stop_cache_listener()
+
+
+def get_webhook_url() -> str:
+    base = (settings.WEBHOOK_BASE_URL or settings.MINIAPP_BASE_URL).rstrip("/")
+    return base + settings.WEBHOOK_PATH
+
+
+def get_webhook_secret() -> str:
+    """Секрет для X-Telegram-Bot-Api-Secret-Token; без явной настройки — производный от токена (одинаков во всех процессах)."""
+    if settings.WEBHOOK_SECRET:
+        return settings.WEBHOOK_SECRET
+    return hashlib.sha256(f"webhook:{settings.BOT_TOKEN}".encode()).hexdigest()
@@ -1,5 +1,6 @@
 # config.py — настройки приложения через pydantic-settings
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, field_validator
@@ -36,6 +37,36 @@ class Settings(BaseSettings):
             )
         return int(v)
 
+    # Режим получения обновлений: polling (long-poll) или webhook
+    BOT_MODE: Literal["polling", "webhook"] = Field(
+        default="polling",
+        description="polling — бот сам опрашивает Telegram; webhook — Telegram присылает обновления на WEBHOOK_PATH",
+    )
+    WEBHOOK_BASE_URL: str = Field(
+        default="",
+        description="Публичный HTTPS URL для webhook (пусто — MINIAPP_BASE_URL)",
+    )
+    WEBHOOK_PATH: str = Field(
+        default="/telegram/webhook",
+        description="Путь приёма обновлений Telegram",
+    )
+    WEBHOOK_SECRET: str = Field(
+        default="",
+        description="Секрет заголовка X-Telegram-Bot-Api-Secret-Token (пусто — вычисляется из BOT_TOKEN)",
+    )
+    WEBHOOK_IN_WEB: bool = Field(
+        default=True,
+        description="Принимать webhook в процессе веб-приложения (web.main:app); False — отдельный сервер бота",
+    )
+    WEBHOOK_HOST: str = Field(default="0.0.0.0", description="Хост отдельного webhook-сервера бота")
+    WEBHOOK_PORT: int = Field(default=8081, description="Порт отдельного webhook-сервера бота")
+    WEBHOOK_MAX_CONCURRENCY: int = Field(
+        default=32,
+        ge=1,
+        le=1000,
+        description="Сколько обновлений обрабатывается одновременно в режиме webhook",
+    )
+
     # PostgreSQL
     DATABASE_URL: str = Field(
         ...,
@@ -59,6 +90,17 @@ class Settings(BaseSettings):
         default="http://localhost:8000",
         description="Публичный URL веб-сервера (для Mini App нужен HTTPS в продакшене)",
     )
+    MINIAPP_INIT_DATA_CACHE_TTL: int = Field(
+        default=600,
+        ge=0,
+        description="Сколько секунд помнить уже проверенный initData (повторная проверка подписи не нужна)",
+    )
+    MINIAPP_SESSION_TTL: int = Field(
+        default=300,
+        ge=30,
+        le=86400,
+        description="Срок сессионного токена Mini App (X-Miniapp-Session); статус из админки применяется не позже",
+    )
     
     # Database Pool Settings
     DB_POOL_SIZE: int = Field(
@@ -85,7 +127,7 @@ class Settings(BaseSettings):
     
     # Cache Settings
     CACHE_TTL_USER_PROFILE: int = Field(
-        default=300,
+        default=3600,
         ge=60,
         description="TTL кэша профиля пользователя в секундах",
     )
@@ -94,7 +136,89 @@ class Settings(BaseSettings):
         ge=10,
         description="TTL кэша меню в секундах",
     )
+    PAGE_SIZE: int = Field(
+        default=50,
+        ge=5,
+        le=500,
+        description="Записей на странице в списках веб-панели",
+    )
+    PAGINATION_COUNT_TTL: int = Field(
+        default=60,
+        ge=1,
+        description="Сколько секунд кэшировать общее количество записей в списках веб-панели",
+    )
+    STATS_CACHE_TTL: int = Field(
+        default=30,
+        ge=1,
+        description="TTL снимка статистики (дашборд, /stats); между пересчётами счётчики обновляются при изменениях",
+    )
+    SSE_MAX_CONNECTIONS: int = Field(
+        default=1000,
+        ge=1,
+        description="Максимум SSE-соединений (живые обновления) на процесс; сверх — закрываются самые неактивные",
+    )
+    SSE_QUEUE_SIZE: int = Field(
+        default=100,
+        ge=1,
+        description="Сколько недоставленных событий держать на соединение; при переполнении клиент переподключается",
+    )
+    SSE_PING_INTERVAL: float = Field(
+        default=20.0,
+        gt=0,
+        description="Интервал keep-alive комментариев в SSE-потоке, секунд",
+    )
+    DEADLINE_REMINDER_BEFORE: int = Field(
+        default=86400,
+        ge=0,
+        description="За сколько секунд до срока тендера напомнить создателю (0 — без напоминаний)",
+    )
+    DEADLINE_RESYNC_INTERVAL: int = Field(
+        default=600,
+        ge=30,
+        description="Как часто планировщик сроков перечитывает открытые тендеры из БД, секунд",
+    )
+    DEADLINE_BATCH_SIZE: int = Field(
+        default=500,
+        ge=1,
+        description="Сколько тендеров закрывать (или напоминать) одним запросом",
+    )
+    CACHE_MAX_ENTRIES: int = Field(
+        default=50_000,
+        ge=100,
+        description="Максимум записей в in-memory кэше (сверх — вытесняются давно не использованные)",
+    )
+    CACHE_MAX_BYTES: int = Field(
+        default=64 * 1024 * 1024,
+        ge=0,
+        description="Примерный предел памяти in-memory кэша в байтах (0 — без ограничения)",
+    )
+    CACHE_BUS_POLL_INTERVAL: float = Field(
+        default=1.0,
+        gt=0,
+        description="Интервал опроса таблицы инвалидации кэша (SQLite) и переподключения слушателя, сек",
+    )
+    CACHE_BUS_RETENTION: int = Field(
+        default=3600,
+        ge=60,
+        description="Сколько секунд хранить события инвалидации в таблице cache_invalidations (SQLite)",
+    )
+    CACHE_SWEEP_INTERVAL: float = Field(
+        default=60.0,
+        gt=0,
+        description="Как часто (сек) удалять из кэша просроченные записи, которые больше не читаются",
+    )
     
+    # Общее состояние процессов бота (FSM, rate limiting, история сообщений чата)
+    STATE_BACKEND_URL: str = Field(
+        default="",
+        description="Пусто или memory:// — в памяти процесса; redis://host:6379/0 — общий Redis для нескольких процессов",
+    )
+    FSM_STATE_TTL: int = Field(
+        default=86400,
+        ge=60,
+        description="Сколько секунд хранить незавершённое состояние FSM в Redis",
+    )
+
     # Rate Limiting
     RATE_LIMIT_REQUESTS: int = Field(
         default=10,
@@ -107,6 +231,86 @@ class Settings(BaseSettings):
         description="Период rate limiting в секундах",
     )
 
+    # Очередь исходящих уведомлений (outbox)
+    OUTBOX_GLOBAL_RATE: float = Field(
+        default=25.0,
+        gt=0,
+        le=30,
+        description="Сообщений в секунду на весь бот (лимит Telegram ~30/с, берём с запасом)",
+    )
+    OUTBOX_PER_CHAT_INTERVAL: float = Field(
+        default=1.0,
+        ge=0,
+        description="Минимальный интервал между сообщениями в один чат, секунд",
+    )
+    OUTBOX_CONCURRENCY: int = Field(
+        default=20,
+        ge=1,
+        le=100,
+        description="Сколько сообщений отправляется параллельно",
+    )
+    OUTBOX_BATCH_SIZE: int = Field(
+        default=100,
+        ge=1,
+        le=1000,
+        description="Сколько записей outbox воркер забирает за один проход",
+    )
+    OUTBOX_MAX_ATTEMPTS: int = Field(
+        default=5,
+        ge=1,
+        description="Число попыток отправки до пометки сообщения как failed",
+    )
+    OUTBOX_POLL_INTERVAL: float = Field(
+        default=2.0,
+        gt=0,
+        description="Период опроса outbox, когда очередь пуста, секунд",
+    )
+    OUTBOX_PROGRESS_INTERVAL: float = Field(
+        default=3.0,
+        ge=1,
+        description="Как часто обновлять сообщение админа с прогрессом рассылки, секунд",
+    )
+
+    # Уведомления из веб-приложения (Mini App, админка) через Bot API
+    WEB_NOTIFY_QUEUE_SIZE: int = Field(
+        default=1000,
+        ge=10,
+        description="Размер очереди уведомлений веб-процесса (при переполнении новые отбрасываются)",
+    )
+    WEB_NOTIFY_WORKERS: int = Field(
+        default=4,
+        ge=1,
+        le=32,
+        description="Число фоновых задач, отправляющих уведомления из очереди",
+    )
+    WEB_NOTIFY_DRAIN_TIMEOUT: float = Field(
+        default=10.0,
+        ge=0,
+        description="Сколько секунд при остановке ждать отправки оставшихся уведомлений",
+    )
+
+    # Документы пользователей (модерация): локальный кэш файлов из Telegram
+    TG_FILE_PATH_TTL: int = Field(
+        default=3000,
+        ge=60,
+        le=3600,
+        description="Сколько секунд кэшировать file_path из getFile (Telegram гарантирует не менее часа)",
+    )
+    DOCUMENT_CACHE_DIR: str = Field(
+        default=str(_ROOT_DIR / "data" / "document_cache"),
+        description="Каталог дискового кэша документов пользователей",
+    )
+    DOCUMENT_CACHE_MAX_BYTES: int = Field(
+        default=512 * 1024 * 1024,
+        ge=0,
+        description="Предельный размер кэша документов в байтах (сверх — удаляются давно не открывавшиеся)",
+    )
+    DOCUMENT_CACHE_RETENTION_DAYS: int = Field(
+        default=7,
+        ge=1,
+        description="Сколько дней хранить скачанный документ (пользователю обещано не дольше недели)",
+    )
+
     # Документы при регистрации: разрешённые типы и размер
     ALLOWED_DOCUMENT_EXTENSIONS: list[str] = Field(
         default=[".pdf", ".jpg", ".jpeg", ".png"],
@@ -0,0 +1,11 @@
+# database/migrations.py — запуск миграций Alembic из кода приложения
+from pathlib import Path
+
+
+def run_migrations() -> None:
+    """Миграции Alembic до head (синхронно, до первого обращения к async engine)."""
+    from alembic.config import Config
+    from alembic import command
+    root = Path(__file__).resolve().parent.parent
+    alembic_cfg = Config(str(root / "alembic.ini"))
+    command.upgrade(alembic_cfg, "head")
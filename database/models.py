@@ -3,7 +3,7 @@ from datetime import date, datetime, timezone
 from enum import Enum
 from typing import Any, Optional
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, BigInteger
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, BigInteger, text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from sqlalchemy.types import JSON, Date
 
@@ -34,6 +34,9 @@ class TenderStatus(str, Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_status_city", "status", "city"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     tg_id: Mapped[int] = mapped_column(BigInteger, unique=True, nullable=False)
@@ -45,6 +48,9 @@ class User(Base):
     skills: Mapped[Optional[list]] = mapped_column(JSON, nullable=True)  # список строк
     status: Mapped[str] = mapped_column(String(32), nullable=False, server_default=UserStatus.PENDING_MODERATION.value)
     documents: Mapped[Optional[dict | list]] = mapped_column(JSON, nullable=True)  # список {type, file_id, file_name?, mime_type?} или legacy dict
+    # Агрегаты отзывов о пользователе; поддерживаются ReviewService при записи/удалении отзывов
+    rating_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    rating_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
 
     tenders_created: Mapped[list["Tender"]] = relationship(
@@ -57,9 +63,44 @@ class User(Base):
         "SupportTicket", back_populates="user"
     )
 
+    @property
+    def rating_avg(self) -> Optional[float]:
+        """Средняя оценка по отзывам или None, если отзывов нет."""
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
+
+class UserSkill(Base):
+    """Навык пользователя отдельной строкой — для индексного подбора исполнителей (users.skills — для отображения)."""
+
+    __tablename__ = "user_skills"
+    __table_args__ = (
+        # Подбор исполнителей тендера: skill = ? → user_id
+        Index("ix_user_skills_skill_user_id", "skill", "user_id"),
+    )
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    skill: Mapped[str] = mapped_column(String(128), primary_key=True)
+
 
 class Tender(Base):
     __tablename__ = "tenders"
+    __table_args__ = (
+        Index("ix_tenders_status_city_id", "status", "city", "id"),
+        Index(
+            "ix_tenders_open_city_category_id", "city", "category", "id",
+            postgresql_where=text("status = 'open'"),
+            sqlite_where=text("status = 'open'"),
+        ),
+        Index(
+            "ix_tenders_open_deadline", "deadline",
+            postgresql_where=text("status = 'open' AND deadline IS NOT NULL"),
+            sqlite_where=text("status = 'open' AND deadline IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     title: Mapped[str] = mapped_column(String(256), nullable=False)
@@ -69,11 +110,15 @@ class Tender(Base):
     description: Mapped[str] = mapped_column(Text, nullable=False)
     status: Mapped[str] = mapped_column(String(32), nullable=False, server_default=TenderStatus.DRAFT.value)
     deadline: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    # Напоминание о приближении срока отправлено (сбрасывается при переносе срока)
+    reminder_sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     created_by_user_id: Mapped[Optional[int]] = mapped_column(
         Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True
     )
     created_by_tg_id: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
     created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
+    # Меняется при любом изменении строки — версия для ETag в API Mini App
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
     creator: Mapped[Optional["User"]] = relationship(
         "User", back_populates="tenders_created", foreign_keys=[created_by_user_id]
@@ -85,12 +130,18 @@ class Tender(Base):
 
 class TenderApplication(Base):
     __tablename__ = "tender_applications"
+    __table_args__ = (
+        Index("ix_tender_applications_tender_user", "tender_id", "user_id"),
+        Index("ix_tender_applications_user_id", "user_id", "id"),
+        Index("ix_tender_applications_created_at", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     tender_id: Mapped[int] = mapped_column(Integer, ForeignKey("tenders.id", ondelete="CASCADE"), nullable=False)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     status: Mapped[str] = mapped_column(String(32), nullable=False, server_default="applied")
     created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
     tender: Mapped["Tender"] = relationship("Tender", back_populates="applications")
     user: Mapped["User"] = relationship("User", back_populates="applications")
@@ -98,6 +149,10 @@ class TenderApplication(Base):
 
 class Review(Base):
     __tablename__ = "reviews"
+    __table_args__ = (
+        Index("ix_reviews_to_user_id", "to_user_id"),
+        Index("ix_reviews_application_id", "application_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     tender_id: Mapped[int] = mapped_column(Integer, ForeignKey("tenders.id", ondelete="CASCADE"), nullable=False)
@@ -119,6 +174,10 @@ class TicketStatus(str, Enum):
 
 class SupportTicket(Base):
     __tablename__ = "support_tickets"
+    __table_args__ = (
+        Index("ix_support_tickets_user_status", "user_id", "status"),
+        Index("ix_support_tickets_status", "status"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -127,6 +186,11 @@ class SupportTicket(Base):
     )
     created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    # Последнее сообщение и непрочитанные админом — для списка тикетов (пишет SupportService)
+    last_message_text: Mapped[Optional[str]] = mapped_column(String(256), nullable=True)
+    last_message_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    last_message_author: Mapped[Optional[str]] = mapped_column(String(16), nullable=True)
+    unread_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     user: Mapped["User"] = relationship("User", back_populates="support_tickets")
     messages: Mapped[list["SupportMessage"]] = relationship(
@@ -136,6 +200,9 @@ class SupportTicket(Base):
 
 class SupportMessage(Base):
     __tablename__ = "support_messages"
+    __table_args__ = (
+        Index("ix_support_messages_ticket_created", "ticket_id", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     ticket_id: Mapped[int] = mapped_column(
@@ -146,3 +213,65 @@ class SupportMessage(Base):
     created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
 
     ticket: Mapped["SupportTicket"] = relationship("SupportTicket", back_populates="messages")
+
+
+class OutboxStatus(str, Enum):
+    PENDING = "pending"   # ждёт отправки (в т.ч. повтор после ошибки)
+    SENT = "sent"
+    FAILED = "failed"     # отправка невозможна или исчерпаны попытки
+
+
+class NotificationBatch(Base):
+    """Рассылка (например, публикация тендера): счётчики и сообщение админа для прогресса."""
+
+    __tablename__ = "notification_batches"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    kind: Mapped[str] = mapped_column(String(32), nullable=False)  # "tender_publish" и т.п.
+    tender_id: Mapped[Optional[int]] = mapped_column(
+        Integer, ForeignKey("tenders.id", ondelete="SET NULL"), nullable=True
+    )
+    total: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    sent: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    failed: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    # Сообщение, в котором показывается прогресс рассылки
+    report_chat_id: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    report_message_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    report_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+
+class CacheInvalidation(Base):
+    """Событие шины инвалидации кэша для SQLite (в PostgreSQL — LISTEN/NOTIFY); процессы опрашивают по id."""
+
+    __tablename__ = "cache_invalidations"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    cache_key: Mapped[str] = mapped_column(String(255), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+
+
+class NotificationOutbox(Base):
+    """Исходящее сообщение Telegram; пишется в транзакции бизнес-операции, отправляется воркером."""
+
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        # Выборка воркером: status = 'pending' AND next_attempt_at <= now ORDER BY id
+        Index("ix_notification_outbox_status_next_attempt", "status", "next_attempt_at", "id"),
+        Index("ix_notification_outbox_batch_id", "batch_id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    batch_id: Mapped[Optional[int]] = mapped_column(
+        Integer, ForeignKey("notification_batches.id", ondelete="CASCADE"), nullable=True
+    )
+    chat_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    reply_markup: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)  # InlineKeyboardMarkup.model_dump()
+    status: Mapped[str] = mapped_column(String(16), nullable=False, server_default=OutboxStatus.PENDING.value)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    next_attempt_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
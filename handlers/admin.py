@@ -4,7 +4,7 @@ from aiogram import F, Router
 from aiogram.filters import Command
 from aiogram.types import CallbackQuery, Message, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.fsm.context import FSMContext
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -16,6 +16,12 @@ from utils.chat_utils import answer_with_cleanup
 from utils.validators import parse_callback_id, parse_callback_parts
 from utils.menu_updater import send_notification_with_menu_update, refresh_user_menu_on_state_change
 from services.user_service import UserService
+from services.tender_service import TenderService
+from services.outbox import OutboxService
+from services.review_service import ReviewService
+from services.stats_service import StatsService
+from services.realtime import RealtimeEvents
+from services.deadline_scheduler import DeadlineService
 
 logger = logging.getLogger(__name__)
 
@@ -65,6 +71,8 @@ async def moderation_approve(
         message_text=notification_text,
         session=session,
         update_menu=True,
+        new_status=updated_user.status,
+        user=updated_user,
     )
     
     # Обновляем меню при изменении статуса
@@ -122,6 +130,8 @@ async def moderation_reject(
         message_text=notification_text,
         session=session,
         update_menu=True,
+        new_status=updated_user.status,
+        user=updated_user,
     )
     
     # Обновляем меню при изменении статуса
@@ -139,7 +149,7 @@ async def moderation_reject(
 
 @router.message(F.text == "⚙️ Админ-панель")
 @router.message(F.text == "🏠 Главное меню")
-async def cmd_admin_menu(message: Message, session: AsyncSession, state: FSMContext) -> None:
+async def cmd_admin_menu(message: Message, session: AsyncSession, state: FSMContext, db_user: User | None = None) -> None:
     """Переключение между админ-меню и главным меню."""
     # Отменяем FSM состояние, если оно активно
     current_state = await state.get_state()
@@ -147,8 +157,7 @@ async def cmd_admin_menu(message: Message, session: AsyncSession, state: FSMCont
         await state.clear()
     
     from handlers.keyboards import get_admin_menu_kb, get_main_menu_kb
-    result = await session.execute(select(User).where(User.tg_id == message.from_user.id))
-    user = result.scalar_one_or_none()
+    user = db_user
     
     if message.text == "⚙️ Админ-панель":
         if not is_admin(message.from_user.id):
@@ -168,6 +177,7 @@ async def cmd_admin_menu(message: Message, session: AsyncSession, state: FSMCont
             user_tg_id=message.from_user.id,
             session=session,
             welcome_text="🏠 <b>Главное меню</b>",
+            user=user,
         )
 
 
@@ -242,13 +252,6 @@ async def cmd_workers(message: Message, session: AsyncSession) -> None:
         await message.answer(f"Мастеров{status_hint} пока нет.")
         return
 
-    # Средний рейтинг по отзывам (to_user_id)
-    result = await session.execute(
-        select(Review.to_user_id, func.avg(Review.rating), func.count(Review.id))
-        .group_by(Review.to_user_id)
-    )
-    ratings = {row[0]: (float(row[1]) if row[1] else 0, row[2]) for row in result.all()}
-
     lines = []
     status_emoji = {
         "active": "✅",
@@ -261,9 +264,8 @@ async def cmd_workers(message: Message, session: AsyncSession) -> None:
             skills += "…"
         em = status_emoji.get(u.status, "•")
         rating_str = ""
-        if u.id in ratings:
-            avg_r, cnt_r = ratings[u.id]
-            rating_str = f" | ★ {avg_r:.1f} ({cnt_r})"
+        if u.rating_count:
+            rating_str = f" | ★ {u.rating_avg:.1f} ({u.rating_count})"
         lines.append(
             f"{i}. {em} {u.full_name} | {u.city} | {skills} | {u.status}{rating_str}"
         )
@@ -370,48 +372,21 @@ async def cmd_stats(message: Message, session: AsyncSession) -> None:
     if not is_admin(message.from_user.id):
         await message.answer("Доступ только для администратора.")
         return
-    from datetime import datetime, timedelta, timezone
-    now = datetime.now(timezone.utc)
-    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    week_ago = today - timedelta(days=7)
-    # Пользователи по ролям и статусам
-    result = await session.execute(
-        select(User.role, User.status, func.count(User.id))
-        .group_by(User.role, User.status)
-    )
-    role_status = result.all()
-    result = await session.execute(select(func.count(User.id)))
-    users_total = result.scalar() or 0
-    # Тендеры по статусам
-    result = await session.execute(
-        select(Tender.status, func.count(Tender.id)).group_by(Tender.status)
-    )
-    tender_status = result.all()
-    result = await session.execute(select(func.count(Tender.id)))
-    tenders_total = result.scalar() or 0
-    # Отклики за сегодня и за неделю
-    result = await session.execute(
-        select(func.count(TenderApplication.id)).where(TenderApplication.created_at >= today)
-    )
-    apps_today = result.scalar() or 0
-    result = await session.execute(
-        select(func.count(TenderApplication.id)).where(TenderApplication.created_at >= week_ago)
-    )
-    apps_week = result.scalar() or 0
+    stats = await StatsService.get_snapshot()
     lines = [
         "<b>Статистика</b>",
         "",
-        f"Пользователей: {users_total}",
+        f"Пользователей: {stats.users_total}",
     ]
-    for r, s, c in role_status:
+    for (r, s), c in sorted(stats.users_by_role_status.items(), key=lambda kv: (kv[0][0] or "", kv[0][1])):
         lines.append(f"  — {r} / {s}: {c}")
-    lines.extend(["", f"Тендеров: {tenders_total}"])
-    for s, c in tender_status:
+    lines.extend(["", f"Тендеров: {stats.tenders_total}"])
+    for s, c in sorted(stats.tenders_by_status.items()):
         lines.append(f"  — {s}: {c}")
     lines.extend([
         "",
-        f"Откликов сегодня: {apps_today}",
-        f"Откликов за неделю: {apps_week}",
+        f"Откликов сегодня: {stats.apps_today}",
+        f"Откликов за неделю: {stats.apps_week}",
     ])
     await message.answer("\n".join(lines))
 
@@ -441,6 +416,7 @@ async def cmd_add_tender(
 async def publish_tender(
     callback: CallbackQuery,
     session: AsyncSession,
+    db_user: User | None = None,
 ) -> None:
     """Опубликовать черновик тендера: статус open, рассылка исполнителям."""
     tender_id = parse_callback_id(callback.data, "publish:")
@@ -456,27 +432,15 @@ async def publish_tender(
         return
     # Только админ или создатель тендера
     if not is_admin(callback.from_user.id):
-        result = await session.execute(select(User).where(User.tg_id == callback.from_user.id))
-        user = result.scalar_one_or_none()
+        user = db_user
         if not user or user.id != tender.created_by_user_id:
             await callback.answer("Публиковать может только создатель или админ.", show_alert=True)
             return
     tender.status = TenderStatus.OPEN.value
     await session.flush()
+    await DeadlineService.publish(session, tender.id)
     # Уведомляем только исполнителей: тот же город и навыки совпадают с категорией тендера
-    result = await session.execute(
-        select(User).where(
-            User.status == UserStatus.ACTIVE.value,
-            User.city == tender.city,
-        )
-    )
-    all_city = result.scalars().all()
-    users = [
-        u for u in all_city
-        if u.role in ("executor", "both")
-        and (u.skills or [])
-        and tender.category in (u.skills or [])
-    ]
+    target_tg_ids = await TenderService.get_matching_executor_tg_ids(session, tender)
     tender_text = (
         f"📋 Тендер: {tender.title}\n"
         f"Категория: {tender.category}\n"
@@ -487,16 +451,25 @@ async def publish_tender(
     kb = InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text="Откликнуться", callback_data=f"apply:{tender.id}")]
     ])
-    sent_count = 0
-    for u in users:
-        try:
-            await callback.bot.send_message(u.tg_id, tender_text, reply_markup=kb)
-            sent_count += 1
-        except Exception as e:
-            logger.warning(f"Failed to send tender notification to user {u.tg_id}: {e}")
-    logger.info(f"Tender {tender_id} published by {callback.from_user.id}, notifications sent to {sent_count}/{len(users)} users")
+    # Рассылку выполняет воркер outbox: здесь только записи в той же транзакции, что и смена статуса
+    report_text = callback.message.text + "\n\n✅ Опубликовано."
+    batch = await OutboxService.create_batch(
+        session,
+        "tender_publish",
+        tender_id=tender.id,
+        report_chat_id=callback.message.chat.id,
+        report_message_id=callback.message.message_id,
+        report_text=report_text,
+    )
+    queued = await OutboxService.enqueue_many(
+        session, target_tg_ids, tender_text, reply_markup=kb, batch=batch
+    )
+    logger.info(f"Tender {tender_id} published by {callback.from_user.id}, {queued} notifications queued (batch {batch.id})")
     await callback.message.edit_text(
-        callback.message.text + f"\n\n✅ Опубликовано. Уведомления отправлены {sent_count} из {len(users)} исполнителям."
+        report_text + (
+            f"\n📨 Уведомления поставлены в очередь: {queued} исполнителям."
+            if queued else "\nПодходящих исполнителей нет."
+        )
     )
     await callback.answer("Тендер опубликован.")
 
@@ -506,6 +479,7 @@ async def publish_tender(
 async def admin_select_executor(
     callback: CallbackQuery,
     session: AsyncSession,
+    db_user: User | None = None,
 ) -> None:
     """Выбор исполнителя: тендер in_progress, отклик selected, остальные rejected. Доступ: админ или создатель тендера."""
     app_id = parse_callback_id(callback.data, "select_user:")
@@ -527,13 +501,13 @@ async def admin_select_executor(
     tender = app.tender
     # Доступ: админ или создатель тендера
     if not is_admin(callback.from_user.id):
-        result = await session.execute(select(User).where(User.tg_id == callback.from_user.id))
-        user = result.scalar_one_or_none()
+        user = db_user
         if not user or user.id != tender.created_by_user_id:
             await callback.answer("Выбрать исполнителя может только создатель тендера или админ.", show_alert=True)
             return
     app.status = "selected"
     tender.status = TenderStatus.IN_PROGRESS.value
+    await RealtimeEvents.application_status(session, app)
     # Остальные отклики по этому тендеру — rejected; уведомляем их в чат
     result = await session.execute(
         select(TenderApplication)
@@ -545,6 +519,7 @@ async def admin_select_executor(
     )
     for other in result.scalars().all():
         other.status = "rejected"
+        await RealtimeEvents.application_status(session, other)
         try:
             await callback.bot.send_message(
                 other.user.tg_id,
@@ -586,6 +561,7 @@ async def admin_select_executor(
 async def close_tender_callback(
     callback: CallbackQuery,
     session: AsyncSession,
+    db_user: User | None = None,
 ) -> None:
     tender_id = parse_callback_id(callback.data, "close_tender:")
     if tender_id is None:
@@ -597,8 +573,7 @@ async def close_tender_callback(
         await callback.answer("Тендер не найден.", show_alert=True)
         return
     if not is_admin(callback.from_user.id):
-        result = await session.execute(select(User).where(User.tg_id == callback.from_user.id))
-        user = result.scalar_one_or_none()
+        user = db_user
         if not user or user.id != tender.created_by_user_id:
             await callback.answer("Доступ только для создателя или админа.", show_alert=True)
             return
@@ -637,6 +612,7 @@ async def close_tender_callback(
 async def cancel_tender_callback(
     callback: CallbackQuery,
     session: AsyncSession,
+    db_user: User | None = None,
 ) -> None:
     tender_id = parse_callback_id(callback.data, "cancel_tender:")
     if tender_id is None:
@@ -648,8 +624,7 @@ async def cancel_tender_callback(
         await callback.answer("Тендер не найден.", show_alert=True)
         return
     if not is_admin(callback.from_user.id):
-        result = await session.execute(select(User).where(User.tg_id == callback.from_user.id))
-        user = result.scalar_one_or_none()
+        user = db_user
         if not user or user.id != tender.created_by_user_id:
             await callback.answer("Доступ только для создателя или админа.", show_alert=True)
             return
@@ -668,6 +643,7 @@ async def rate_tender_start(
     callback: CallbackQuery,
     state: FSMContext,
     session: AsyncSession,
+    db_user: User | None = None,
 ) -> None:
     """Начало оценки: только создатель тендера, по выбранному отклику."""
     tender_id = parse_callback_id(callback.data, "rate:")
@@ -683,10 +659,7 @@ async def rate_tender_start(
     if not tender:
         await callback.answer("Тендер не найден.", show_alert=True)
         return
-    result = await session.execute(
-        select(User).where(User.tg_id == callback.from_user.id)
-    )
-    user = result.scalar_one_or_none()
+    user = db_user
     if not user or user.id != tender.created_by_user_id:
         await callback.answer("Оценить может только создатель тендера.", show_alert=True)
         return
@@ -751,7 +724,8 @@ async def review_comment_submit(
 ) -> None:
     data = await state.get_data()
     comment = None if message.text.strip().lower() in ("пропустить", "нет", "—", "-") else message.text.strip()
-    review = Review(
+    await ReviewService.create_review(
+        session,
         tender_id=data["tender_id"],
         application_id=data["application_id"],
         from_user_id=data["from_user_id"],
@@ -759,8 +733,6 @@ async def review_comment_submit(
         rating=data["rating"],
         comment=comment,
     )
-    session.add(review)
-    await session.flush()
     await state.clear()
     # Уведомляем исполнителя
     result = await session.execute(select(User).where(User.id == data["to_user_id"]))
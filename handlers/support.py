@@ -6,7 +6,9 @@ from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 
 from config import settings
-from database.models import User, UserStatus, SupportTicket, SupportMessage, TicketStatus
+from database.models import User, UserStatus, SupportTicket, TicketStatus
+from services.realtime import RealtimeEvents
+from services.support_service import SupportService
 from states.support import SupportStates
 from handlers.keyboards import get_main_menu_kb, get_support_chat_kb
 from utils.chat_utils import answer_with_cleanup, cleanup_old_messages, track_bot_message, track_user_message
@@ -31,6 +33,7 @@ async def _get_or_create_open_ticket(session: AsyncSession, user_id: int) -> Sup
     ticket = SupportTicket(user_id=user_id, status=TicketStatus.NEW.value)
     session.add(ticket)
     await session.flush()
+    await RealtimeEvents.support_ticket(session, ticket)
     return ticket
 
 
@@ -39,10 +42,10 @@ async def cmd_support(
     message: Message,
     session: AsyncSession,
     state: FSMContext,
+    db_user: User | None = None,
 ) -> None:
     """Вход в чат поддержки: создаём/открываем тикет, включаем состояние active_chat."""
-    result = await session.execute(select(User).where(User.tg_id == message.from_user.id))
-    user = result.scalar_one_or_none()
+    user = db_user
     is_admin = message.from_user.id == settings.ADMIN_ID
     if not user:
         await answer_with_cleanup(
@@ -96,8 +99,7 @@ async def support_message(
         await message.answer("Тикет закрыт. Нажмите «💬 Поддержка» для нового обращения.")
         return
 
-    msg = SupportMessage(ticket_id=ticket_id, author="user", text=message.text.strip())
-    session.add(msg)
+    await SupportService.add_message(session, ticket, "user", message.text.strip())
     if ticket.status == TicketStatus.NEW.value:
         ticket.status = TicketStatus.IN_PROGRESS.value
     await session.flush()
@@ -119,6 +121,7 @@ async def support_end_chat(
     callback: CallbackQuery,
     session: AsyncSession,
     state: FSMContext,
+    db_user: User | None = None,
 ) -> None:
     """Завершить чат: закрыть тикет, сбросить состояние."""
     await callback.answer()
@@ -132,8 +135,7 @@ async def support_end_chat(
 
     await state.clear()
 
-    result = await session.execute(select(User).where(User.tg_id == callback.from_user.id))
-    user = result.scalar_one_or_none()
+    user = db_user
     is_admin = callback.from_user.id == settings.ADMIN_ID
     reply_markup = get_main_menu_kb(
         user.role if user else None,
@@ -4,15 +4,16 @@ from datetime import datetime, timezone
 
 from aiogram import F, Router
 from aiogram.types import CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from config import settings
-from database.models import User, Tender, TenderApplication, Review, UserStatus, TenderStatus
+from database.models import User, Tender, TenderApplication, UserStatus, TenderStatus
 from utils.validators import parse_callback_id
 from utils.menu_updater import send_notification_with_menu_update
 from services.user_service import UserService
+from services.tender_service import TenderService
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +24,7 @@ router = Router()
 async def tender_detail_callback(
     callback: CallbackQuery,
     session: AsyncSession,
+    db_user: User | None = None,
 ) -> None:
     """Показать подробную информацию о тендере."""
     tender_id = parse_callback_id(callback.data, "tender_detail:")
@@ -42,18 +44,12 @@ async def tender_detail_callback(
         return
     
     # Проверяем, откликался ли пользователь на этот тендер
-    tg_id = callback.from_user.id
-    user = await UserService.get_user_by_tg_id(session, tg_id)
+    user = db_user
     
-    has_applied = False
-    if user:
-        result = await session.execute(
-            select(TenderApplication).where(
-                TenderApplication.tender_id == tender_id,
-                TenderApplication.user_id == user.id,
-            )
-        )
-        has_applied = result.scalar_one_or_none() is not None
+    viewer_states = await TenderService.get_viewer_states(
+        session, user.id if user else None, [tender_id]
+    )
+    has_applied = viewer_states[tender_id].has_applied
     
     # Форматируем дату дедлайна
     deadline_str = "Не указан"
@@ -92,18 +88,17 @@ async def tender_detail_callback(
 async def apply_to_tender(
     callback: CallbackQuery,
     session: AsyncSession,
+    db_user: User | None = None,
 ) -> None:
     """Мастер нажал «Откликнуться»: создаём отклик и уведомляем админа с профилем мастера."""
     tender_id = parse_callback_id(callback.data, "apply:")
     if tender_id is None:
         await callback.answer("Ошибка обработки запроса.", show_alert=True)
         return
-    tg_id = callback.from_user.id
+    user = db_user
 
     # Проверяем, может ли пользователь откликаться на тендеры
-    can_apply = await UserService.can_user_apply_to_tenders(session, tg_id)
-    if not can_apply:
-        user = await UserService.get_user_by_tg_id(session, tg_id)
+    if not UserService.user_can_apply(user):
         if not user:
             await callback.answer("Сначала пройдите регистрацию.", show_alert=True)
         elif user.status != UserStatus.ACTIVE.value:
@@ -111,8 +106,6 @@ async def apply_to_tender(
         else:
             await callback.answer("Откликаться на тендеры могут только исполнители.", show_alert=True)
         return
-    
-    user = await UserService.get_user_by_tg_id(session, tg_id)
 
     result = await session.execute(
         select(Tender)
@@ -156,15 +149,14 @@ async def apply_to_tender(
     session.add(app)
     await session.flush()
 
-    # Рейтинг исполнителя (средний по отзывам)
+    # Рейтинг исполнителя (агрегаты в users; читаем из БД, а не из кэшированного профиля)
     result_r = await session.execute(
-        select(func.avg(Review.rating), func.count(Review.id))
-        .where(Review.to_user_id == user.id)
+        select(User.rating_sum, User.rating_count).where(User.id == user.id)
     )
-    row_r = result_r.one_or_none()
+    rating_sum, rating_count = result_r.one()
     rating_str = ""
-    if row_r and row_r[1] and row_r[1] > 0:
-        rating_str = f"\nРейтинг: ★ {float(row_r[0]):.1f} ({row_r[1]} отзывов)"
+    if rating_count:
+        rating_str = f"\nРейтинг: ★ {rating_sum / rating_count:.1f} ({rating_count} отзывов)"
     skills_str = ", ".join(user.skills) if user.skills else "—"
     text = (
         f"📩 Отклик на тендер «{tender.title}»\n\n"
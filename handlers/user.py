@@ -1,5 +1,5 @@
 # handlers/user.py — регистрация исполнителя (FSM)
-from datetime import datetime
+from datetime import date, datetime
 
 import phonenumbers
 from aiogram import F, Router
@@ -27,6 +27,7 @@ from utils.chat_utils import answer_with_cleanup, clear_user_messages
 from utils.ui_manager import answer_ui
 from utils.validators import validate_string_length, validate_date_range, parse_callback_id
 from utils.menu_updater import ensure_menu_visible
+from services.user_service import UserService
 
 router = Router()
 
@@ -40,11 +41,11 @@ async def cmd_start(
     message: Message,
     session: AsyncSession,
     state: FSMContext,
+    db_user: User | None = None,
 ) -> None:
     """Старт: проверяем, зарегистрирован ли пользователь."""
     await state.clear()
-    result = await session.execute(select(User).where(User.tg_id == message.from_user.id))
-    user = result.scalar_one_or_none()
+    user = db_user
     
     is_admin = message.from_user.id == settings.ADMIN_ID
     
@@ -89,6 +90,7 @@ async def cmd_start(
         user_tg_id=message.from_user.id,
         session=session,
         welcome_text=welcome_back,
+        user=user,
     )
 
 
@@ -98,6 +100,7 @@ async def cmd_register(
     message: Message,
     session: AsyncSession,
     state: FSMContext,
+    db_user: User | None = None,
 ) -> None:
     """Начало регистрации исполнителя."""
     # Отменяем FSM состояние, если оно активно
@@ -105,8 +108,7 @@ async def cmd_register(
     if current_state:
         await state.clear()
     
-    result = await session.execute(select(User).where(User.tg_id == message.from_user.id))
-    existing = result.scalar_one_or_none()
+    existing = db_user
     if existing:
         is_admin = message.from_user.id == settings.ADMIN_ID
         if existing.status == UserStatus.PENDING_MODERATION.value:
@@ -174,7 +176,8 @@ async def step_birth_date(message: Message, state: FSMContext) -> None:
         await answer_ui(message, f"❌ {error_msg}", state=state)
         return
     
-    await state.update_data(birth_date=dt)
+    # В FSM — строкой ISO: данные состояния сериализуются в JSON (Redis-хранилище)
+    await state.update_data(birth_date=dt.isoformat())
     await state.set_state(RegistrationStates.city)
     await answer_ui(message, "Введите город:", state=state)
 
@@ -419,6 +422,8 @@ async def _submit_registration(
     
     data = await state.get_data()
     birth_date = data.get("birth_date")
+    if isinstance(birth_date, str):
+        birth_date = date.fromisoformat(birth_date)
     
     # Финальная валидация длины полей перед сохранением
     full_name_valid, full_name_error = validate_string_length(data.get("full_name", ""), max_length=256, field_name="ФИО")
@@ -437,16 +442,16 @@ async def _submit_registration(
         city=data["city"],
         phone=data["phone"],
         role=UserRole.EXECUTOR.value,  # Только исполнитель
-        skills=data["skills"],
         documents=data.get("documents"),
         status=UserStatus.PENDING_MODERATION.value,
     )
     session.add(user)
     await session.flush()  # чтобы получить user.id до коммита (коммит сделает middleware)
+    await UserService.set_user_skills(session, user, data["skills"])
     await state.clear()
     # Очищаем старые сообщения после завершения регистрации
     from utils.chat_utils import clear_user_messages
-    clear_user_messages(message.chat.id)
+    await clear_user_messages(message.chat.id)
 
     # Текст для админа
     skills_str = ", ".join(data["skills"])
@@ -484,6 +489,7 @@ async def _submit_registration(
         bot=message.bot,
         user_tg_id=from_user.id,
         session=session,
+        user=user,
     )
 
 
@@ -509,13 +515,12 @@ async def _require_active_user(
 @router.message(F.text == "👤 Мой профиль")
 @router.message(F.text == "📋 Мои отклики")
 @router.message(F.text == "🔍 Искать заказы")
-async def cmd_redirect_to_app(message: Message, session: AsyncSession, state: FSMContext) -> None:
+async def cmd_redirect_to_app(message: Message, session: AsyncSession, state: FSMContext, db_user: User | None = None) -> None:
     """Редирект: профиль, отклики и заказы — в Mini App."""
     current_state = await state.get_state()
     if current_state:
         await state.clear()
-    result = await session.execute(select(User).where(User.tg_id == message.from_user.id))
-    user = result.scalar_one_or_none()
+    user = db_user
     is_admin = message.from_user.id == settings.ADMIN_ID
     if not user:
         await answer_with_cleanup(
@@ -601,7 +606,7 @@ async def edit_phone(message: Message, state: FSMContext) -> None:
 
 
 @router.callback_query(ProfileEditStates.skills, F.data.startswith("skill:"))
-async def edit_skills_callback(callback: CallbackQuery, state: FSMContext, session: AsyncSession) -> None:
+async def edit_skills_callback(callback: CallbackQuery, state: FSMContext, session: AsyncSession, db_user: User | None = None) -> None:
     data = await state.get_data()
     skills: list = data.get("skills") or []
     value = callback.data.replace("skill:", "")
@@ -611,17 +616,16 @@ async def edit_skills_callback(callback: CallbackQuery, state: FSMContext, sessi
             return
         await state.update_data(skills=skills)
         # Сохраняем в БД
-        result = await session.execute(select(User).where(User.tg_id == callback.from_user.id))
-        user = result.scalar_one_or_none()
+        user = db_user
         if user:
             user.city = data.get("city", user.city)
             user.phone = data.get("phone", user.phone)
-            user.skills = skills
+            await UserService.set_user_skills(session, user, skills)
             await session.flush()
         await state.clear()
         # Очищаем старые сообщения после завершения редактирования
         from utils.chat_utils import clear_user_messages
-        clear_user_messages(callback.message.chat.id)
+        await clear_user_messages(callback.message.chat.id)
         
         skills_str = ", ".join(skills)
         await callback.message.edit_text(
@@ -890,15 +894,14 @@ async def application_list_all_callback(
 
 
 @router.message(F.text == "🔍 Искать заказы")
-async def cmd_find_tenders(message: Message, session: AsyncSession, state: FSMContext) -> None:
+async def cmd_find_tenders(message: Message, session: AsyncSession, state: FSMContext, db_user: User | None = None) -> None:
     """Поиск доступных тендеров для исполнителя."""
     # Отменяем FSM состояние, если оно активно
     current_state = await state.get_state()
     if current_state:
         await state.clear()
     
-    result = await session.execute(select(User).where(User.tg_id == message.from_user.id))
-    user = result.scalar_one_or_none()
+    user = db_user
     is_admin = message.from_user.id == settings.ADMIN_ID
     if not user:
         await answer_with_cleanup(
@@ -935,6 +938,8 @@ async def cmd_find_tenders(message: Message, session: AsyncSession, state: FSMCo
         return
     
     from handlers.keyboards import get_tender_list_kb
+    from services.tender_service import TenderService
+    viewer_states = await TenderService.get_viewer_states(session, user.id, [t.id for t in tenders])
     for tender in tenders:
         text = (
             f"📋 <b>{tender.title}</b>\n"
@@ -944,7 +949,7 @@ async def cmd_find_tenders(message: Message, session: AsyncSession, state: FSMCo
         await answer_with_cleanup(
             message,
             text,
-            reply_markup=get_tender_list_kb(tender.id, can_apply=True),
+            reply_markup=get_tender_list_kb(tender.id, can_apply=not viewer_states[tender.id].has_applied),
         )
 
 
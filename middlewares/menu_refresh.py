@@ -4,7 +4,6 @@ from typing import Any, Awaitable, Callable, Dict
 
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject, Message, CallbackQuery
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.models import User, UserStatus
@@ -42,11 +41,8 @@ class MenuRefreshMiddleware(BaseMiddleware):
                 session: AsyncSession = data.get("session")
                 if session:
                     try:
-                        # Проверяем актуальность статуса пользователя
-                        result = await session.execute(
-                            select(User).where(User.tg_id == user_id)
-                        )
-                        user = result.scalar_one_or_none()
+                        # Пользователь уже загружен UserContextMiddleware
+                        user: User | None = data.get("db_user")
                         
                         if user:
                             # Если пользователь на модерации, но меню не соответствует статусу,
@@ -70,6 +66,7 @@ class MenuRefreshMiddleware(BaseMiddleware):
                                     user_tg_id=user_id,
                                     session=session,
                                     new_status=current_status,
+                                    user=user,
                                 )
                     except Exception as e:
                         logger.error(f"Error in MenuRefreshMiddleware for user {user_id}: {e}")
@@ -1,46 +1,55 @@
 # middlewares/rate_limiter.py — rate limiting для защиты от спама
-import time
+import math
 import logging
-from typing import Any, Awaitable, Callable, Dict
-from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject, Message, CallbackQuery
 from config import settings
+from utils.state_backend import get_state_backend
 
 logger = logging.getLogger(__name__)
 
+# Стоимость callback-запросов по префиксу data (по умолчанию — 1):
+# частые лёгкие действия дешевле, действия с рассылкой или записью в БД — дороже
+_CALLBACK_COSTS: dict[str, float] = {
+    "skill:": 0.25,
+    "tenders_page:": 0.5,
+    "tender_detail:": 0.5,
+    "app_detail:": 0.5,
+    "help_": 0.5,
+    "apply:": 3.0,
+    "publish:": 3.0,
+    "rate:": 2.0,
+    "rating:": 2.0,
+}
+
+
+def _callback_cost(data: Optional[str]) -> float:
+    if data:
+        for prefix, cost in _CALLBACK_COSTS.items():
+            if data.startswith(prefix):
+                return cost
+    return 1.0
+
 
 class RateLimiterMiddleware(BaseMiddleware):
     """
     Middleware для ограничения частоты запросов от одного пользователя.
-    Использует простой in-memory счетчик запросов.
+    Лимит RATE_LIMIT_REQUESTS за RATE_LIMIT_PERIOD считается по GCRA (одно значение на пользователя)
+    в общем state backend, поэтому он общий для всех процессов бота и для сообщений и callback'ов.
+    Один экземпляр регистрируется и на message, и на callback_query.
     """
     
     def __init__(self):
-        self._requests: dict[int, list[float]] = defaultdict(list)
         self._max_requests = settings.RATE_LIMIT_REQUESTS
         self._period = settings.RATE_LIMIT_PERIOD
     
-    def _cleanup_old_requests(self, user_id: int) -> None:
-        """Удалить старые запросы вне периода."""
-        now = time.time()
-        cutoff = now - self._period
-        self._requests[user_id] = [
-            req_time
-            for req_time in self._requests[user_id]
-            if req_time > cutoff
-        ]
-    
-    def _is_rate_limited(self, user_id: int) -> bool:
-        """Проверить, превышен ли лимит запросов."""
-        self._cleanup_old_requests(user_id)
-        return len(self._requests[user_id]) >= self._max_requests
-    
-    def _record_request(self, user_id: int) -> None:
-        """Записать запрос."""
-        now = time.time()
-        self._requests[user_id].append(now)
+    async def _hit(self, user_id: int, cost: float) -> float:
+        """Учесть запрос; 0 — разрешён, иначе — через сколько секунд можно повторить."""
+        return await get_state_backend().gcra(
+            f"ratelimit:{user_id}", self._period, self._max_requests, cost
+        )
     
     async def __call__(
         self,
@@ -48,12 +57,14 @@ class RateLimiterMiddleware(BaseMiddleware):
         event: TelegramObject,
         data: Dict[str, Any],
     ) -> Any:
-        # Получаем user_id из события
+        # Получаем user_id и стоимость запроса из события
         user_id = None
+        cost = 1.0
         if isinstance(event, Message):
             user_id = event.from_user.id if event.from_user else None
         elif isinstance(event, CallbackQuery):
             user_id = event.from_user.id if event.from_user else None
+            cost = _callback_cost(event.data)
         
         # Админы не ограничиваются
         if user_id == settings.ADMIN_ID:
@@ -62,20 +73,20 @@ class RateLimiterMiddleware(BaseMiddleware):
         if user_id is None:
             return await handler(event, data)
         
-        # Проверяем rate limit
-        if self._is_rate_limited(user_id):
+        # Проверяем rate limit (разрешённый запрос учитывается сразу)
+        retry_after = await self._hit(user_id, cost)
+        if retry_after > 0:
             logger.warning(f"Rate limit exceeded for user {user_id}")
+            wait = max(1, math.ceil(retry_after))
             if isinstance(event, CallbackQuery):
                 await event.answer(
-                    f"⏳ Слишком много запросов. Подождите {self._period} секунд.",
+                    f"⏳ Слишком много запросов. Подождите {wait} сек.",
                     show_alert=True,
                 )
             elif isinstance(event, Message):
                 await event.answer(
-                    f"⏳ Слишком много запросов. Подождите {self._period} секунд."
+                    f"⏳ Слишком много запросов. Подождите {wait} сек."
                 )
             return None
         
-        # Записываем запрос и продолжаем обработку
-        self._record_request(user_id)
         return await handler(event, data)
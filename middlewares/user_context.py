@@ -0,0 +1,28 @@
+# middlewares/user_context.py — текущий пользователь БД в handler.data['db_user']
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Message, CallbackQuery
+
+from services.user_service import UserService
+
+
+class UserContextMiddleware(BaseMiddleware):
+    """
+    Загружает пользователя один раз на обновление (через кэш UserService)
+    и передаёт его хендлерам и следующим middleware как db_user (None — не зарегистрирован).
+    Должен стоять после DbSessionMiddleware.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user = None
+        session = data.get("session")
+        if isinstance(event, (Message, CallbackQuery)) and event.from_user and session is not None:
+            user = await UserService.get_user_by_tg_id(session, event.from_user.id)
+        data["db_user"] = user
+        return await handler(event, data)
@@ -48,6 +48,12 @@ def run_web():
         sys.exit(1)
 
 
+def _bot_runs_in_web() -> bool:
+    """Webhook принимается веб-приложением — отдельный процесс бота не нужен."""
+    from config import settings
+    return settings.BOT_MODE == "webhook" and settings.WEBHOOK_IN_WEB
+
+
 def main():
     """Запуск бота и веб-интерфейса в отдельных процессах."""
     import argparse
@@ -71,6 +77,9 @@ def main():
     elif args.web_only:
         logger.info("Запуск только веб-интерфейса...")
         run_web()
+    elif _bot_runs_in_web():
+        logger.info("BOT_MODE=webhook: бот принимает обновления в процессе веб-интерфейса")
+        run_web()
     else:
         logger.info("Запуск бота и веб-интерфейса...")
         
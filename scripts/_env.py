@@ -0,0 +1,54 @@
+# scripts/_env.py — окружение скриптов проверки и бенчмарков (путь к проекту, отдельная БД)
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def setup(db_name: str) -> str:
+    """
+    Подготовить окружение до импорта config.
+
+    БД скрипта — BENCH_DATABASE_URL или новый файл SQLite во временном каталоге: DATABASE_URL
+    из окружения и .env не используется, чтобы бенчмарк не заполнял рабочую базу.
+
+    Returns:
+        URL базы скрипта (async-драйвер)
+    """
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    url = os.environ.get("BENCH_DATABASE_URL")
+    if not url:
+        path = Path(tempfile.gettempdir()) / db_name
+        path.unlink(missing_ok=True)
+        url = f"sqlite+aiosqlite:///{path}"
+    os.environ["DATABASE_URL"] = url
+    os.environ.setdefault("BOT_TOKEN", "123456:bench")
+    os.environ.setdefault("ADMIN_ID", "1")
+    return url
+
+
+def migrate() -> None:
+    """Схема БД как в рабочем запуске: миграции Alembic до head, затем init_db для недостающих таблиц."""
+    import asyncio
+
+    from database.migrations import run_migrations
+    from database.session import get_engine, init_db
+
+    async def create_missing() -> None:
+        await init_db()
+        # Соединения пула привязаны к этому event loop — скрипт запустит свой
+        await get_engine().dispose()
+
+    run_migrations()
+    asyncio.run(create_missing())
+
+
+def rss_mb() -> float:
+    """Пиковый RSS процесса, МБ (Linux/macOS)."""
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
@@ -0,0 +1,179 @@
+# scripts/bench_cache.py — микробенчмарк кэша процесса: LRUCache против прежнего SimpleCache
+"""
+Пропускная способность get/set и память на N ключах (по умолчанию 1 000 000) для
+utils.cache.LRUCache и SimpleCache (копия прежней реализации ниже — в дереве её больше нет).
+
+    python scripts/bench_cache.py
+    python scripts/bench_cache.py --keys 1000000 --bound 100000
+
+Фазы: set N ключей, get N попаданий, get N промахов (ключи, которых нет в кэше), затем
+set N ключей в LRUCache с лимитом --bound записей (вытеснение) и с лимитом объёма --max-bytes-mb. Память — tracemalloc
+отдельным прогоном (с ним замер скорости был бы искажён).
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Any, Callable, Optional
+
+import _env
+
+_env.setup("tenderbot_bench_cache.db")
+
+from utils.cache import LRUCache  # noqa: E402
+
+
+class SimpleCache:
+    """utils/cache.SimpleCache до замены на LRUCache: get/set без изменений, для сравнения."""
+
+    def __init__(self):
+        self._cache: dict[str, tuple[Any, float]] = {}
+        self._hits = defaultdict(int)
+        self._misses = defaultdict(int)
+
+    def get(self, key: str, default: Any = None) -> Optional[Any]:
+        if key not in self._cache:
+            self._misses[key] += 1
+            return default
+        value, expiry = self._cache[key]
+        if time.time() > expiry:
+            del self._cache[key]
+            self._misses[key] += 1
+            return default
+        self._hits[key] += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        self._cache[key] = (value, time.time() + ttl)
+
+
+class _Value:
+    """Значение размером с типичную запись кэша (несколько полей, как у отсоединённого объекта)."""
+
+    def __init__(self, i: int):
+        self.id = i
+        self.tg_id = 1_000_000 + i
+        self.status = "active"
+        self.city = "Москва"
+
+
+def _n(value: int) -> str:
+    return f"{value:,}".replace(",", " ")
+
+
+def _keys(n: int, prefix: str = "user:tg_id") -> list[str]:
+    return [f"{prefix}:{i}" for i in range(n)]
+
+
+def _timed(label: str, n: int, fn: Callable[[], None]) -> None:
+    gc.collect()
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<34} {n / elapsed / 1e6:6.2f} млн оп/с  ({elapsed:.2f} с)")
+
+
+def _run(make_cache: Callable[[], Any], keys: list[str], missing: list[str], values: list[_Value]) -> Any:
+    cache = make_cache()
+
+    def set_all():
+        for key, value in zip(keys, values):
+            cache.set(key, value, 300)
+
+    def get_hits():
+        for key in keys:
+            cache.get(key)
+
+    def get_misses():
+        for key in missing:
+            cache.get(key)
+
+    n = len(keys)
+    _timed("set", n, set_all)
+    _timed("get (попадания)", n, get_hits)
+    _timed("get (промахи)", n, get_misses)
+    return cache
+
+
+def _memory_mb(make_cache: Callable[[], Any], keys: list[str], missing: list[str], values: list[_Value]) -> float:
+    """Сколько памяти держит кэш после set N + get N попаданий + get N промахов (ключи и значения — не в счёт)."""
+    gc.collect()
+    tracemalloc.start()
+    cache = make_cache()
+    for key, value in zip(keys, values):
+        cache.set(key, value, 300)
+    for key in keys:
+        cache.get(key)
+    for key in missing:
+        cache.get(key)
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del cache
+    return current / (1024 * 1024)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, default=1_000_000)
+    parser.add_argument("--bound", type=int, default=100_000, help="max_entries для замера с вытеснением")
+    parser.add_argument("--max-bytes-mb", type=int, default=64, help="max_bytes (МБ) для замера с оценкой размера")
+    args = parser.parse_args()
+
+    n = args.keys
+    keys = _keys(n)
+    missing = _keys(n, prefix="user:missing")
+    values = [_Value(i) for i in range(n)]
+    # sweep_interval больше длительности замера: периодическая очистка меряется отдельно ниже
+    unbounded = lambda: LRUCache(max_entries=n, sweep_interval=3600)  # noqa: E731
+
+    print(f"Ключей: {_n(n)}")
+    print("SimpleCache (до user-011):")
+    simple = _run(SimpleCache, keys, missing, values)
+    print(f"  счётчики статистики: {_n(len(simple._hits) + len(simple._misses))} (по ключу)")
+    del simple
+
+    print("LRUCache (без вытеснения):")
+    lru = _run(unbounded, keys, missing, values)
+    print(f"  счётчики статистики: {len(lru._stats)} (по префиксу ключа)")
+    del lru
+
+    print(f"LRUCache (max_entries={_n(args.bound)}, вытеснение):")
+    bounded = LRUCache(max_entries=args.bound, sweep_interval=3600)
+
+    def set_evicting():
+        for key, value in zip(keys, values):
+            bounded.set(key, value, 300)
+
+    _timed("set с вытеснением", n, set_evicting)
+    print(f"  записей: {_n(len(bounded._cache))}, вытеснено: {_n(n - len(bounded._cache))}")
+
+    expiring = LRUCache(max_entries=n, sweep_interval=3600)
+    for key, value in zip(keys, values):
+        expiring.set(key, value, -1)
+    gc.collect()
+    started = time.perf_counter()
+    expiring._sweep(time.monotonic())
+    print(f"  очистка {_n(n)} просроченных записей: {time.perf_counter() - started:.2f} с")
+    del bounded, expiring
+
+    print(f"LRUCache (max_bytes={args.max_bytes_mb} МБ, как CACHE_MAX_BYTES по умолчанию):")
+    by_bytes = LRUCache(max_entries=n, max_bytes=args.max_bytes_mb * 1024 * 1024, sweep_interval=3600)
+
+    def set_by_bytes():
+        for key, value in zip(keys, values):
+            by_bytes.set(key, value, 300)
+
+    _timed("set с оценкой размера", n, set_by_bytes)
+    print(f"  записей: {_n(len(by_bytes._cache))}, оценка объёма: {by_bytes._bytes / (1024 * 1024):.1f} МБ")
+    del by_bytes
+
+    print("Память кэша после set + get попаданий + get промахов, МБ (tracemalloc):")
+    print(f"  SimpleCache: {_memory_mb(SimpleCache, keys, missing, values):8.1f}")
+    print(f"  LRUCache:    {_memory_mb(unbounded, keys, missing, values):8.1f}")
+    bounded_mb = _memory_mb(lambda: LRUCache(max_entries=args.bound, sweep_interval=3600), keys, missing, values)
+    print(f"  LRUCache, max_entries={_n(args.bound)}: {bounded_mb:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
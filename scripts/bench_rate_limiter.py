@@ -0,0 +1,213 @@
+# scripts/bench_rate_limiter.py — бенчмарк rate limiting (GCRA в state backend) на 100 000 пользователей
+"""
+Пропускная способность и память лимитера на N различных пользователях (по умолчанию 100 000):
+MemoryStateBackend.gcra против прежнего RateLimiterMiddleware со списком времён запросов на
+пользователя (копия ниже — в дереве его больше нет), затем RedisStateBackend, если задан REDIS_URL.
+
+    python scripts/bench_rate_limiter.py
+    python scripts/bench_rate_limiter.py --users 100000 --rounds 5
+    REDIS_URL=redis://localhost:6379/15 python scripts/bench_rate_limiter.py
+
+Каждый раунд — по одному запросу от каждого пользователя (ключи ratelimit:<id>, как у middleware).
+Память — tracemalloc отдельным прогоном. Очистка простаивающих ключей MemoryStateBackend меряется
+со сдвигом часов backend'а на период лимита вперёд, без ожидания. В Redis ключи бенчмарка
+(ratelimit:bench:<id>) удаляются после замера; используйте отдельную базу Redis.
+"""
+import argparse
+import asyncio
+import gc
+import os
+import time
+import tracemalloc
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Awaitable, Callable
+
+import _env
+
+_env.setup("tenderbot_bench_rate_limiter.db")
+
+from config import settings  # noqa: E402
+from utils import state_backend  # noqa: E402
+from utils.state_backend import MemoryStateBackend, RedisStateBackend, StateBackend  # noqa: E402
+
+
+class ListRateLimiter:
+    """middlewares/rate_limiter.RateLimiterMiddleware до user-014: список времён запросов на пользователя."""
+
+    def __init__(self, max_requests: int, period: int):
+        self._requests: dict[int, list[float]] = defaultdict(list)
+        self._max_requests = max_requests
+        self._period = period
+
+    def _cleanup_old_requests(self, user_id: int) -> None:
+        now = time.time()
+        cutoff = now - self._period
+        self._requests[user_id] = [
+            req_time
+            for req_time in self._requests[user_id]
+            if req_time > cutoff
+        ]
+
+    def _is_rate_limited(self, user_id: int) -> bool:
+        self._cleanup_old_requests(user_id)
+        return len(self._requests[user_id]) >= self._max_requests
+
+    def _record_request(self, user_id: int) -> None:
+        self._requests[user_id].append(time.time())
+
+    async def hit(self, user_id: int) -> bool:
+        """Путь запроса в прежнем __call__: проверка, затем запись разрешённого запроса."""
+        if self._is_rate_limited(user_id):
+            return False
+        self._record_request(user_id)
+        return True
+
+
+def _n(value: int) -> str:
+    return f"{value:,}".replace(",", " ")
+
+
+async def _timed(label: str, n: int, fn: Callable[[], Awaitable[None]]) -> None:
+    gc.collect()
+    started = time.perf_counter()
+    await fn()
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<34} {n / elapsed / 1000:8.1f} тыс. оп/с  ({elapsed:.2f} с)")
+
+
+def _gcra_rounds(backend: StateBackend, user_ids: list[int], rounds: int, prefix: str = "ratelimit:"):
+    period, limit = settings.RATE_LIMIT_PERIOD, settings.RATE_LIMIT_REQUESTS
+    keys = [f"{prefix}{user_id}" for user_id in user_ids]
+
+    async def run() -> None:
+        for _ in range(rounds):
+            for key in keys:
+                await backend.gcra(key, period, limit)
+
+    return run
+
+
+def _list_rounds(limiter: ListRateLimiter, user_ids: list[int], rounds: int):
+    async def run() -> None:
+        for _ in range(rounds):
+            for user_id in user_ids:
+                await limiter.hit(user_id)
+
+    return run
+
+
+async def _memory_mb(make_run: Callable[[], Callable[[], Awaitable[None]]]) -> float:
+    """Сколько памяти держит лимитер после прогона (идентификаторы пользователей — не в счёт)."""
+    gc.collect()
+    tracemalloc.start()
+    run = make_run()  # замыкание держит лимитер, пока идёт замер
+    await run()
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del run
+    return current / (1024 * 1024)
+
+
+def _shift_clock(seconds: float) -> None:
+    """Сдвинуть часы MemoryStateBackend вперёд (модуль берёт время через time.monotonic)."""
+    state_backend.time = SimpleNamespace(monotonic=lambda: time.monotonic() + seconds)
+
+
+async def _bench_memory(user_ids: list[int], rounds: int) -> None:
+    n = len(user_ids) * rounds
+    print("Прежний лимитер (список времён на пользователя):")
+    old = ListRateLimiter(settings.RATE_LIMIT_REQUESTS, settings.RATE_LIMIT_PERIOD)
+    await _timed(f"{rounds} запросов на пользователя", n, _list_rounds(old, user_ids, rounds))
+    print(f"  пользователей в словаре: {_n(len(old._requests))} (не удаляются никогда)")
+    del old
+
+    print("MemoryStateBackend.gcra:")
+    backend = MemoryStateBackend()
+    await _timed(f"{rounds} запросов на пользователя", n, _gcra_rounds(backend, user_ids, rounds))
+    print(f"  ключей: {_n(len(backend._data))}")
+
+    # Запрос после простоя дольше периода запускает очистку всех просроченных ключей
+    _shift_clock(settings.RATE_LIMIT_PERIOD + 1)
+    backend._next_sweep = 0
+    try:
+        started = time.perf_counter()
+        await backend.gcra("ratelimit:0", settings.RATE_LIMIT_PERIOD, settings.RATE_LIMIT_REQUESTS)
+        elapsed = time.perf_counter() - started
+    finally:
+        state_backend.time = time
+    print(f"  очистка простаивающих: {elapsed:.2f} с, осталось ключей: {_n(len(backend._data))}")
+    del backend
+
+    print("Память лимитера после прогона, МБ (tracemalloc):")
+    old_mb = await _memory_mb(lambda: _list_rounds(
+        ListRateLimiter(settings.RATE_LIMIT_REQUESTS, settings.RATE_LIMIT_PERIOD), user_ids, rounds,
+    ))
+    print(f"  прежний лимитер:    {old_mb:8.1f}")
+    gcra_mb = await _memory_mb(lambda: _gcra_rounds(MemoryStateBackend(), user_ids, rounds))
+    print(f"  MemoryStateBackend: {gcra_mb:8.1f}")
+
+
+async def _bench_redis(url: str, user_ids: list[int], rounds: int, concurrency: int) -> None:
+    backend = RedisStateBackend(url)
+    prefix = "ratelimit:bench:"
+    keys = [f"{state_backend._KEY_PREFIX}{prefix}{user_id}" for user_id in user_ids]
+    period, limit = settings.RATE_LIMIT_PERIOD, settings.RATE_LIMIT_REQUESTS
+    n = len(user_ids) * rounds
+    try:
+        await backend.client.ping()
+    except Exception as e:
+        await backend.close()
+        print(f"Redis: пропущено — {url} недоступен ({e})")
+        return
+
+    async def cleanup() -> None:
+        for i in range(0, len(keys), 10_000):
+            await backend.client.delete(*keys[i:i + 10_000])
+
+    async def concurrent() -> None:
+        # Как несколько апдейтов, обрабатываемых одновременно: до concurrency запросов в полёте
+        for _ in range(rounds):
+            for i in range(0, len(user_ids), concurrency):
+                await asyncio.gather(*(
+                    backend.gcra(f"{prefix}{user_id}", period, limit)
+                    for user_id in user_ids[i:i + concurrency]
+                ))
+
+    try:
+        await cleanup()
+        before = (await backend.client.info("memory"))["used_memory"]
+        print(f"RedisStateBackend.gcra ({url}):")
+        await _timed(f"{rounds} запросов, последовательно", n, _gcra_rounds(backend, user_ids, rounds, prefix))
+        used = (await backend.client.info("memory"))["used_memory"] - before
+        print(f"  память Redis под ключи: {used / (1024 * 1024):.1f} МБ")
+        await cleanup()
+        await _timed(f"{rounds} запросов, по {concurrency} одновременно", n, concurrent)
+    finally:
+        await cleanup()
+        await backend.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=5, help="запросов от каждого пользователя")
+    parser.add_argument("--redis", default=os.environ.get("REDIS_URL", ""), help="URL Redis (по умолчанию REDIS_URL)")
+    parser.add_argument("--concurrency", type=int, default=100, help="запросов в полёте для Redis")
+    args = parser.parse_args()
+
+    user_ids = list(range(1_000_000, 1_000_000 + args.users))
+    print(f"Пользователей: {_n(args.users)}, лимит: {settings.RATE_LIMIT_REQUESTS} за {settings.RATE_LIMIT_PERIOD} с")
+    asyncio.run(_bench_memory(user_ids, args.rounds))
+
+    if not args.redis:
+        print("Redis: пропущено (задайте REDIS_URL или --redis)")
+        return
+    try:
+        asyncio.run(_bench_redis(args.redis, user_ids, args.rounds, args.concurrency))
+    except RuntimeError as e:
+        print(f"Redis: пропущено — {e}")
+
+
+if __name__ == "__main__":
+    main()
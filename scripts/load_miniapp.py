@@ -0,0 +1,168 @@
+# scripts/load_miniapp.py — нагрузочный тест API Mini App: N одновременных пользователей
+"""
+Заполняет отдельную БД (миграции до head) и гоняет N виртуальных пользователей Mini App по
+сценарию экрана тендеров: /api/me → /api/tenders → /api/tenders/{id} → /api/applications.
+Печатает запросы в секунду и задержки (p50/p95/p99).
+
+    python scripts/load_miniapp.py                          # 50 пользователей, приложение в процессе (ASGI)
+    python scripts/load_miniapp.py --users 50 --duration 30 --app-client
+    python scripts/load_miniapp.py --url http://127.0.0.1:8000   # запущенный uvicorn
+
+--app-client: клиент ведёт себя как app.js — присылает токен X-Miniapp-Session и If-None-Match.
+Без флага каждый запрос проверяет initData (как клиенты до появления токена).
+С --url сервер должен работать на той же БД (BENCH_DATABASE_URL) и с тем же BOT_TOKEN.
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from urllib.parse import urlencode
+
+import _env
+
+_env.setup("tenderbot_load_miniapp.db")
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from config import settings  # noqa: E402
+from database.models import Tender, TenderApplication, TenderStatus, User, UserStatus  # noqa: E402
+from database.session import get_async_session_maker, get_engine  # noqa: E402
+
+_CITIES = [f"Город {i}" for i in range(5)]
+_TG_ID_BASE = 5_000_000
+
+
+def _init_data(tg_id: int) -> str:
+    """initData, подписанный как в Telegram (HMAC-SHA256 с ключом от BOT_TOKEN)."""
+    fields = {
+        "auth_date": str(int(time.time())),
+        "query_id": f"bench{tg_id}",
+        "user": json.dumps({"id": tg_id, "first_name": "Bench"}, separators=(",", ":")),
+    }
+    data_check = "\n".join(f"{k}={v}" for k, v in sorted(fields.items()))
+    secret = hmac.new(b"WebAppData", settings.BOT_TOKEN.encode(), hashlib.sha256).digest()
+    fields["hash"] = hmac.new(secret, data_check.encode(), hashlib.sha256).hexdigest()
+    return urlencode(fields)
+
+
+async def seed(users: int, tenders: int) -> list[int]:
+    rnd = random.Random(1)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    async with get_async_session_maker()() as session:
+        await session.execute(insert(User), [
+            {
+                "id": i, "tg_id": _TG_ID_BASE + i, "full_name": f"Bench {i}", "city": _CITIES[i % len(_CITIES)],
+                "phone": "+70000000000", "role": "executor", "status": UserStatus.ACTIVE.value,
+            }
+            for i in range(1, users + 1)
+        ])
+        await session.execute(insert(Tender), [
+            {
+                "id": i, "title": f"Тендер {i}", "description": "Описание работ " * 20,
+                "city": _CITIES[i % len(_CITIES)], "category": "repair", "status": TenderStatus.OPEN.value,
+                "deadline": now + timedelta(days=30), "created_by_tg_id": 1, "created_at": now, "updated_at": now,
+            }
+            for i in range(1, tenders + 1)
+        ])
+        await session.execute(insert(TenderApplication), [
+            {
+                "tender_id": rnd.randint(1, tenders), "user_id": user_id, "status": "applied",
+                "created_at": now, "updated_at": now,
+            }
+            for user_id in range(1, users + 1)
+            for _ in range(5)
+        ])
+        await session.commit()
+    await get_engine().dispose()
+    return [_TG_ID_BASE + i for i in range(1, users + 1)]
+
+
+class _VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, tg_id: int, app_client: bool, tenders: int):
+        self._client = client
+        self._headers = {"X-Telegram-Init-Data": _init_data(tg_id)}
+        self._app_client = app_client
+        self._etags: dict[str, str] = {}
+        self._tenders = tenders
+        self.latencies: list[float] = []
+        self.statuses: dict[int, int] = {}
+
+    async def _get(self, path: str) -> Optional[dict]:
+        headers = dict(self._headers)
+        if self._app_client and path in self._etags:
+            headers["If-None-Match"] = self._etags[path]
+        started = time.perf_counter()
+        resp = await self._client.get(path, headers=headers)
+        self.latencies.append(time.perf_counter() - started)
+        self.statuses[resp.status_code] = self.statuses.get(resp.status_code, 0) + 1
+        if self._app_client:
+            token = resp.headers.get("X-Miniapp-Session")
+            if token:
+                self._headers["X-Miniapp-Session"] = token
+            if resp.headers.get("ETag"):
+                self._etags[path] = resp.headers["ETag"]
+        return resp.json() if resp.status_code == 200 else None
+
+    async def run(self, until: float) -> None:
+        rnd = random.Random()
+        while time.perf_counter() < until:
+            await self._get("/miniapp/api/me")
+            listing = await self._get("/miniapp/api/tenders")
+            items = (listing or {}).get("tenders") or []
+            tender_id = rnd.choice(items)["id"] if items else rnd.randint(1, self._tenders)
+            await self._get(f"/miniapp/api/tenders/{tender_id}")
+            await self._get("/miniapp/api/applications")
+
+
+def _percentile(values: list[float], q: float) -> float:
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else (values[0] if values else 0.0)
+
+
+async def run(args: argparse.Namespace, tg_ids: list[int]) -> None:
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=30)
+    else:
+        from web.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=30)
+    async with client:
+        vus = [_VirtualUser(client, tg_id, args.app_client, args.tenders) for tg_id in tg_ids[: args.users]]
+        # Прогрев: пул соединений, кэши процесса
+        await vus[0].run(time.perf_counter() + 1)
+        for vu in vus:
+            vu.latencies.clear()
+            vu.statuses.clear()
+        started = time.perf_counter()
+        await asyncio.gather(*(vu.run(started + args.duration) for vu in vus))
+        elapsed = time.perf_counter() - started
+
+    latencies = sorted(lat for vu in vus for lat in vu.latencies)
+    statuses: dict[int, int] = {}
+    for vu in vus:
+        for code, n in vu.statuses.items():
+            statuses[code] = statuses.get(code, 0) + n
+    print(f"Пользователей: {len(vus)}, длительность: {elapsed:.1f} с, режим: "
+          f"{'app.js (токен + ETag)' if args.app_client else 'initData в каждом запросе'}")
+    print(f"Запросов: {len(latencies)}, {len(latencies) / elapsed:.1f} запросов/с")
+    print(f"Задержка, мс: p50 {_percentile(latencies, 50) * 1000:.1f}, "
+          f"p95 {_percentile(latencies, 95) * 1000:.1f}, p99 {_percentile(latencies, 99) * 1000:.1f}")
+    print(f"Коды ответов: {dict(sorted(statuses.items()))}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50, help="Одновременных пользователей Mini App")
+    parser.add_argument("--duration", type=float, default=20.0, help="Длительность замера, с")
+    parser.add_argument("--tenders", type=int, default=2_000, help="Открытых тендеров в БД")
+    parser.add_argument("--app-client", action="store_true", help="Токен сессии и ETag, как app.js")
+    parser.add_argument("--url", help="Адрес запущенного сервера (по умолчанию — приложение в процессе)")
+    args = parser.parse_args()
+    _env.migrate()
+    tg_ids = asyncio.run(seed(max(args.users, 1), args.tenders))
+    asyncio.run(run(args, tg_ids))
@@ -0,0 +1,246 @@
+# services/cache_bus.py — межпроцессная инвалидация кэша и события (процессы бота и веб-приложения)
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterable, Optional
+
+from sqlalchemy import delete, event, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from config import settings
+from database.models import CacheInvalidation
+from database.session import get_async_session_maker, get_engine
+from utils.cache import get_cache
+
+logger = logging.getLogger(__name__)
+
+# Канал LISTEN/NOTIFY (PostgreSQL)
+_CHANNEL = "tenderbot_cache"
+# Payload NOTIFY ограничен 8000 байтами — ключи отправляем порциями
+_MAX_PAYLOAD = 7000
+# Как часто удалять старые записи cache_invalidations (SQLite), секунд
+_PRUNE_INTERVAL = 300
+# Сообщения шины с этим префиксом — события для подписчиков, а не ключи кэша: "event:<topic>\t<json>"
+_EVENT_PREFIX = "event:"
+
+# Получатели событий в этом процессе: handler(topic, payload)
+EventHandler = Callable[[str, dict], None]
+_event_handlers: list[EventHandler] = []
+
+
+def _utcnow() -> datetime:
+    """Текущее время UTC без tzinfo (колонки DateTime хранятся без часового пояса)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _chunk_payloads(keys: list[str]) -> Iterable[str]:
+    chunk: list[str] = []
+    size = 0
+    for key in keys:
+        if chunk and size + len(key) + 1 > _MAX_PAYLOAD:
+            yield "\n".join(chunk)
+            chunk, size = [], 0
+        chunk.append(key)
+        size += len(key) + 1
+    if chunk:
+        yield "\n".join(chunk)
+
+
+def add_event_handler(handler: EventHandler) -> None:
+    """Получать события шины в этом процессе (нужен запущенный слушатель: start_cache_listener)."""
+    _event_handlers.append(handler)
+
+
+def remove_event_handler(handler: EventHandler) -> None:
+    if handler in _event_handlers:
+        _event_handlers.remove(handler)
+
+
+def _dispatch_event(message: str) -> None:
+    topic, _, body = message[len(_EVENT_PREFIX):].partition("\t")
+    try:
+        payload = json.loads(body) if body else {}
+    except ValueError:
+        logger.warning(f"Malformed bus event for topic {topic}")
+        return
+    for handler in list(_event_handlers):
+        try:
+            handler(topic, payload)
+        except Exception as e:
+            logger.error(f"Bus event handler failed for topic {topic}: {e}", exc_info=True)
+
+
+def _invalidate_local(keys: Iterable[str], dispatch_events: bool = True) -> None:
+    cache = get_cache()
+    for key in keys:
+        if key.startswith(_EVENT_PREFIX):
+            if dispatch_events:
+                _dispatch_event(key)
+        else:
+            cache.delete(key)
+
+
+class CacheBus:
+    """Публикация изменений: ключи кэша сбрасываются во всех процессах после коммита текущей транзакции."""
+
+    @staticmethod
+    async def publish(session: AsyncSession, *keys: str) -> None:
+        """
+        Сбросить ключи кэша во всех процессах.
+        
+        Событие пишется в той же транзакции, что и изменение: при откате оно не уходит,
+        а в PostgreSQL NOTIFY доставляется только после коммита.
+        
+        Args:
+            session: Сессия БД текущей операции
+            keys: Ключи кэша (например, UserService.cache_key(tg_id))
+        """
+        keys = list(dict.fromkeys(k for k in keys if k))
+        if not keys:
+            return
+        if session.bind.dialect.name == "postgresql":
+            for payload in _chunk_payloads(keys):
+                await session.execute(select(func.pg_notify(_CHANNEL, payload)))
+        else:
+            now = _utcnow()
+            await session.execute(
+                insert(CacheInvalidation),
+                [{"cache_key": key, "created_at": now} for key in keys],
+            )
+        _invalidate_local_after_commit(session, keys)
+
+    @staticmethod
+    async def publish_event(session: AsyncSession, topic: str, payload: dict[str, Any]) -> None:
+        """
+        Отправить событие подписчикам topic во всех процессах (после коммита, как и ключи кэша).
+        Payload — небольшой JSON (идентификаторы и статусы): в SQLite он хранится в cache_key.
+        """
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        await CacheBus.publish(session, f"{_EVENT_PREFIX}{topic}\t{body}")
+
+
+def _invalidate_local_after_commit(session: AsyncSession, keys: list[str]) -> None:
+    """Свой процесс сбрасываем сразу после коммита, не дожидаясь события из БД."""
+    session.sync_session.info.setdefault("cache_bus_keys", []).extend(keys)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_published_keys(session: Session) -> None:
+    # События доставляет только слушатель (и в этот же процесс) — иначе они пришли бы дважды
+    keys = session.info.pop("cache_bus_keys", None)
+    if keys:
+        _invalidate_local(keys, dispatch_events=False)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_published_keys(session: Session, _previous_transaction) -> None:
+    # Откат: изменения не сохранены, сбрасывать нечего
+    session.info.pop("cache_bus_keys", None)
+
+
+class CacheInvalidationListener:
+    """Фоновая задача процесса: получает события шины и сбрасывает ключи в локальном кэше."""
+
+    def __init__(self):
+        self._stopping = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="cache-invalidation-listener")
+        logger.info("Cache invalidation listener started")
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout=5)
+            except asyncio.TimeoutError:
+                self._task.cancel()
+        logger.info("Cache invalidation listener stopped")
+
+    async def _run(self) -> None:
+        if get_engine().dialect.name == "postgresql":
+            runner = self._listen_postgres
+        else:
+            runner = self._poll_table
+        while not self._stopping.is_set():
+            try:
+                await runner()
+            except Exception as e:
+                logger.error(f"Cache invalidation listener failed: {e}", exc_info=True)
+            if not self._stopping.is_set():
+                # Пока слушатель не работал, события могли потеряться — сбрасываем весь локальный кэш
+                get_cache().clear()
+                await self._sleep(settings.CACHE_BUS_POLL_INTERVAL)
+
+    async def _sleep(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _listen_postgres(self) -> None:
+        def on_notify(_conn, _pid, _channel, payload: str) -> None:
+            _invalidate_local(payload.split("\n"))
+
+        async with get_engine().connect() as conn:
+            raw = await conn.get_raw_connection()
+            driver_conn = raw.driver_connection
+            await driver_conn.add_listener(_CHANNEL, on_notify)
+            try:
+                # Соединение держим открытым; периодически проверяем, что оно живо
+                while not self._stopping.is_set() and not driver_conn.is_closed():
+                    await self._sleep(settings.CACHE_BUS_POLL_INTERVAL * 10)
+            finally:
+                if not driver_conn.is_closed():
+                    await driver_conn.remove_listener(_CHANNEL, on_notify)
+
+    async def _poll_table(self) -> None:
+        """SQLite: опрос таблицы cache_invalidations по возрастанию id."""
+        session_maker = get_async_session_maker()
+        async with session_maker() as session:
+            last_id = (await session.execute(select(func.max(CacheInvalidation.id)))).scalar() or 0
+        next_prune = time.monotonic()
+        while not self._stopping.is_set():
+            async with session_maker() as session:
+                rows = (await session.execute(
+                    select(CacheInvalidation.id, CacheInvalidation.cache_key)
+                    .where(CacheInvalidation.id > last_id)
+                    .order_by(CacheInvalidation.id)
+                    .limit(1000)
+                )).all()
+                if rows:
+                    last_id = rows[-1].id
+                    _invalidate_local(row.cache_key for row in rows)
+                if time.monotonic() >= next_prune:
+                    cutoff = _utcnow() - timedelta(seconds=settings.CACHE_BUS_RETENTION)
+                    await session.execute(delete(CacheInvalidation).where(CacheInvalidation.created_at < cutoff))
+                    await session.commit()
+                    next_prune = time.monotonic() + _PRUNE_INTERVAL
+            if len(rows) < 1000:
+                await self._sleep(settings.CACHE_BUS_POLL_INTERVAL)
+
+
+_listener: Optional[CacheInvalidationListener] = None
+_listener_users = 0
+
+
+def start_cache_listener() -> None:
+    """Запустить слушатель шины (один на процесс, даже если бот и веб работают в одном процессе)."""
+    global _listener, _listener_users
+    _listener_users += 1
+    if _listener is None:
+        _listener = CacheInvalidationListener()
+        _listener.start()
+
+
+async def stop_cache_listener() -> None:
+    global _listener, _listener_users
+    _listener_users = max(0, _listener_users - 1)
+    if _listener_users == 0 and _listener is not None:
+        listener = _listener
+        _listener = None
+        await listener.stop()
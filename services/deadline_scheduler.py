@@ -0,0 +1,273 @@
+# services/deadline_scheduler.py — закрытие тендеров по сроку и напоминания о приближении срока
+import asyncio
+import heapq
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from database.models import Tender, TenderApplication, TenderStatus
+from database.session import get_async_session_maker
+from services.cache_bus import CacheBus, add_event_handler, remove_event_handler
+from services.outbox import OutboxService
+from services.stats_service import StatsService
+
+logger = logging.getLogger(__name__)
+
+# Топик шины: срок или статус тендера изменился — планировщик перечитывает тендер
+DEADLINES_TOPIC = "deadlines"
+
+# Виды записей в куче (при равном времени сначала напоминание, потом закрытие)
+_REMIND = 0
+_CLOSE = 1
+
+
+def _utcnow() -> datetime:
+    """Текущее время UTC без tzinfo (колонки DateTime хранятся без часового пояса)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Срок из БД (без tzinfo, UTC) или из формы (с tzinfo) — к naive UTC для сравнения."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _format_left(seconds: float) -> str:
+    if seconds < 3600:
+        return "меньше часа."
+    hours = round(seconds / 3600)
+    return f"около {hours} ч." if hours < 48 else f"около {round(hours / 24)} дн."
+
+
+class DeadlineService:
+    """Сообщить планировщику об изменении срока (вызывать до коммита, в сессии изменения)."""
+
+    @staticmethod
+    async def publish(session: AsyncSession, tender_id: int) -> None:
+        await CacheBus.publish_event(session, DEADLINES_TOPIC, {"tender_id": tender_id})
+
+    @staticmethod
+    async def deadline_updated(
+        session: AsyncSession,
+        tender: Tender,
+        previous_deadline: Optional[datetime],
+    ) -> None:
+        """Срок перенесён — напоминание будет отправлено заново для нового срока."""
+        if _as_utc(previous_deadline) != _as_utc(tender.deadline):
+            tender.reminder_sent_at = None
+        await DeadlineService.publish(session, tender.id)
+
+
+class DeadlineScheduler:
+    """
+    Фоновая задача процесса бота: min-heap ближайших сроков открытых тендеров.
+
+    В куче — только тендеры со сроком в пределах горизонта (интервал пересинхронизации
+    плюс время напоминания); дальние подхватываются периодической пересинхронизацией.
+    Изменения сроков приходят событиями шины (DeadlineService.publish). Запись в куче —
+    лишь будильник: закрытие и напоминание делаются условным UPDATE, поэтому устаревшие
+    записи (срок перенесли, тендер закрыли вручную) и несколько процессов бота безопасны.
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[float, int, int]] = []
+        # Срок (epoch), на который поставлены записи тендера, — остальные записи устарели
+        self._scheduled: dict[int, float] = {}
+        self._changed: set[int] = set()
+        self._wakeup_event = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+        self._next_resync = 0.0
+
+    def start(self) -> None:
+        add_event_handler(self._on_bus_event)
+        self._task = asyncio.create_task(self._run(), name="deadline-scheduler")
+        logger.info("Deadline scheduler started")
+
+    async def stop(self) -> None:
+        remove_event_handler(self._on_bus_event)
+        self._stopping = True
+        self._wakeup_event.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout=10)
+            except asyncio.TimeoutError:
+                self._task.cancel()
+        logger.info("Deadline scheduler stopped")
+
+    def _on_bus_event(self, topic: str, payload: dict) -> None:
+        if topic == DEADLINES_TOPIC and payload.get("tender_id"):
+            self._changed.add(int(payload["tender_id"]))
+            self._wakeup_event.set()
+
+    def _horizon(self) -> datetime:
+        return _utcnow() + timedelta(
+            seconds=settings.DEADLINE_RESYNC_INTERVAL + settings.DEADLINE_REMINDER_BEFORE
+        )
+
+    def _schedule(self, tender_id: int, deadline: Optional[datetime], reminder_sent: bool) -> None:
+        if deadline is None:
+            self._scheduled.pop(tender_id, None)
+            return
+        at = deadline.replace(tzinfo=timezone.utc).timestamp()
+        if self._scheduled.get(tender_id) == at:
+            return
+        self._scheduled[tender_id] = at
+        heapq.heappush(self._heap, (at, _CLOSE, tender_id))
+        if settings.DEADLINE_REMINDER_BEFORE and not reminder_sent:
+            heapq.heappush(self._heap, (at - settings.DEADLINE_REMINDER_BEFORE, _REMIND, tender_id))
+
+    def _open_tenders_query(self):
+        return select(Tender.id, Tender.deadline, Tender.reminder_sent_at).where(
+            Tender.status == TenderStatus.OPEN.value,
+            Tender.deadline.is_not(None),
+            Tender.deadline <= self._horizon(),
+        )
+
+    async def _resync(self) -> None:
+        """Полная загрузка ближайших сроков (при старте и раз в DEADLINE_RESYNC_INTERVAL)."""
+        async with get_async_session_maker()() as session:
+            rows = (await session.execute(self._open_tenders_query())).all()
+        self._heap = []
+        self._scheduled = {}
+        for tender_id, deadline, reminder_sent_at in rows:
+            self._schedule(tender_id, deadline, reminder_sent_at is not None)
+        self._next_resync = time.monotonic() + settings.DEADLINE_RESYNC_INTERVAL
+        logger.debug(f"Deadline scheduler resynced: {len(rows)} tenders")
+
+    async def _reload_changed(self) -> None:
+        ids, self._changed = list(self._changed), set()
+        async with get_async_session_maker()() as session:
+            rows = (await session.execute(self._open_tenders_query().where(Tender.id.in_(ids)))).all()
+        found = set()
+        for tender_id, deadline, reminder_sent_at in rows:
+            found.add(tender_id)
+            self._schedule(tender_id, deadline, reminder_sent_at is not None)
+        # Закрыт, удалён, срок снят или отодвинут за горизонт — старые записи больше не нужны
+        for tender_id in set(ids) - found:
+            self._scheduled.pop(tender_id, None)
+
+    def _pop_due(self) -> tuple[list[int], list[int]]:
+        now = time.time()
+        close_ids: list[int] = []
+        remind_ids: list[int] = []
+        while self._heap and self._heap[0][0] <= now and len(close_ids) + len(remind_ids) < settings.DEADLINE_BATCH_SIZE:
+            at, kind, tender_id = heapq.heappop(self._heap)
+            scheduled = self._scheduled.get(tender_id)
+            if kind == _CLOSE:
+                if scheduled != at:
+                    continue
+                self._scheduled.pop(tender_id, None)
+                close_ids.append(tender_id)
+            elif scheduled is not None and scheduled - settings.DEADLINE_REMINDER_BEFORE == at:
+                remind_ids.append(tender_id)
+        return close_ids, remind_ids
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                if time.monotonic() >= self._next_resync:
+                    await self._resync()
+                elif self._changed:
+                    await self._reload_changed()
+                close_ids, remind_ids = self._pop_due()
+                if remind_ids:
+                    await self._send_reminders(remind_ids)
+                if close_ids:
+                    await self._close(close_ids)
+                if close_ids or remind_ids:
+                    # Могли остаться просроченные сверх пачки — продолжаем без ожидания
+                    continue
+            except Exception as e:
+                logger.error(f"Deadline scheduler iteration failed: {e}", exc_info=True)
+                self._next_resync = 0.0
+                await self._sleep(settings.DEADLINE_RESYNC_INTERVAL / 10)
+                continue
+            timeout = self._next_resync - time.monotonic()
+            if self._heap:
+                timeout = min(timeout, self._heap[0][0] - time.time())
+            await self._sleep(max(timeout, 0.0))
+
+    async def _sleep(self, seconds: float) -> None:
+        self._wakeup_event.clear()
+        if self._changed or self._stopping:
+            return
+        try:
+            await asyncio.wait_for(self._wakeup_event.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    @staticmethod
+    async def _application_counts(session: AsyncSession, ids: list[int]) -> dict[int, int]:
+        rows = await session.execute(
+            select(TenderApplication.tender_id, func.count(TenderApplication.id))
+            .where(TenderApplication.tender_id.in_(ids))
+            .group_by(TenderApplication.tender_id)
+        )
+        return dict(rows.all())
+
+    async def _close(self, ids: list[int]) -> None:
+        """Закрыть просроченные одним UPDATE; уведомить создателей закрытых этим процессом."""
+        now = _utcnow()
+        async with get_async_session_maker()() as session:
+            closed = (await session.execute(
+                update(Tender)
+                .where(
+                    Tender.id.in_(ids),
+                    Tender.status == TenderStatus.OPEN.value,
+                    Tender.deadline <= now,
+                )
+                .values(status=TenderStatus.CLOSED.value)
+                .returning(Tender.id, Tender.title, Tender.created_by_tg_id)
+            )).all()
+            if closed:
+                counts = await self._application_counts(session, [row.id for row in closed])
+                for row in closed:
+                    await OutboxService.enqueue(
+                        session,
+                        row.created_by_tg_id or settings.ADMIN_ID,
+                        f"⏰ <b>Приём откликов закрыт</b>\n\n"
+                        f"Срок по тендеру «{row.title}» истёк. Откликов: {counts.get(row.id, 0)}.",
+                    )
+                # UPDATE в обход ORM: счётчики тендеров по статусам в снимке статистики устарели
+                await StatsService.invalidate(session)
+            await session.commit()
+        if closed:
+            logger.info(f"Closed {len(closed)} tenders by deadline")
+        # Остальные уже закрыты вручную или срок перенесён — перечитаем их
+        self._changed.update(set(ids) - {row.id for row in closed})
+
+    async def _send_reminders(self, ids: list[int]) -> None:
+        """Отметить reminder_sent_at (условно — отправляет только один процесс) и поставить напоминания в outbox."""
+        now = _utcnow()
+        async with get_async_session_maker()() as session:
+            due = (await session.execute(
+                update(Tender)
+                .where(
+                    Tender.id.in_(ids),
+                    Tender.status == TenderStatus.OPEN.value,
+                    Tender.reminder_sent_at.is_(None),
+                    Tender.deadline > now,
+                    Tender.deadline <= now + timedelta(seconds=settings.DEADLINE_REMINDER_BEFORE),
+                )
+                .values(reminder_sent_at=now)
+                .returning(Tender.id, Tender.title, Tender.deadline, Tender.created_by_tg_id)
+            )).all()
+            if due:
+                counts = await self._application_counts(session, [row.id for row in due])
+                for row in due:
+                    left = (row.deadline - now).total_seconds()
+                    await OutboxService.enqueue(
+                        session,
+                        row.created_by_tg_id or settings.ADMIN_ID,
+                        f"⏳ <b>Скоро окончание приёма откликов</b>\n\n"
+                        f"Тендер «{row.title}»: осталось {_format_left(left)} "
+                        f"Откликов: {counts.get(row.id, 0)}. Не забудьте выбрать исполнителя.",
+                    )
+            await session.commit()
@@ -0,0 +1,393 @@
+# services/outbox.py — очередь исходящих уведомлений (outbox) и фоновый воркер рассылки
+import asyncio
+import logging
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramNotFound,
+    TelegramRetryAfter,
+)
+from aiogram.types import InlineKeyboardMarkup
+from sqlalchemy import event, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from database.models import NotificationBatch, NotificationOutbox, OutboxStatus
+from database.session import get_async_session_maker
+
+logger = logging.getLogger(__name__)
+
+# Сколько строк вставлять одним executemany
+_INSERT_CHUNK = 1000
+# Потолок экспоненциальной задержки между повторами, секунд
+_MAX_BACKOFF = 300
+
+
+def _utcnow() -> datetime:
+    """Текущее время UTC без tzinfo (колонки DateTime хранятся без часового пояса)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class OutboxService:
+    """Постановка сообщений в outbox в рамках текущей транзакции."""
+
+    @staticmethod
+    async def create_batch(
+        session: AsyncSession,
+        kind: str,
+        *,
+        tender_id: Optional[int] = None,
+        report_chat_id: Optional[int] = None,
+        report_message_id: Optional[int] = None,
+        report_text: Optional[str] = None,
+    ) -> NotificationBatch:
+        """
+        Создать рассылку. Если задано сообщение для отчёта, воркер дописывает в него прогресс.
+
+        Args:
+            session: Сессия БД
+            kind: Тип рассылки (например, "tender_publish")
+            tender_id: ID тендера, к которому относится рассылка
+            report_chat_id: Чат сообщения с прогрессом
+            report_message_id: ID сообщения с прогрессом
+            report_text: Исходный текст сообщения, к которому добавляется строка прогресса
+
+        Returns:
+            NotificationBatch (с id после flush)
+        """
+        batch = NotificationBatch(
+            kind=kind,
+            tender_id=tender_id,
+            total=0,
+            sent=0,
+            failed=0,
+            report_chat_id=report_chat_id,
+            report_message_id=report_message_id,
+            report_text=report_text,
+        )
+        session.add(batch)
+        await session.flush()
+        return batch
+
+    @staticmethod
+    async def enqueue_many(
+        session: AsyncSession,
+        chat_ids: Iterable[int],
+        text: str,
+        reply_markup: Optional[InlineKeyboardMarkup] = None,
+        batch: Optional[NotificationBatch] = None,
+    ) -> int:
+        """
+        Поставить одно и то же сообщение в очередь для набора чатов.
+
+        Returns:
+            Количество поставленных сообщений
+        """
+        markup = reply_markup.model_dump(exclude_none=True) if reply_markup else None
+        batch_id = batch.id if batch is not None else None
+        count = 0
+        chunk: list[dict] = []
+        for chat_id in chat_ids:
+            chunk.append({
+                "batch_id": batch_id,
+                "chat_id": chat_id,
+                "text": text,
+                "reply_markup": markup,
+                "status": OutboxStatus.PENDING.value,
+                "attempts": 0,
+                "created_at": _utcnow(),
+            })
+            if len(chunk) >= _INSERT_CHUNK:
+                await session.execute(insert(NotificationOutbox), chunk)
+                count += len(chunk)
+                chunk = []
+        if chunk:
+            await session.execute(insert(NotificationOutbox), chunk)
+            count += len(chunk)
+        if batch is not None:
+            batch.total += count
+            if count == 0:
+                batch.finished_at = _utcnow()
+        if count:
+            _wake_worker_after_commit(session)
+        return count
+
+    @staticmethod
+    async def enqueue(
+        session: AsyncSession,
+        chat_id: int,
+        text: str,
+        reply_markup: Optional[InlineKeyboardMarkup] = None,
+    ) -> None:
+        """Поставить в очередь одно сообщение."""
+        await OutboxService.enqueue_many(session, [chat_id], text, reply_markup)
+
+
+def _wake_worker_after_commit(session: AsyncSession) -> None:
+    """Разбудить воркер сразу после коммита, не дожидаясь очередного опроса."""
+    sync_session = session.sync_session
+    if sync_session.info.get("outbox_wakeup"):
+        return
+    sync_session.info["outbox_wakeup"] = True
+
+    def _on_commit(_session) -> None:
+        _session.info.pop("outbox_wakeup", None)
+        if _worker is not None:
+            _worker.wakeup()
+
+    event.listen(sync_session, "after_commit", _on_commit, once=True)
+
+
+class _RateLimiter:
+    """Равномерный темп отправки на весь бот: слоты через 1/rate секунд, плюс глобальная пауза."""
+
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate
+        self._next_slot = 0.0
+        self._paused_until = 0.0
+
+    def pause(self, seconds: float) -> None:
+        """Telegram вернул RetryAfter: все отправки ждут указанное время."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self) -> None:
+        now = time.monotonic()
+        slot = max(self._next_slot, now, self._paused_until)
+        self._next_slot = slot + self._interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+        # Пауза могла начаться, пока ждали свой слот
+        while (delay := self._paused_until - time.monotonic()) > 0:
+            await asyncio.sleep(delay)
+
+
+class OutboxWorker:
+    """Фоновый воркер: забирает pending-записи пачками и отправляет с учётом лимитов Telegram."""
+
+    def __init__(self, bot: Bot):
+        self._bot = bot
+        self._limiter = _RateLimiter(settings.OUTBOX_GLOBAL_RATE)
+        self._chat_last_sent: dict[int, float] = {}
+        self._last_report: dict[int, float] = {}
+        self._wakeup_event = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        global _worker
+        _worker = self
+        self._task = asyncio.create_task(self._run(), name="outbox-worker")
+        logger.info("Outbox worker started")
+
+    async def stop(self) -> None:
+        global _worker
+        self._stopping = True
+        self._wakeup_event.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout=10)
+            except asyncio.TimeoutError:
+                self._task.cancel()
+        if _worker is self:
+            _worker = None
+        logger.info("Outbox worker stopped")
+
+    def wakeup(self) -> None:
+        self._wakeup_event.set()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                processed = await self._process_chunk()
+            except Exception as e:
+                logger.error(f"Outbox worker iteration failed: {e}", exc_info=True)
+                processed = 0
+            if processed == 0 and not self._stopping:
+                try:
+                    await asyncio.wait_for(self._wakeup_event.wait(), timeout=settings.OUTBOX_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup_event.clear()
+
+    async def _process_chunk(self) -> int:
+        """Один проход: выбрать до OUTBOX_BATCH_SIZE записей, отправить, сохранить статусы."""
+        session_maker = get_async_session_maker()
+        async with session_maker() as session:
+            stmt = (
+                select(NotificationOutbox)
+                .where(
+                    NotificationOutbox.status == OutboxStatus.PENDING.value,
+                    or_(
+                        NotificationOutbox.next_attempt_at.is_(None),
+                        NotificationOutbox.next_attempt_at <= _utcnow(),
+                    ),
+                )
+                .order_by(NotificationOutbox.id)
+                .limit(settings.OUTBOX_BATCH_SIZE)
+            )
+            if session.bind.dialect.name == "postgresql":
+                # Несколько процессов бота не возьмут одни и те же записи
+                stmt = stmt.with_for_update(skip_locked=True)
+            rows = (await session.execute(stmt)).scalars().all()
+            if not rows:
+                return 0
+
+            # Сообщения в один чат — последовательно, разные чаты — параллельно
+            by_chat: dict[int, list[NotificationOutbox]] = defaultdict(list)
+            for row in rows:
+                by_chat[row.chat_id].append(row)
+            semaphore = asyncio.Semaphore(settings.OUTBOX_CONCURRENCY)
+            outcomes = await asyncio.gather(
+                *(self._deliver_chat(semaphore, chat_rows) for chat_rows in by_chat.values())
+            )
+
+            sent: Counter = Counter()
+            failed: Counter = Counter()
+            for chat_outcomes in outcomes:
+                for batch_id, status in chat_outcomes:
+                    if batch_id is None:
+                        continue
+                    if status == OutboxStatus.SENT.value:
+                        sent[batch_id] += 1
+                    elif status == OutboxStatus.FAILED.value:
+                        failed[batch_id] += 1
+            batches = await self._update_batches(session, sent, failed)
+            await session.commit()
+
+        for batch in batches:
+            await self._report_progress(batch)
+        self._prune_chat_history()
+        return len(rows)
+
+    async def _deliver_chat(
+        self,
+        semaphore: asyncio.Semaphore,
+        rows: list[NotificationOutbox],
+    ) -> list[tuple[Optional[int], str]]:
+        outcomes = []
+        async with semaphore:
+            for row in rows:
+                await self._deliver(row)
+                outcomes.append((row.batch_id, row.status))
+        return outcomes
+
+    async def _deliver(self, row: NotificationOutbox) -> None:
+        """Отправить одно сообщение; результат записывается в поля row (коммит — в _process_chunk)."""
+        last_sent = self._chat_last_sent.get(row.chat_id)
+        if last_sent is not None:
+            delay = last_sent + settings.OUTBOX_PER_CHAT_INTERVAL - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await self._limiter.acquire()
+
+        row.attempts += 1
+        try:
+            markup = InlineKeyboardMarkup.model_validate(row.reply_markup) if row.reply_markup else None
+            await self._bot.send_message(row.chat_id, row.text, reply_markup=markup)
+        except TelegramRetryAfter as e:
+            # Флуд-контроль: притормаживаем весь бот, запись повторим после паузы (попытку не считаем)
+            self._limiter.pause(e.retry_after)
+            row.attempts -= 1
+            row.next_attempt_at = _utcnow() + timedelta(seconds=e.retry_after)
+            row.last_error = f"RetryAfter {e.retry_after}s"
+            logger.warning(f"Outbox: flood control, pausing sends for {e.retry_after}s")
+        except (TelegramForbiddenError, TelegramNotFound, TelegramBadRequest) as e:
+            # Пользователь заблокировал бота, чат не найден и т.п. — повтор не поможет
+            row.status = OutboxStatus.FAILED.value
+            row.last_error = str(e)[:1000]
+            logger.info(f"Outbox: message {row.id} to {row.chat_id} failed permanently: {e}")
+        except Exception as e:
+            row.last_error = str(e)[:1000]
+            if row.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                row.status = OutboxStatus.FAILED.value
+                logger.warning(f"Outbox: message {row.id} to {row.chat_id} failed after {row.attempts} attempts: {e}")
+            else:
+                backoff = min(2 ** row.attempts, _MAX_BACKOFF)
+                row.next_attempt_at = _utcnow() + timedelta(seconds=backoff)
+                logger.warning(f"Outbox: message {row.id} to {row.chat_id} will be retried in {backoff}s: {e}")
+        else:
+            row.status = OutboxStatus.SENT.value
+            row.sent_at = _utcnow()
+            row.last_error = None
+        finally:
+            self._chat_last_sent[row.chat_id] = time.monotonic()
+
+    async def _update_batches(
+        self,
+        session: AsyncSession,
+        sent: Counter,
+        failed: Counter,
+    ) -> list[NotificationBatch]:
+        """Атомарно увеличить счётчики рассылок и отметить завершённые."""
+        batch_ids = set(sent) | set(failed)
+        if not batch_ids:
+            return []
+        for batch_id in batch_ids:
+            await session.execute(
+                update(NotificationBatch)
+                .where(NotificationBatch.id == batch_id)
+                .values(
+                    sent=NotificationBatch.sent + sent[batch_id],
+                    failed=NotificationBatch.failed + failed[batch_id],
+                )
+            )
+        result = await session.execute(
+            select(NotificationBatch)
+            .where(NotificationBatch.id.in_(batch_ids))
+            .execution_options(populate_existing=True)
+        )
+        batches = result.scalars().all()
+        for batch in batches:
+            if batch.finished_at is None and batch.sent + batch.failed >= batch.total:
+                batch.finished_at = _utcnow()
+                logger.info(
+                    f"Notification batch {batch.id} ({batch.kind}) finished: "
+                    f"sent {batch.sent}, failed {batch.failed} of {batch.total}"
+                )
+        return list(batches)
+
+    async def _report_progress(self, batch: NotificationBatch) -> None:
+        """Обновить сообщение админа (не чаще OUTBOX_PROGRESS_INTERVAL, финал — всегда)."""
+        if batch.report_chat_id is None or batch.report_message_id is None:
+            return
+        finished = batch.finished_at is not None
+        now = time.monotonic()
+        if not finished and now - self._last_report.get(batch.id, 0.0) < settings.OUTBOX_PROGRESS_INTERVAL:
+            return
+        self._last_report[batch.id] = now
+        if finished:
+            self._last_report.pop(batch.id, None)
+            line = f"📨 Уведомления отправлены {batch.sent} из {batch.total}."
+        else:
+            line = f"📨 Рассылка: {batch.sent + batch.failed} из {batch.total}…"
+        if batch.failed:
+            line += f" Не доставлено: {batch.failed}."
+        text = f"{batch.report_text}\n{line}" if batch.report_text else line
+        try:
+            await self._bot.edit_message_text(
+                text=text,
+                chat_id=batch.report_chat_id,
+                message_id=batch.report_message_id,
+                parse_mode=None,
+            )
+        except Exception as e:
+            logger.debug(f"Failed to update progress for batch {batch.id}: {e}")
+
+    def _prune_chat_history(self) -> None:
+        """Забыть чаты, интервал для которых уже истёк."""
+        if len(self._chat_last_sent) < 10000:
+            return
+        threshold = time.monotonic() - settings.OUTBOX_PER_CHAT_INTERVAL
+        self._chat_last_sent = {
+            chat_id: ts for chat_id, ts in self._chat_last_sent.items() if ts > threshold
+        }
+
+
+# Воркер текущего процесса (для пробуждения после коммита)
+_worker: Optional[OutboxWorker] = None
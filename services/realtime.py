@@ -0,0 +1,44 @@
+# services/realtime.py — события для живого обновления Mini App и веб-панели (через шину CacheBus)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import SupportTicket, TenderApplication
+from services.cache_bus import CacheBus
+
+# Топик администраторов веб-панели (тикеты поддержки)
+ADMIN_TOPIC = "admin"
+
+
+def user_topic(user_id: int) -> str:
+    """Топик пользователя Mini App (его отклики)."""
+    return f"user:{user_id}"
+
+
+class RealtimeEvents:
+    """
+    Публикация событий. Вызывать до коммита, в той же сессии, что и изменение:
+    событие уходит только если транзакция закоммичена.
+    """
+
+    @staticmethod
+    async def application_status(session: AsyncSession, app: TenderApplication) -> None:
+        """Статус отклика изменился (выбран исполнителем, отклонён)."""
+        await CacheBus.publish_event(session, user_topic(app.user_id), {
+            "type": "application",
+            "id": app.id,
+            "tender_id": app.tender_id,
+            "status": app.status,
+        })
+
+    @staticmethod
+    async def support_ticket(session: AsyncSession, ticket: SupportTicket) -> None:
+        """Пользователь открыл новый тикет."""
+        await CacheBus.publish_event(session, ADMIN_TOPIC, {"type": "support_ticket", "ticket_id": ticket.id})
+
+    @staticmethod
+    async def support_message(session: AsyncSession, ticket: SupportTicket, author: str) -> None:
+        """Новое сообщение в тикете (от пользователя или ответ админа)."""
+        await CacheBus.publish_event(session, ADMIN_TOPIC, {
+            "type": "support_message",
+            "ticket_id": ticket.id,
+            "author": author,
+        })
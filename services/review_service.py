@@ -0,0 +1,94 @@
+# services/review_service.py — отзывы и агрегаты рейтинга пользователей
+import logging
+from typing import Any, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import Review, User
+from services.stats_service import StatsService
+
+logger = logging.getLogger(__name__)
+
+
+class ReviewService:
+    """
+    Запись и удаление отзывов.
+
+    users.rating_sum / users.rating_count меняются в той же транзакции, что и отзыв,
+    инкрементом на стороне БД (без чтения текущего значения), поэтому конкурентные
+    отзывы не теряют обновлений. Отзывы удаляйте только через этот сервис.
+    """
+
+    @staticmethod
+    async def create_review(
+        session: AsyncSession,
+        *,
+        tender_id: int,
+        application_id: int,
+        from_user_id: int,
+        to_user_id: int,
+        rating: int,
+        comment: Optional[str] = None,
+    ) -> Review:
+        """Создать отзыв и учесть оценку в рейтинге получателя."""
+        review = Review(
+            tender_id=tender_id,
+            application_id=application_id,
+            from_user_id=from_user_id,
+            to_user_id=to_user_id,
+            rating=rating,
+            comment=comment,
+        )
+        session.add(review)
+        await session.flush()
+        await session.execute(
+            update(User)
+            .where(User.id == to_user_id)
+            .values(rating_sum=User.rating_sum + rating, rating_count=User.rating_count + 1)
+        )
+        return review
+
+    @staticmethod
+    async def delete_review(session: AsyncSession, review: Review) -> None:
+        """Удалить отзыв и вычесть оценку из рейтинга получателя."""
+        await session.execute(
+            update(User)
+            .where(User.id == review.to_user_id)
+            .values(rating_sum=User.rating_sum - review.rating, rating_count=User.rating_count - 1)
+        )
+        await session.delete(review)
+
+    @staticmethod
+    async def delete_reviews_where(session: AsyncSession, *criteria: Any) -> int:
+        """
+        Удалить отзывы по условию с пересчётом рейтингов (перед удалением тендера,
+        отклика или пользователя — чтобы каскад не оставил агрегаты рассинхронизированными).
+        Каскад в БД удаляет и отклики мимо ORM, поэтому снимок статистики сбрасывается.
+
+        Returns:
+            Количество удалённых отзывов
+        """
+        result = await session.execute(
+            select(Review.to_user_id, func.sum(Review.rating), func.count(Review.id))
+            .where(*criteria)
+            .group_by(Review.to_user_id)
+        )
+        removed = 0
+        for to_user_id, rating_sum, rating_count in result.all():
+            await session.execute(
+                update(User)
+                .where(User.id == to_user_id)
+                .values(
+                    rating_sum=User.rating_sum - rating_sum,
+                    rating_count=User.rating_count - rating_count,
+                )
+            )
+            removed += rating_count
+        if removed:
+            await session.execute(
+                delete(Review).where(*criteria).execution_options(synchronize_session=False)
+            )
+            logger.info(f"Removed {removed} reviews with rating recalculation")
+        await StatsService.invalidate(session)
+        return removed
@@ -0,0 +1,225 @@
+# services/stats_service.py — сводная статистика для дашборда веб-панели и /stats бота
+import logging
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import event, func, inspect, literal, null, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from config import settings
+from database.models import Tender, TenderApplication, User
+from database.session import get_async_session_maker
+from services.cache_bus import CacheBus
+from utils.cache import cached, get_cache
+
+logger = logging.getLogger(__name__)
+
+_CACHE_KEY = "stats:snapshot"
+# Ключ изменения, которое нельзя отнести к счётчику: снимок сбрасывается вместо обновления
+_UNKNOWN = ("unknown",)
+
+
+class StatsSnapshot:
+    """
+    Счётчики на момент расчёта; между пересчётами дополняются изменениями из закоммиченных транзакций.
+
+    Изменения видны только из ORM-flush'ей этого процесса: записи другого процесса (бот или веб)
+    попадают в снимок при пересчёте — не позже чем через STATS_CACHE_TTL. Массовые UPDATE/DELETE
+    без ORM сбрасывают снимок во всех процессах через StatsService.invalidate.
+    """
+
+    def __init__(
+        self,
+        day: date,
+        users_by_role_status: dict[tuple[str, str], int],
+        tenders_by_status: dict[str, int],
+        apps_today: int,
+        apps_week: int,
+    ):
+        self.day = day
+        self.users_by_role_status = users_by_role_status
+        self.tenders_by_status = tenders_by_status
+        self.apps_today = apps_today
+        self.apps_week = apps_week
+
+    @property
+    def users_total(self) -> int:
+        return sum(self.users_by_role_status.values())
+
+    @property
+    def tenders_total(self) -> int:
+        return sum(self.tenders_by_status.values())
+
+    @property
+    def users_by_role(self) -> list[tuple[str, int]]:
+        by_role: Counter = Counter()
+        for (role, _status), count in self.users_by_role_status.items():
+            by_role[role] += count
+        # role допускает NULL — None сортируется как пустая строка
+        return sorted(by_role.items(), key=lambda kv: (kv[0] or "", kv[1]))
+
+    def apply(self, delta: Counter) -> None:
+        for key, change in delta.items():
+            kind = key[0]
+            if kind == "user":
+                counts, item = self.users_by_role_status, key[1:]
+            elif kind == "tender":
+                counts, item = self.tenders_by_status, key[1]
+            else:
+                # ("apps", за сегодня, за неделю): удаление старого отклика не трогает свежие счётчики
+                _kind, today, week = key
+                if today:
+                    self.apps_today = max(self.apps_today + change, 0)
+                if week:
+                    self.apps_week = max(self.apps_week + change, 0)
+                continue
+            value = counts.get(item, 0) + change
+            if value > 0:
+                counts[item] = value
+            else:
+                counts.pop(item, None)
+
+
+def _day_bounds() -> tuple[date, datetime, datetime]:
+    now = datetime.now(timezone.utc)
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    return today.date(), today, today - timedelta(days=7)
+
+
+class StatsService:
+    """Статистика одним запросом к БД (UNION ALL) с кэшированием снимка на STATS_CACHE_TTL секунд."""
+
+    @staticmethod
+    async def get_snapshot() -> StatsSnapshot:
+        """Текущий снимок: из кэша или новый расчёт (одновременные запросы ждут один расчёт)."""
+        snapshot: StatsSnapshot = await cached(_CACHE_KEY, settings.STATS_CACHE_TTL, StatsService._compute)
+        if snapshot.day != _day_bounds()[0]:
+            # Наступили новые сутки — «сегодня» и «за неделю» нужно пересчитать
+            get_cache().delete(_CACHE_KEY)
+            snapshot = await cached(_CACHE_KEY, settings.STATS_CACHE_TTL, StatsService._compute)
+        return snapshot
+
+    @staticmethod
+    async def invalidate(session: AsyncSession) -> None:
+        """Сбросить снимок во всех процессах после коммита (массовые изменения в обход ORM)."""
+        await CacheBus.publish(session, _CACHE_KEY)
+
+    @staticmethod
+    async def _compute() -> StatsSnapshot:
+        day, today, week_ago = _day_bounds()
+        stmt = union_all(
+            select(literal("user"), User.role, User.status, func.count())
+            .group_by(User.role, User.status),
+            select(literal("tender"), Tender.status, null(), func.count())
+            .group_by(Tender.status),
+            select(literal("apps_today"), null(), null(), func.count())
+            .where(TenderApplication.created_at >= today),
+            select(literal("apps_week"), null(), null(), func.count())
+            .where(TenderApplication.created_at >= week_ago),
+        )
+        session_maker = get_async_session_maker()
+        async with session_maker() as session:
+            rows = (await session.execute(stmt)).all()
+
+        users: dict[tuple[str, str], int] = {}
+        tenders: dict[str, int] = {}
+        apps_today = apps_week = 0
+        for kind, key1, key2, count in rows:
+            if kind == "user":
+                users[(key1, key2)] = count
+            elif kind == "tender":
+                tenders[key1] = count
+            elif kind == "apps_today":
+                apps_today = count
+            else:
+                apps_week = count
+        return StatsSnapshot(day, users, tenders, apps_today, apps_week)
+
+
+def _history_change(obj, attr: str) -> Optional[tuple]:
+    """(старое, новое) значение атрибута, если он изменён в этом flush."""
+    history = inspect(obj).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0], getattr(obj, attr)
+    return None
+
+
+def _value(obj, attr: str) -> Optional[str]:
+    """Значение колонки без обращения к БД: у новой строки без явного значения — server_default."""
+    value = obj.__dict__.get(attr)
+    if value is None:
+        server_default = obj.__table__.c[attr].server_default
+        value = getattr(server_default, "arg", None)
+        if value is not None and not isinstance(value, str):
+            value = value.text.strip("'")
+    return value
+
+
+def _count_key(obj, values: Optional[dict] = None) -> Optional[tuple]:
+    values = values or {}
+    if isinstance(obj, User):
+        return ("user", values.get("role", _value(obj, "role")), values.get("status", _value(obj, "status")))
+    if isinstance(obj, Tender):
+        return ("tender", values.get("status", _value(obj, "status")))
+    if isinstance(obj, TenderApplication):
+        if "created_at" not in obj.__dict__:
+            # Дата не загружена — куда отнести отклик, неизвестно: снимок будет пересчитан
+            return _UNKNOWN
+        created_at = obj.__dict__["created_at"]
+        if created_at is None:
+            return ("apps", False, False)
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        _day, today, week_ago = _day_bounds()
+        return ("apps", created_at >= today, created_at >= week_ago)
+    return None
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_stats_delta(session: Session, _flush_context) -> None:
+    """Изменения счётчиков в этой транзакции (применяются к снимку только после коммита)."""
+    delta: Optional[Counter] = None
+
+    def add(key: Optional[tuple], change: int) -> None:
+        nonlocal delta
+        if key is None:
+            return
+        if delta is None:
+            delta = session.info.setdefault("stats_delta", Counter())
+        delta[key] += change
+
+    for obj in session.new:
+        add(_count_key(obj), 1)
+    for obj in session.deleted:
+        add(_count_key(obj), -1)
+    for obj in session.dirty:
+        if not isinstance(obj, (User, Tender)):
+            continue
+        old_values = {}
+        for attr in ("role", "status") if isinstance(obj, User) else ("status",):
+            change = _history_change(obj, attr)
+            if change is not None and change[0] != change[1]:
+                old_values[attr] = change[0]
+        if old_values:
+            add(_count_key(obj, old_values), -1)
+            add(_count_key(obj), 1)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_stats_delta(session: Session) -> None:
+    delta = session.info.pop("stats_delta", None)
+    if not delta:
+        return
+    if _UNKNOWN in delta:
+        get_cache().delete(_CACHE_KEY)
+        return
+    snapshot = get_cache().get(_CACHE_KEY)
+    if isinstance(snapshot, StatsSnapshot):
+        snapshot.apply(delta)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_stats_delta(session: Session, _previous_transaction) -> None:
+    session.info.pop("stats_delta", None)
@@ -0,0 +1,67 @@
+# services/support_service.py — сообщения тикетов поддержки
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import SupportMessage, SupportTicket
+from services.realtime import RealtimeEvents
+
+logger = logging.getLogger(__name__)
+
+# Сколько символов последнего сообщения хранить в тикете для списка
+_PREVIEW_LENGTH = 256
+
+
+class SupportService:
+    """
+    Запись сообщений поддержки.
+
+    support_tickets.last_message_* и unread_count обновляются в той же транзакции,
+    что и сообщение, — список тикетов строится одним запросом без чтения support_messages.
+    Сообщения пишите только через этот сервис.
+    """
+
+    @staticmethod
+    async def add_message(
+        session: AsyncSession,
+        ticket: SupportTicket,
+        author: str,
+        text: str,
+    ) -> SupportMessage:
+        """
+        Добавить сообщение в тикет.
+
+        Args:
+            session: Сессия БД
+            ticket: Тикет
+            author: "user" или "admin"
+            text: Текст сообщения
+
+        Returns:
+            SupportMessage
+        """
+        now = datetime.now(timezone.utc)
+        msg = SupportMessage(ticket_id=ticket.id, author=author, text=text, created_at=now)
+        session.add(msg)
+        # Непрочитанные — сообщения пользователя после последнего ответа админа (счётчик — на стороне БД)
+        unread = SupportTicket.unread_count + 1 if author == "user" else 0
+        await session.execute(
+            update(SupportTicket)
+            .where(SupportTicket.id == ticket.id)
+            .values(
+                last_message_text=text[:_PREVIEW_LENGTH],
+                last_message_at=now,
+                last_message_author=author,
+                unread_count=unread,
+            )
+        )
+        await RealtimeEvents.support_message(session, ticket, author)
+        return msg
+
+    @staticmethod
+    async def mark_read(session: AsyncSession, ticket: SupportTicket) -> None:
+        """Админ открыл переписку — сбросить счётчик непрочитанных."""
+        if ticket.unread_count:
+            ticket.unread_count = 0
@@ -0,0 +1,74 @@
+# services/telegram_files.py — file_id → file_path (getFile Bot API) с кэшированием
+import asyncio
+import logging
+from typing import Awaitable, Callable, Iterable, Optional
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest
+
+from config import settings
+from utils.cache import cached, get_cache
+
+logger = logging.getLogger(__name__)
+
+# Запрос getFile: file_path или None, если Telegram файл не отдаёт (ошибка сети — исключение)
+FilePathFetcher = Callable[[str], Awaitable[Optional[str]]]
+
+_KEY_PREFIX = "tg_file_path"
+# Отрицательный результат (файл удалён или недоступен) кэшируем ненадолго
+_NEGATIVE_TTL = 60
+# Одновременных getFile при предзагрузке
+_PREFETCH_CONCURRENCY = 5
+
+
+class TelegramFileService:
+    """
+    Путь файла Telegram по file_id. file_path действителен около часа, поэтому кэшируется
+    на TG_FILE_PATH_TTL секунд; одновременные запросы одного file_id выполняют один getFile.
+    Бот передаёт bot_fetcher(bot), веб-приложение — свой запрос через HTTP-клиент.
+    """
+
+    @staticmethod
+    def bot_fetcher(bot: Bot) -> FilePathFetcher:
+        async def fetch(file_id: str) -> Optional[str]:
+            try:
+                return (await bot.get_file(file_id)).file_path
+            except TelegramBadRequest as e:
+                logger.warning(f"getFile failed for {file_id}: {e}")
+                return None
+        return fetch
+
+    @staticmethod
+    async def get_file_path(file_id: str, fetch: FilePathFetcher) -> Optional[str]:
+        return await cached(
+            _KEY_PREFIX, settings.TG_FILE_PATH_TTL, fetch, file_id, negative_ttl=_NEGATIVE_TTL,
+        )
+
+    @staticmethod
+    def invalidate(file_id: str) -> None:
+        """Сбросить путь (например, Telegram ответил 404 по закэшированному file_path)."""
+        get_cache().delete(f"{_KEY_PREFIX}:{file_id}")
+
+    @staticmethod
+    def prefetch(file_ids: Iterable[str], fetch: FilePathFetcher) -> None:
+        """Разрешить пути заранее в фоне (например, при открытии карточки пользователя)."""
+        file_ids = [f for f in dict.fromkeys(file_ids) if f]
+        if not file_ids:
+            return
+        task = asyncio.ensure_future(TelegramFileService._prefetch(file_ids, fetch))
+        task.add_done_callback(_log_prefetch_error)
+
+    @staticmethod
+    async def _prefetch(file_ids: list[str], fetch: FilePathFetcher) -> None:
+        semaphore = asyncio.Semaphore(_PREFETCH_CONCURRENCY)
+
+        async def resolve(file_id: str) -> None:
+            async with semaphore:
+                await TelegramFileService.get_file_path(file_id, fetch)
+
+        await asyncio.gather(*(resolve(f) for f in file_ids), return_exceptions=True)
+
+
+def _log_prefetch_error(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"File path prefetch failed: {task.exception()}")
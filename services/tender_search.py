@@ -0,0 +1,110 @@
+# services/tender_search.py — полнотекстовый поиск тендеров (PostgreSQL tsvector, SQLite FTS5)
+import re
+from typing import Optional
+
+from sqlalchemy import bindparam, column, func, literal_column, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from database.models import Tender, TenderStatus
+
+# Ограничения запроса: длина строки и число слов
+_MAX_QUERY_LENGTH = 200
+_MAX_TERMS = 8
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+# SQLite: русских стеммеров нет — срезаем типичные окончания и ищем по префиксу ("квартиры" → "квартир*")
+_RU_ENDINGS = sorted(
+    (
+        "иями", "ями", "ами", "ого", "его", "ому", "ему", "ыми", "ими", "ать", "ять", "ить", "еть",
+        "ая", "яя", "ое", "ее", "ой", "ей", "ые", "ие", "ых", "их", "ов", "ев", "ах", "ях", "ом", "ем",
+        "ам", "ям", "ий", "ый", "ть",
+        "а", "я", "ы", "и", "е", "о", "у", "ю", "ь", "й",
+    ),
+    key=len,
+    reverse=True,
+)
+_MIN_STEM = 4
+# Веса bm25 для колонок title, description (совпадение в заголовке важнее)
+_FTS_WEIGHTS = "10.0, 1.0"
+
+# Виртуальная таблица FTS5 (создаёт миграция 013; в моделях её нет)
+_tenders_fts = table("tenders_fts", column("rowid"))
+
+
+def _terms(query: str) -> list[str]:
+    return _WORD_RE.findall(query[:_MAX_QUERY_LENGTH].lower())[:_MAX_TERMS]
+
+
+def _stem(word: str) -> str:
+    for ending in _RU_ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= _MIN_STEM:
+            return word[: -len(ending)]
+    return word
+
+
+def _fts5_match(terms: list[str]) -> str:
+    """Выражение MATCH: все слова (AND), каждое — префикс основы в кавычках (без синтаксиса FTS5 из ввода)."""
+    return " ".join(f'"{_stem(t)}"*' for t in terms)
+
+
+class TenderSearchService:
+    """
+    Поиск открытых тендеров по заголовку и описанию с ранжированием.
+
+    PostgreSQL: генерируемая колонка tenders.search_vector (to_tsvector('russian', ...), GIN-индекс),
+    запрос — websearch_to_tsquery, ранг — ts_rank_cd. SQLite: таблица tenders_fts (FTS5, триггеры),
+    ранг — bm25. Обе структуры создаёт миграция 013 и поддерживает сама БД при INSERT/UPDATE.
+    """
+
+    @staticmethod
+    def _search_query(dialect: str, terms: list[str]) -> Select:
+        if dialect == "postgresql":
+            vector = literal_column("tenders.search_vector")
+            tsquery = func.websearch_to_tsquery("russian", " ".join(terms))
+            return (
+                select(Tender)
+                .where(vector.op("@@")(tsquery))
+                .order_by(func.ts_rank_cd(vector, tsquery).desc(), Tender.id.desc())
+            )
+        return (
+            select(Tender)
+            .join(_tenders_fts, _tenders_fts.c.rowid == Tender.id)
+            .where(literal_column("tenders_fts").op("MATCH")(bindparam("fts_match", _fts5_match(terms))))
+            .order_by(literal_column(f"bm25(tenders_fts, {_FTS_WEIGHTS})"), Tender.id.desc())
+        )
+
+    @staticmethod
+    async def search(
+        session: AsyncSession,
+        query: str,
+        city: Optional[str] = None,
+        category: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> tuple[list[Tender], bool]:
+        """
+        Найти открытые тендеры.
+
+        Args:
+            session: Сессия БД
+            query: Строка поиска (слова; синтаксис движков не поддерживается)
+            city: Фильтр по городу
+            category: Фильтр по категории
+            limit: Размер страницы
+            offset: Сколько результатов пропустить
+
+        Returns:
+            (тендеры страницы по убыванию релевантности, есть ли следующая страница)
+        """
+        terms = _terms(query)
+        if not terms:
+            return [], False
+        stmt = TenderSearchService._search_query(session.bind.dialect.name, terms).where(
+            Tender.status == TenderStatus.OPEN.value
+        )
+        if city:
+            stmt = stmt.where(Tender.city == city)
+        if category:
+            stmt = stmt.where(Tender.category == category)
+        rows = (await session.execute(stmt.limit(limit + 1).offset(offset))).scalars().all()
+        return list(rows[:limit]), len(rows) > limit
@@ -0,0 +1,106 @@
+# services/tender_service.py — бизнес-логика работы с тендерами
+import logging
+from typing import Iterable, NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from database.models import Tender, TenderApplication, User, UserRole, UserSkill, UserStatus
+
+logger = logging.getLogger(__name__)
+
+# Сколько строк забирать из курсора за раз при подборе исполнителей
+_MATCH_YIELD_PER = 1000
+
+
+class ViewerState(NamedTuple):
+    """Состояние тендера с точки зрения конкретного пользователя."""
+
+    application_id: Optional[int] = None
+    application_status: Optional[str] = None
+
+    @property
+    def has_applied(self) -> bool:
+        return self.application_id is not None
+
+
+_NO_APPLICATION = ViewerState()
+
+
+class TenderService:
+    """Сервис для работы с тендерами."""
+
+    @staticmethod
+    def _viewer_state_query(user_id: int, tender_ids: list[int]) -> Select:
+        return select(
+            TenderApplication.tender_id,
+            TenderApplication.id,
+            TenderApplication.status,
+        ).where(
+            TenderApplication.user_id == user_id,
+            TenderApplication.tender_id.in_(tender_ids),
+        )
+
+    @staticmethod
+    def _collect_viewer_states(rows, tender_ids: list[int]) -> dict[int, ViewerState]:
+        states = {tender_id: _NO_APPLICATION for tender_id in tender_ids}
+        for tender_id, app_id, app_status in rows:
+            states[tender_id] = ViewerState(app_id, app_status)
+        return states
+
+    @staticmethod
+    async def get_viewer_states(
+        session: AsyncSession,
+        user_id: Optional[int],
+        tender_ids: Iterable[int],
+    ) -> dict[int, ViewerState]:
+        """
+        Отклики пользователя на набор тендеров одним запросом (tender_id IN (...)).
+
+        Args:
+            session: Сессия БД
+            user_id: ID пользователя (None — незарегистрированный, откликов нет)
+            tender_ids: ID тендеров
+
+        Returns:
+            {tender_id: ViewerState} для каждого переданного тендера
+        """
+        ids = list(dict.fromkeys(tender_ids))
+        if user_id is None or not ids:
+            return {tender_id: _NO_APPLICATION for tender_id in ids}
+        result = await session.execute(TenderService._viewer_state_query(user_id, ids))
+        return TenderService._collect_viewer_states(result.all(), ids)
+
+    @staticmethod
+    def _matching_executors_query(tender: Tender) -> Select:
+        return (
+            select(User.tg_id)
+            .join(UserSkill, UserSkill.user_id == User.id)
+            .where(
+                UserSkill.skill == tender.category,
+                User.city == tender.city,
+                User.status == UserStatus.ACTIVE.value,
+                User.role.in_((UserRole.EXECUTOR.value, UserRole.BOTH.value)),
+            )
+        )
+
+    @staticmethod
+    async def get_matching_executor_tg_ids(
+        session: AsyncSession,
+        tender: Tender,
+    ) -> list[int]:
+        """
+        Telegram ID активных исполнителей из города тендера с навыком = категории тендера.
+
+        Один индексный запрос (user_skills.skill → users), читается потоково порциями
+        по _MATCH_YIELD_PER: в памяти только tg_id, без ORM-объектов пользователей.
+        """
+        stmt = TenderService._matching_executors_query(tender).execution_options(
+            yield_per=_MATCH_YIELD_PER
+        )
+        tg_ids: list[int] = []
+        result = await session.stream(stmt)
+        async for partition in result.partitions():
+            tg_ids.extend(row[0] for row in partition)
+        return tg_ids
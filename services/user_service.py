@@ -1,11 +1,14 @@
 # services/user_service.py — бизнес-логика работы с пользователями
 import logging
-from typing import Optional
-from sqlalchemy import select
+from typing import Iterable, Optional
+from sqlalchemy import delete, insert, inspect, select
+from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.models import User, UserStatus, UserRole
+from database.models import User, UserSkill, UserStatus, UserRole
+from database.session import get_async_session_maker
 from config import settings
+from services.cache_bus import CacheBus
 from utils.cache import cached, get_cache
 
 logger = logging.getLogger(__name__)
@@ -14,6 +17,11 @@ logger = logging.getLogger(__name__)
 class UserService:
     """Сервис для работы с пользователями."""
     
+    @staticmethod
+    def cache_key(tg_id: int) -> str:
+        """Ключ кэша пользователя (для публикации изменений через CacheBus)."""
+        return f"user:tg_id:{tg_id}"
+    
     @staticmethod
     async def get_user_by_tg_id(
         session: AsyncSession,
@@ -32,19 +40,40 @@ class UserService:
             User или None
         """
         if use_cache:
-            cache = get_cache()
-            cache_key = f"user:tg_id:{tg_id}"
-            cached_user = cache.get(cache_key)
-            if cached_user is not None:
-                return cached_user
+            # Одновременные промахи (всплеск /start) читают пользователя одним SELECT в отдельной сессии
+            user = await cached(
+                "user:tg_id",
+                settings.CACHE_TTL_USER_PROFILE,
+                UserService._load_user,
+                tg_id,
+            )
+            if user is not None:
+                # Пользователь уже в сессии (например, его статус только что изменили) — отдаём его:
+                # merge скопировал бы поверх несохранённых изменений устаревшие значения из кэша
+                in_session = session.identity_map.get(session.identity_key(User, user.id))
+                if in_session is not None:
+                    if inspect(in_session).expired_attributes:
+                        await session.refresh(in_session)
+                    return in_session
+                # В кэше — отсоединённый объект: присоединяем копию к текущей сессии без SELECT.
+                # Если часть атрибутов просрочена — перечитываем из БД.
+                if not inspect(user).expired_attributes:
+                    try:
+                        return await session.merge(user, load=False)
+                    except InvalidRequestError:
+                        pass
+                get_cache().delete(UserService.cache_key(tg_id))
         
+        # Без кэша или не найден: читаем в текущей сессии (она видит ещё не закоммиченного пользователя)
         result = await session.execute(select(User).where(User.tg_id == tg_id))
-        user = result.scalar_one_or_none()
-        
-        if user and use_cache:
-            cache.set(cache_key, user, ttl=settings.CACHE_TTL_USER_PROFILE)
-        
-        return user
+        return result.scalar_one_or_none()
+    
+    @staticmethod
+    async def _load_user(tg_id: int) -> Optional[User]:
+        """Загрузка для кэша: короткая своя сессия, а не сессия вызвавшего (её могут закрыть раньше)."""
+        async with get_async_session_maker()() as session:
+            result = await session.execute(select(User).where(User.tg_id == tg_id))
+            return result.scalar_one_or_none()
     
     @staticmethod
     async def get_user_by_id(
@@ -80,9 +109,8 @@ class UserService:
         user.status = new_status
         await session.flush()
         
-        # Инвалидируем кэш
-        cache = get_cache()
-        cache.delete(f"user:tg_id:{user.tg_id}")
+        # Инвалидируем кэш во всех процессах (после коммита)
+        await CacheBus.publish(session, UserService.cache_key(user.tg_id))
         
         logger.info(f"User {user_id} status changed: {old_status} -> {new_status}")
         return user
@@ -103,6 +131,11 @@ class UserService:
     ) -> bool:
         """Проверить, может ли пользователь откликаться на тендеры."""
         user = await UserService.get_user_by_tg_id(session, tg_id)
+        return UserService.user_can_apply(user)
+    
+    @staticmethod
+    def user_can_apply(user: Optional[User]) -> bool:
+        """Активный исполнитель (или executor+customer) — может откликаться на тендеры."""
         if not user:
             return False
         
@@ -110,3 +143,29 @@ class UserService:
             user.status == UserStatus.ACTIVE.value
             and user.role in (UserRole.EXECUTOR.value, UserRole.BOTH.value)
         )
+    
+    @staticmethod
+    async def set_user_skills(
+        session: AsyncSession,
+        user: User,
+        skills: Optional[Iterable[str]],
+    ) -> None:
+        """
+        Сохранить навыки пользователя: users.skills (для отображения) и user_skills (для подбора).
+        
+        Args:
+            session: Сессия БД
+            user: Пользователь (если ещё не сохранён — будет сделан flush)
+            skills: Список навыков (None или пустой — навыков нет)
+        """
+        normalized = list(dict.fromkeys(s.strip()[:128] for s in (skills or []) if s and s.strip()))
+        user.skills = normalized or None
+        if user.id is None:
+            await session.flush()
+        await session.execute(delete(UserSkill).where(UserSkill.user_id == user.id))
+        if normalized:
+            await session.execute(
+                insert(UserSkill),
+                [{"user_id": user.id, "skill": skill} for skill in normalized],
+            )
+        await CacheBus.publish(session, UserService.cache_key(user.tg_id))
@@ -0,0 +1,134 @@
+# tests/conftest.py — окружение тестов: отдельная SQLite (миграции до head), фейковый Telegram
+import asyncio
+import os
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional, Union, get_args
+
+# До импорта config: своя БД и in-memory состояние, .env не влияет на тесты
+_DB_PATH = Path(tempfile.mkdtemp(prefix="tenderbot-tests-")) / "test.db"
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_DB_PATH}"
+os.environ["BOT_TOKEN"] = "123456789:TEST-token-for-tenderbot-tests"
+os.environ["ADMIN_ID"] = "1"
+os.environ["STATE_BACKEND_URL"] = ""
+os.environ["BOT_MODE"] = "polling"
+
+import pytest  # noqa: E402
+from aiogram import Bot, Dispatcher  # noqa: E402
+from aiogram.client.session.base import BaseSession  # noqa: E402
+from aiogram.types import Chat, Message  # noqa: E402
+
+from database.models import User, UserStatus  # noqa: E402
+from database.session import get_async_session_maker, get_engine  # noqa: E402
+
+
+def run_async(func: Callable[[], Awaitable[Any]]) -> Any:
+    """Выполнить корутину в новом event loop; пул соединений БД закрывается в том же loop."""
+    async def wrapper() -> Any:
+        try:
+            return await func()
+        finally:
+            await get_engine().dispose()
+
+    return asyncio.run(wrapper())
+
+
+class FakeTelegramSession(BaseSession):
+    """Сессия aiogram без сети: запоминает вызовы Bot API и возвращает правдоподобные ответы."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls: list[tuple[str, dict]] = []
+        self._message_id = 1000
+
+    async def make_request(self, bot: Bot, method, timeout: Optional[int] = None):
+        self.calls.append((type(method).__name__, method.model_dump(exclude_none=True)))
+        returning = method.__returning__
+        types = get_args(returning) if getattr(returning, "__origin__", None) is Union else (returning,)
+        if Message in types and getattr(method, "chat_id", None) is not None:
+            self._message_id += 1
+            return Message(
+                message_id=self._message_id,
+                date=datetime.now(timezone.utc),
+                chat=Chat(id=method.chat_id, type="private"),
+                text=getattr(method, "text", None),
+            )
+        if bool in types:
+            return True
+        return None
+
+    async def stream_content(self, *args, **kwargs):
+        if False:
+            yield b""
+
+    async def close(self) -> None:
+        pass
+
+
+def make_bot() -> tuple[Bot, FakeTelegramSession]:
+    from bot_setup import create_bot
+
+    bot = create_bot()
+    session = FakeTelegramSession()
+    bot.session = session
+    return bot, session
+
+
+def message_update(update_id: int, tg_id: int, text: str) -> dict:
+    """JSON обновления Telegram с сообщением пользователя (команда — с entity bot_command)."""
+    message = {
+        "message_id": update_id,
+        "date": int(datetime.now(timezone.utc).timestamp()),
+        "chat": {"id": tg_id, "type": "private", "first_name": "Test"},
+        "from": {"id": tg_id, "is_bot": False, "first_name": "Test"},
+        "text": text,
+    }
+    if text.startswith("/"):
+        message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+    return {"update_id": update_id, "message": message}
+
+
+def callback_update(update_id: int, tg_id: int, data: str, message_text: str = "Сообщение бота") -> dict:
+    """JSON обновления Telegram с нажатием inline-кнопки под сообщением бота в чате пользователя."""
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": {"id": tg_id, "is_bot": False, "first_name": "Test"},
+            "chat_instance": str(tg_id),
+            "data": data,
+            "message": {
+                "message_id": update_id,
+                "date": int(datetime.now(timezone.utc).timestamp()),
+                "chat": {"id": tg_id, "type": "private", "first_name": "Test"},
+                "from": {"id": 123456789, "is_bot": True, "first_name": "Bot"},
+                "text": message_text,
+            },
+        },
+    }
+
+
+async def create_user(tg_id: int, status: str = UserStatus.ACTIVE.value) -> None:
+    async with get_async_session_maker()() as session:
+        session.add(User(
+            tg_id=tg_id, full_name=f"Test {tg_id}", city="Москва", phone="+70000000000",
+            role="executor", status=status,
+        ))
+        await session.commit()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def migrated_db():
+    from database.migrations import run_migrations
+
+    run_migrations()
+    yield
+
+
+@pytest.fixture(scope="session")
+def dispatcher() -> Dispatcher:
+    """Диспетчер бота как в рабочем запуске (роутеры подключаются к одному диспетчеру за процесс)."""
+    from bot_setup import create_dispatcher
+
+    return create_dispatcher()
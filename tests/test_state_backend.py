@@ -0,0 +1,157 @@
+# tests/test_state_backend.py — общее состояние процессов: memory и Redis (fakeredis) ведут себя одинаково
+import asyncio
+
+import pytest
+from aiogram.fsm.storage.base import StorageKey
+from sqlalchemy import insert
+
+from config import settings
+from database.models import CacheInvalidation
+from database.session import get_async_session_maker
+from services.cache_bus import _utcnow, start_cache_listener, stop_cache_listener
+from services.user_service import UserService
+from tests.conftest import run_async
+from utils import state_backend
+from utils.cache import get_cache
+from utils.state_backend import MemoryStateBackend, RedisStateBackend, create_fsm_storage
+
+_REDIS_URL = "redis://localhost:6379/15"
+_PERIOD = 60
+_LIMIT = 10
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Клиенты Redis по URL подключаются к одному in-process серверу fakeredis (backend и RedisStorage)."""
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # Lua-скрипт GCRA в fakeredis
+    from redis.asyncio import ConnectionPool, Redis
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        Redis, "from_url",
+        classmethod(lambda cls, url, **kwargs: fakeredis.FakeAsyncRedis(server=server, **kwargs)),
+    )
+    monkeypatch.setattr(
+        ConnectionPool, "from_url",
+        classmethod(lambda cls, url, **kwargs: fakeredis.FakeAsyncRedis(server=server, **kwargs).connection_pool),
+    )
+    return server
+
+
+def _backends():
+    return [MemoryStateBackend(), RedisStateBackend(_REDIS_URL)]
+
+
+def test_gcra_limits_match(fake_redis):
+    # Всплеск запросов разной стоимости: одинаковые решения и задержки до повтора
+    costs = [1] * _LIMIT + [1, 1, 0.5] + [3]
+
+    async def scenario():
+        results = []
+        for backend in _backends():
+            results.append([await backend.gcra("ratelimit:42", _PERIOD, _LIMIT, cost) for cost in costs])
+            await backend.close()
+        memory, redis = results
+        assert [r > 0 for r in memory] == [r > 0 for r in redis]
+        assert [r > 0 for r in memory] == [False] * _LIMIT + [True, True, True, True]
+        assert memory == pytest.approx(redis, abs=0.05)
+        # Отклонённые запросы не учитываются: следующий такой же запрос ждёт столько же
+        assert memory[_LIMIT + 1] == pytest.approx(memory[_LIMIT], abs=0.05)
+        # Задержка пропорциональна стоимости запроса
+        assert memory[-1] == pytest.approx(3 * memory[_LIMIT], abs=0.05)
+
+    run_async(scenario)
+
+
+def test_gcra_cost_and_key_ttl(fake_redis):
+    async def scenario():
+        backend = RedisStateBackend(_REDIS_URL)
+        # Три дорогих запроса по 3 — 9 из 10, четвёртый превышает лимит
+        decisions = [await backend.gcra("ratelimit:7", _PERIOD, _LIMIT, 3) for _ in range(4)]
+        assert [d > 0 for d in decisions] == [False, False, False, True]
+        # Ключ с префиксом и TTL до «возвращения» полного лимита (простаивающие пользователи удаляются)
+        ttl_ms = await backend.client.pttl("tenderbot:ratelimit:7")
+        assert 0 < ttl_ms <= 3 * 3 * _PERIOD / _LIMIT * 1000
+        await backend.close()
+
+    run_async(scenario)
+
+
+def test_list_push_and_trim(fake_redis):
+    async def scenario():
+        for backend in _backends():
+            for i in range(5):
+                await backend.list_push("chat:1", f"m{i}", max_len=3, ttl=60)
+            assert await backend.list_get("chat:1") == ["m2", "m3", "m4"]
+            await backend.list_trim("chat:1", keep_last=1)
+            assert await backend.list_get("chat:1") == ["m4"]
+            await backend.list_trim("chat:1", keep_last=0)
+            assert await backend.list_get("chat:1") == []
+            await backend.list_trim("chat:missing", keep_last=1)
+            assert await backend.list_get("chat:missing") == []
+            await backend.close()
+
+    run_async(scenario)
+
+
+def test_fsm_storage_on_redis(fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "STATE_BACKEND_URL", _REDIS_URL)
+
+    async def scenario():
+        from aiogram.fsm.storage.redis import RedisStorage
+
+        storage = create_fsm_storage()
+        assert isinstance(storage, RedisStorage)
+        key = StorageKey(bot_id=1, chat_id=42, user_id=42)
+        await storage.set_state(key, "Registration:city")
+        await storage.set_data(key, {"full_name": "Test"})
+
+        # Другой процесс с тем же Redis видит состояние регистрации
+        other = create_fsm_storage()
+        assert await other.get_state(key) == "Registration:city"
+        assert await other.get_data(key) == {"full_name": "Test"}
+        backend = RedisStateBackend(_REDIS_URL)
+        keys = await backend.client.keys("*")
+        assert keys and all(k.startswith("tenderbot:fsm") for k in keys)
+        await backend.close()
+        await storage.close()
+        await other.close()
+
+    run_async(scenario)
+
+
+def test_state_backend_selected_by_url(fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "STATE_BACKEND_URL", _REDIS_URL)
+    monkeypatch.setattr(state_backend, "_backend", None)
+
+    async def scenario():
+        assert isinstance(state_backend.get_state_backend(), RedisStateBackend)
+        await state_backend.close_state_backend()
+
+    run_async(scenario)
+
+
+def test_profile_cache_invalidated_by_other_process(monkeypatch):
+    """Кэш профилей — в памяти процесса; согласованность между процессами держит CacheBus."""
+    monkeypatch.setattr(settings, "CACHE_BUS_POLL_INTERVAL", 0.05)
+    key = UserService.cache_key(900_301)
+
+    async def scenario():
+        start_cache_listener()
+        try:
+            await asyncio.sleep(0.2)
+            get_cache().set(key, "cached profile", 3600)
+            # Так публикует изменение другой процесс (SQLite): строка в cache_invalidations
+            async with get_async_session_maker()() as session:
+                await session.execute(insert(CacheInvalidation), [{"cache_key": key, "created_at": _utcnow()}])
+                await session.commit()
+            for _ in range(40):
+                if get_cache().get(key) is None:
+                    break
+                await asyncio.sleep(0.05)
+            assert get_cache().get(key) is None
+        finally:
+            await stop_cache_listener()
+
+    run_async(scenario)
@@ -0,0 +1,90 @@
+# tests/test_user_context_queries.py — пользователь читается из БД не больше одного раза на обновление
+import re
+
+from aiogram.types import Update
+from sqlalchemy import event, select
+
+from config import settings
+from database.models import User, UserStatus
+from database.session import get_async_session_maker, get_engine
+from services.user_service import UserService
+from tests.conftest import callback_update, create_user, make_bot, message_update, run_async
+from utils.cache import get_cache
+
+# SELECT пользователя по Telegram ID (UserContext, хендлеры, menu_updater — все читают так)
+_USER_BY_TG_ID = re.compile(r"^\s*SELECT\b.*\bFROM users\b.*\busers\.tg_id\s*=", re.IGNORECASE | re.DOTALL)
+_TG_ID = 900_101
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.statements: list[str] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def user_selects(self) -> int:
+        return sum(1 for s in self.statements if _USER_BY_TG_ID.match(s))
+
+
+async def _feed(dispatcher, bot, update_id: int, text: str) -> _QueryCounter:
+    counter = _QueryCounter()
+    engine = get_engine().sync_engine
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        update = Update.model_validate(message_update(update_id, _TG_ID, text), context={"bot": bot})
+        await dispatcher.feed_update(bot, update)
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+    return counter
+
+
+def test_one_user_select_per_update(dispatcher):
+    async def scenario():
+        await create_user(_TG_ID)
+        bot, calls = make_bot()
+
+        # Холодный кэш: middleware, /start и обновление меню делят один SELECT пользователя
+        get_cache().delete(UserService.cache_key(_TG_ID))
+        cold = await _feed(dispatcher, bot, 1, "/start")
+        assert calls.calls, "хендлер /start не ответил"
+        assert cold.user_selects == 1, cold.statements
+
+        # Тёплый кэш: пользователь присоединяется к сессии обновления без запроса
+        for update_id, text in enumerate(["/start", "/help"], start=2):
+            warm = await _feed(dispatcher, bot, update_id, text)
+            assert warm.user_selects == 0, warm.statements
+
+    run_async(scenario)
+
+
+def test_approve_menu_sees_new_status(dispatcher):
+    """Одобрение модератором: меню строится по новому статусу, а не по пользователю из кэша."""
+    tg_id = 900_111
+
+    async def scenario():
+        await create_user(tg_id, UserStatus.PENDING_MODERATION.value)
+        async with get_async_session_maker()() as session:
+            # Кэш держит пользователя в статусе «на модерации» до коммита одобрения
+            user = await UserService.get_user_by_tg_id(session, tg_id)
+        bot, calls = make_bot()
+
+        update = Update.model_validate(
+            callback_update(1, settings.ADMIN_ID, f"mod_approve:{user.id}"), context={"bot": bot},
+        )
+        await dispatcher.feed_update(bot, update)
+
+        menus = [
+            params for method, params in calls.calls
+            if method == "SendMessage" and params["chat_id"] == tg_id and "Меню обновлено" in params["text"]
+        ]
+        assert menus, calls.calls
+        for params in menus:
+            buttons = [button["text"] for row in params["reply_markup"]["keyboard"] for button in row]
+            assert "💬 Поддержка" in buttons, buttons
+        async with get_async_session_maker()() as session:
+            status = await session.scalar(select(User.status).where(User.tg_id == tg_id))
+        assert status == UserStatus.ACTIVE.value
+
+    run_async(scenario)
@@ -0,0 +1,88 @@
+# tests/test_webhook_parity.py — webhook и polling обрабатывают одно и то же обновление одинаково
+import json
+
+import httpx
+from aiogram.types import Update
+from fastapi import FastAPI
+
+from config import settings
+from tests.conftest import create_user, make_bot, message_update, run_async
+from web import webhook
+from web.webhook import WebhookReceiver
+
+_SECRET = "test-webhook-secret"
+_SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+# Сценарий: незарегистрированный и активный пользователь (id для polling, id для webhook)
+_SCENARIOS = [
+    ((900_001, 900_002), None),
+    ((900_011, 900_012), "active"),
+]
+_COMMANDS = ["/start", "/help"]
+
+
+def _normalized(calls: list[tuple[str, dict]], tg_id: int) -> list[tuple[str, str]]:
+    """Вызовы Bot API без id пользователя (у путей разные пользователи, чтобы не делить состояние)."""
+    return [(method, json.dumps(params, sort_keys=True, default=str).replace(str(tg_id), "<user>")) for method, params in calls]
+
+
+def _webhook_app(receiver: WebhookReceiver) -> FastAPI:
+    app = FastAPI()
+    app.include_router(webhook.router)
+    webhook._receiver = receiver
+    return app
+
+
+def test_webhook_dispatch_matches_polling(dispatcher):
+    async def scenario():
+        for (polling_id, webhook_id), status in _SCENARIOS:
+            if status is not None:
+                await create_user(polling_id, status)
+                await create_user(webhook_id, status)
+
+            # Polling: aiogram передаёт полученное обновление в dp.feed_update
+            polling_bot, polling_calls = make_bot()
+            for i, text in enumerate(_COMMANDS, start=1):
+                payload = message_update(i, polling_id, text)
+                await dispatcher.feed_update(polling_bot, Update.model_validate(payload, context={"bot": polling_bot}))
+
+            # Webhook: тот же JSON через HTTP-эндпоинт и WebhookReceiver
+            webhook_bot, webhook_calls = make_bot()
+            receiver = WebhookReceiver(webhook_bot, dispatcher, _SECRET, max_concurrency=1)
+            transport = httpx.ASGITransport(app=_webhook_app(receiver))
+            async with httpx.AsyncClient(transport=transport, base_url="http://telegram") as client:
+                for i, text in enumerate(_COMMANDS, start=1):
+                    resp = await client.post(
+                        settings.WEBHOOK_PATH,
+                        json=message_update(i, webhook_id, text),
+                        headers={_SECRET_HEADER: _SECRET},
+                    )
+                    assert resp.status_code == 200
+                    await receiver.drain()
+
+            assert polling_calls.calls, "обработчики не ответили — сравнивать нечего"
+            assert _normalized(webhook_calls.calls, webhook_id) == _normalized(polling_calls.calls, polling_id)
+
+    try:
+        run_async(scenario)
+    finally:
+        webhook._receiver = None
+
+
+def test_webhook_rejects_wrong_secret(dispatcher):
+    async def scenario():
+        bot, calls = make_bot()
+        receiver = WebhookReceiver(bot, dispatcher, _SECRET, max_concurrency=1)
+        transport = httpx.ASGITransport(app=_webhook_app(receiver))
+        async with httpx.AsyncClient(transport=transport, base_url="http://telegram") as client:
+            payload = message_update(1, 900_021, "/start")
+            wrong = await client.post(settings.WEBHOOK_PATH, json=payload, headers={_SECRET_HEADER: "wrong"})
+            missing = await client.post(settings.WEBHOOK_PATH, json=payload)
+        await receiver.drain()
+        assert wrong.status_code == 403
+        assert missing.status_code == 403
+        assert calls.calls == []
+
+    try:
+        run_async(scenario)
+    finally:
+        webhook._receiver = None
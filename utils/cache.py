@@ -1,90 +1,297 @@
-# utils/cache.py — простое in-memory кэширование
+# utils/cache.py — in-memory кэширование (LRU + TTL)
+import asyncio
+import sys
 import time
 import logging
+from collections import OrderedDict
 from typing import Any, Optional, Callable, Awaitable
-from collections import defaultdict
+
+from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Маркер закэшированного None (negative caching): отличает «нет в кэше» от «в БД ничего нет»
+_NEGATIVE = object()
+
+# Накладные расходы на запись (узел OrderedDict, кортеж значения) — для оценки занимаемой памяти
+_ENTRY_OVERHEAD = 200
+# Размер записи оценивается заново на каждой N-й записи, между ними — последняя оценка для типа значения
+_SIZE_SAMPLE_EVERY = 64
+
+
+def _stats_prefix(key: str) -> str:
+    """Группа статистики — первый сегмент ключа ('user:tg_id:123' → 'user'), чтобы число групп не росло с числом ключей."""
+    return key.split(":", 1)[0]
+
+
+def _estimate_size(key: str, value: Any) -> int:
+    """Примерный размер записи в байтах (без глубокого обхода: значения кэша — небольшие объекты и коллекции)."""
+    size = _ENTRY_OVERHEAD + sys.getsizeof(key) + sys.getsizeof(value)
+    attrs = getattr(value, "__dict__", None)
+    if attrs is not None:
+        size += sys.getsizeof(attrs) + sum(sys.getsizeof(v) for v in attrs.values())
+    elif isinstance(value, dict):
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(sys.getsizeof(v) for v in value)
+    return size
+
+
+class _PrefixStats:
+    __slots__ = ("hits", "stale_hits", "misses", "evictions", "expirations")
 
-class SimpleCache:
-    """Простой in-memory кэш с TTL."""
-    
     def __init__(self):
-        self._cache: dict[str, tuple[Any, float]] = {}
-        self._hits = defaultdict(int)
-        self._misses = defaultdict(int)
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+
+class LRUCache:
+    """
+    In-memory кэш с TTL и ограничением по числу записей и объёму.
+    При переполнении вытесняются давно не использованные записи (LRU, O(1));
+    просроченные удаляются при чтении и периодической очисткой.
+    Запись с stale_ttl после истечения TTL ещё stale_ttl секунд доступна через peek() как устаревшая.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 50_000,
+        max_bytes: int = 0,
+        sweep_interval: float = 60.0,
+    ):
+        # key -> (value, expiry, stale_until, size); порядок — от давно использованных к недавним
+        self._cache: OrderedDict[str, tuple[Any, float, float, int]] = OrderedDict()
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._sweep_interval = sweep_interval
+        self._next_sweep = time.monotonic() + sweep_interval
+        self._bytes = 0
+        self._type_sizes: dict[type, int] = {}
+        self._size_samples = 0
+        self._stats: dict[str, _PrefixStats] = {}
+        # Выполняющиеся загрузки cached() по ключу (single-flight). Задача — поколение загрузки:
+        # delete()/clear() снимают её, и результат загрузки, начатой до инвалидации, не записывается
+        self._inflight: dict[str, asyncio.Task] = {}
+    
+    def _prefix_stats(self, key: str) -> _PrefixStats:
+        prefix = _stats_prefix(key)
+        stats = self._stats.get(prefix)
+        if stats is None:
+            stats = self._stats[prefix] = _PrefixStats()
+        return stats
+    
+    def _entry_size(self, key: str, value: Any) -> int:
+        """Размер записи для лимита max_bytes: полная оценка — выборочно, она основная часть стоимости set."""
+        if not self._max_bytes:
+            return 0
+        self._size_samples += 1
+        kind = type(value)
+        size = self._type_sizes.get(kind)
+        if size is None or self._size_samples % _SIZE_SAMPLE_EVERY == 0:
+            size = self._type_sizes[kind] = _estimate_size(key, value)
+        return size
+    
+    def _remove(self, key: str) -> None:
+        _value, _expiry, _stale_until, size = self._cache.pop(key)
+        self._bytes -= size
+    
+    def peek(self, key: str) -> tuple[bool, Any, bool]:
+        """(найдено, значение, свежее): в отличие от get() возвращает и устаревшее значение в окне stale_ttl."""
+        item = self._cache.get(key)
+        if item is None:
+            self._prefix_stats(key).misses += 1
+            return False, None, False
+        
+        value, expiry, stale_until, _size = item
+        now = time.monotonic()
+        if now > stale_until:
+            self._remove(key)
+            stats = self._prefix_stats(key)
+            stats.expirations += 1
+            stats.misses += 1
+            return False, None, False
+        
+        self._cache.move_to_end(key)
+        stats = self._prefix_stats(key)
+        if now > expiry:
+            stats.stale_hits += 1
+            return True, value, False
+        stats.hits += 1
+        return True, value, True
     
     def get(self, key: str, default: Any = None) -> Optional[Any]:
         """Получить значение из кэша."""
-        if key not in self._cache:
-            self._misses[key] += 1
+        item = self._cache.get(key)
+        if item is None:
+            self._prefix_stats(key).misses += 1
             return default
         
-        value, expiry = self._cache[key]
-        if time.time() > expiry:
-            del self._cache[key]
-            self._misses[key] += 1
+        value, expiry, stale_until, _size = item
+        now = time.monotonic()
+        if now > expiry:
+            stats = self._prefix_stats(key)
+            if now > stale_until:
+                self._remove(key)
+                stats.expirations += 1
+            stats.misses += 1
             return default
         
-        self._hits[key] += 1
+        self._cache.move_to_end(key)
+        self._prefix_stats(key).hits += 1
         return value
     
-    def set(self, key: str, value: Any, ttl: int) -> None:
-        """Установить значение в кэш с TTL."""
-        expiry = time.time() + ttl
-        self._cache[key] = (value, expiry)
+    def set(self, key: str, value: Any, ttl: float, stale_ttl: float = 0) -> None:
+        """Установить значение в кэш с TTL (и окном stale_ttl, в котором peek() отдаёт устаревшее значение)."""
+        now = time.monotonic()
+        if key in self._cache:
+            self._remove(key)
+        size = self._entry_size(key, value)
+        expiry = now + ttl
+        self._cache[key] = (value, expiry, expiry + stale_ttl if stale_ttl else expiry, size)
+        self._bytes += size
+        
+        if now >= self._next_sweep:
+            self._sweep(now)
+        self._evict()
     
     def delete(self, key: str) -> None:
-        """Удалить значение из кэша."""
+        """Удалить значение из кэша (и отменить запись результата идущей загрузки)."""
         if key in self._cache:
-            del self._cache[key]
+            self._remove(key)
+        self._inflight.pop(key, None)
     
     def clear(self) -> None:
         """Очистить весь кэш."""
         self._cache.clear()
-        self._hits.clear()
-        self._misses.clear()
+        self._bytes = 0
+        self._stats.clear()
+        self._inflight.clear()
+    
+    def _evict(self) -> None:
+        while self._cache and (
+            len(self._cache) > self._max_entries
+            or (self._max_bytes and self._bytes > self._max_bytes)
+        ):
+            key, (_value, _expiry, _stale_until, size) = self._cache.popitem(last=False)
+            self._bytes -= size
+            self._prefix_stats(key).evictions += 1
+    
+    def _sweep(self, now: float) -> None:
+        """Удалить все просроченные записи (раз в sweep_interval, амортизированно на set)."""
+        expired = [key for key, (_v, _e, stale_until, _s) in self._cache.items() if now > stale_until]
+        for key in expired:
+            self._remove(key)
+            self._prefix_stats(key).expirations += 1
+        self._next_sweep = now + self._sweep_interval
+        if expired:
+            logger.debug(f"Cache sweep removed {len(expired)} expired entries")
     
     def get_stats(self) -> dict[str, Any]:
-        """Получить статистику кэша."""
-        total_hits = sum(self._hits.values())
-        total_misses = sum(self._misses.values())
+        """Получить статистику кэша (общую и по префиксам ключей)."""
+        total_hits = sum(s.hits for s in self._stats.values())
+        total_misses = sum(s.misses for s in self._stats.values())
         total_requests = total_hits + total_misses
         hit_rate = (total_hits / total_requests * 100) if total_requests > 0 else 0
         
         return {
             "size": len(self._cache),
+            "bytes": self._bytes,
+            "max_entries": self._max_entries,
+            "max_bytes": self._max_bytes,
             "hits": total_hits,
             "misses": total_misses,
             "hit_rate": f"{hit_rate:.2f}%",
+            "prefixes": {
+                prefix: {
+                    "hits": s.hits,
+                    "stale_hits": s.stale_hits,
+                    "misses": s.misses,
+                    "evictions": s.evictions,
+                    "expirations": s.expirations,
+                }
+                for prefix, s in self._stats.items()
+            },
         }
 
 
 # Глобальный экземпляр кэша
-_cache = SimpleCache()
+_cache = LRUCache(
+    max_entries=settings.CACHE_MAX_ENTRIES,
+    max_bytes=settings.CACHE_MAX_BYTES,
+    sweep_interval=settings.CACHE_SWEEP_INTERVAL,
+)
 
 
-def get_cache() -> SimpleCache:
+def get_cache() -> LRUCache:
     """Получить глобальный экземпляр кэша."""
     return _cache
 
 
+def _start_load(
+    cache: LRUCache,
+    cache_key: str,
+    ttl: int,
+    stale_ttl: int,
+    negative_ttl: int,
+    func: Callable[..., Awaitable[Any]],
+    args: tuple,
+    kwargs: dict,
+) -> asyncio.Task:
+    task = cache._inflight.get(cache_key)
+    if task is not None:
+        return task
+    
+    async def load() -> Any:
+        try:
+            result = await func(*args, **kwargs)
+            # Ключ инвалидирован во время загрузки — результат мог устареть, в кэш не пишем
+            if cache._inflight.get(cache_key) is not task:
+                return result
+            if result is not None:
+                cache.set(cache_key, result, ttl, stale_ttl)
+            elif negative_ttl > 0:
+                cache.set(cache_key, _NEGATIVE, negative_ttl)
+            return result
+        finally:
+            if cache._inflight.get(cache_key) is task:
+                del cache._inflight[cache_key]
+    
+    task = asyncio.ensure_future(load())
+    # Один раз на загрузку: фоновое обновление (stale) никто не ждёт — ошибку нужно забрать и записать
+    task.add_done_callback(_log_load_error)
+    cache._inflight[cache_key] = task
+    return task
+
+
+def _log_load_error(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Cache load failed: {task.exception()}")
+
+
 async def cached(
     key_prefix: str,
     ttl: int,
     func: Callable[..., Awaitable[Any]],
     *args: Any,
+    stale_ttl: int = 0,
+    negative_ttl: int = 0,
     **kwargs: Any,
 ) -> Any:
     """
     Декоратор для кэширования результатов async функций.
     
+    Одновременные промахи по одному ключу выполняют func один раз (single-flight).
+    
     Args:
         key_prefix: Префикс ключа кэша
         ttl: Время жизни кэша в секундах
         func: Функция для выполнения
         *args, **kwargs: Аргументы функции
+        stale_ttl: Сколько секунд после истечения TTL отдавать старое значение, обновляя его в фоне
+        negative_ttl: TTL для результата None (по умолчанию 0 — None не кэшируется)
     
     Returns:
         Результат функции или из кэша
@@ -101,13 +308,18 @@ async def cached(
     cache_key = ":".join(key_parts)
     
     # Пытаемся получить из кэша
-    cached_value = cache.get(cache_key)
-    if cached_value is not None:
-        logger.debug(f"Cache hit: {cache_key}")
-        return cached_value
+    found, cached_value, fresh = cache.peek(cache_key)
+    if found:
+        if not fresh:
+            # Stale-while-revalidate: отдаём старое значение, обновление — в фоне (одно на ключ)
+            logger.debug(f"Cache stale: {cache_key}")
+            _start_load(cache, cache_key, ttl, stale_ttl, negative_ttl, func, args, kwargs)
+        else:
+            logger.debug(f"Cache hit: {cache_key}")
+        return None if cached_value is _NEGATIVE else cached_value
     
-    # Выполняем функцию и кэшируем результат
+    # Выполняем функцию (или ждём уже идущую загрузку) и кэшируем результат.
+    # shield: отмена одного из ожидающих не отменяет загрузку для остальных
     logger.debug(f"Cache miss: {cache_key}")
-    result = await func(*args, **kwargs)
-    cache.set(cache_key, result, ttl)
-    return result
+    task = _start_load(cache, cache_key, ttl, stale_ttl, negative_ttl, func, args, kwargs)
+    return await asyncio.shield(task)
@@ -1,49 +1,49 @@
 # utils/chat_utils.py
 from typing import Optional, Any
-from collections import defaultdict
 from aiogram import Bot
 from aiogram.types import Message, InlineKeyboardMarkup, ReplyKeyboardMarkup
 
-_last_bot_messages: dict[int, list[int]] = defaultdict(list)
-_last_user_messages: dict[int, list[int]] = defaultdict(list)
+from utils.state_backend import get_state_backend
+
 _MAX_MESSAGES_TO_KEEP = 2
+# Telegram позволяет удалять сообщения только в течение 48 часов — дольше историю не храним
+_HISTORY_TTL = 48 * 3600
+
+
+def _bot_key(chat_id: int) -> str:
+    return f"chat:bot_msgs:{chat_id}"
+
+
+def _user_key(chat_id: int) -> str:
+    return f"chat:user_msgs:{chat_id}"
+
+
+async def _delete_all_but_last(bot: Bot, key: str, chat_id: int, keep_last: int) -> None:
+    backend = get_state_backend()
+    messages = await backend.list_get(key)
+    if len(messages) <= keep_last:
+        return
+    for msg_id in messages[:-keep_last]:
+        try:
+            await bot.delete_message(chat_id=chat_id, message_id=int(msg_id))
+        except Exception:
+            pass
+    await backend.list_trim(key, keep_last)
 
 async def cleanup_old_messages(bot: Bot, chat_id: int, keep_last: int = _MAX_MESSAGES_TO_KEEP) -> None:
-    if chat_id in _last_bot_messages:
-        messages = _last_bot_messages[chat_id]
-        if len(messages) > keep_last:
-            to_delete = messages[:-keep_last]
-            for msg_id in to_delete:
-                try:
-                    await bot.delete_message(chat_id=chat_id, message_id=msg_id)
-                except Exception:
-                    pass
-            _last_bot_messages[chat_id] = messages[-keep_last:]
-        elif len(messages) > keep_last * 3:
-            _last_bot_messages[chat_id] = messages[-keep_last:]
-    if chat_id in _last_user_messages:
-        messages = _last_user_messages[chat_id]
-        if len(messages) > keep_last:
-            to_delete = messages[:-keep_last]
-            for msg_id in to_delete:
-                try:
-                    if chat_id > 0:
-                        await bot.delete_message(chat_id=chat_id, message_id=msg_id)
-                except Exception:
-                    pass
-            _last_user_messages[chat_id] = messages[-keep_last:]
-        elif len(messages) > keep_last * 3:
-            _last_user_messages[chat_id] = messages[-keep_last:]
+    await _delete_all_but_last(bot, _bot_key(chat_id), chat_id, keep_last)
+    if chat_id > 0:
+        await _delete_all_but_last(bot, _user_key(chat_id), chat_id, keep_last)
 
 async def track_user_message(chat_id: int, message_id: int) -> None:
-    _last_user_messages[chat_id].append(message_id)
-    if len(_last_user_messages[chat_id]) > _MAX_MESSAGES_TO_KEEP * 3:
-        _last_user_messages[chat_id] = _last_user_messages[chat_id][-_MAX_MESSAGES_TO_KEEP * 3:]
+    await get_state_backend().list_push(
+        _user_key(chat_id), str(message_id), _MAX_MESSAGES_TO_KEEP * 3, _HISTORY_TTL
+    )
 
 async def track_bot_message(chat_id: int, message_id: int) -> None:
-    _last_bot_messages[chat_id].append(message_id)
-    if len(_last_bot_messages[chat_id]) > _MAX_MESSAGES_TO_KEEP * 3:
-        _last_bot_messages[chat_id] = _last_bot_messages[chat_id][-_MAX_MESSAGES_TO_KEEP * 3:]
+    await get_state_backend().list_push(
+        _bot_key(chat_id), str(message_id), _MAX_MESSAGES_TO_KEEP * 3, _HISTORY_TTL
+    )
 
 async def answer_with_cleanup(message: Message, text: str, reply_markup: Optional[InlineKeyboardMarkup | ReplyKeyboardMarkup] = None, **kwargs: Any) -> Message:
     bot = message.bot
@@ -53,8 +53,5 @@ async def answer_with_cleanup(message: Message, text: str, reply_markup: Optiona
     await track_bot_message(chat_id, new_message.message_id)
     return new_message
 
-def clear_user_messages(chat_id: int) -> None:
-    if chat_id in _last_bot_messages:
-        _last_bot_messages[chat_id].clear()
-    if chat_id in _last_user_messages:
-        _last_user_messages[chat_id].clear()
+async def clear_user_messages(chat_id: int) -> None:
+    await get_state_backend().delete(_bot_key(chat_id), _user_key(chat_id))
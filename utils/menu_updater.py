@@ -5,12 +5,12 @@ from aiogram import Bot
 from aiogram.types import Message, ReplyKeyboardMarkup
 from aiogram.exceptions import TelegramBadRequest, TelegramAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
 from config import settings
 from database.models import User, UserStatus, UserRole
 from handlers.keyboards import get_main_menu_kb, get_admin_menu_kb
 from utils import is_admin
+from services.user_service import UserService
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +20,7 @@ async def update_user_menu(
     user_tg_id: int,
     session: AsyncSession,
     new_status: Optional[str] = None,
+    user: Optional[User] = None,
 ) -> bool:
     """
     Обновляет меню пользователя в зависимости от его текущего состояния.
@@ -30,14 +31,14 @@ async def update_user_menu(
         user_tg_id: Telegram ID пользователя
         session: Сессия БД
         new_status: Новый статус пользователя (если известен заранее)
+        user: Пользователь, если уже загружен (иначе берётся через UserService)
     
     Returns:
         True если меню обновлено, False если не удалось
     """
     try:
-        # Получаем актуальные данные пользователя
-        result = await session.execute(select(User).where(User.tg_id == user_tg_id))
-        user = result.scalar_one_or_none()
+        if user is None:
+            user = await UserService.get_user_by_tg_id(session, user_tg_id)
         
         if not user:
             return False
@@ -79,6 +80,8 @@ async def send_notification_with_menu_update(
     message_text: str,
     session: AsyncSession,
     update_menu: bool = True,
+    new_status: Optional[str] = None,
+    user: Optional[User] = None,
 ) -> bool:
     """
     Отправляет уведомление пользователю и автоматически обновляет его меню.
@@ -89,6 +92,8 @@ async def send_notification_with_menu_update(
         message_text: Текст уведомления
         session: Сессия БД
         update_menu: Обновлять ли меню после отправки уведомления
+        new_status: Новый статус пользователя (если известен заранее)
+        user: Пользователь, если уже загружен (иначе берётся через UserService)
     
     Returns:
         True если уведомление отправлено успешно
@@ -103,7 +108,7 @@ async def send_notification_with_menu_update(
         
         # Обновляем меню если требуется
         if update_menu:
-            await update_user_menu(bot, user_tg_id, session)
+            await update_user_menu(bot, user_tg_id, session, new_status=new_status, user=user)
         
         return True
     except TelegramAPIError as e:
@@ -139,6 +144,7 @@ async def ensure_menu_visible(
     user_tg_id: int,
     session: AsyncSession,
     welcome_text: Optional[str] = None,
+    user: Optional[User] = None,
 ) -> None:
     """
     Убеждается, что у пользователя видно актуальное меню.
@@ -149,10 +155,11 @@ async def ensure_menu_visible(
         user_tg_id: Telegram ID пользователя
         session: Сессия БД
         welcome_text: Текст приветствия (опционально)
+        user: Пользователь, если уже загружен (иначе берётся через UserService)
     """
     try:
-        result = await session.execute(select(User).where(User.tg_id == user_tg_id))
-        user = result.scalar_one_or_none()
+        if user is None:
+            user = await UserService.get_user_by_tg_id(session, user_tg_id)
         
         if not user:
             return
@@ -0,0 +1,235 @@
+# utils/state_backend.py — общее состояние процессов бота: FSM, rate limiting, история сообщений чата
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Все ключи backend'а — с префиксом, чтобы делить один Redis с другими приложениями
+_KEY_PREFIX = "tenderbot:"
+
+# GCRA в Redis одним атомарным шагом; время берём у Redis, чтобы часы процессов не влияли на лимит.
+# KEYS[1] — ключ, ARGV: период (мс), лимит за период, стоимость запроса. Возвращает задержку до повтора (мс), 0 — разрешено.
+_GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local period = tonumber(ARGV[1])
+local increment = period / tonumber(ARGV[2]) * tonumber(ARGV[3])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local new_tat = tat + increment
+local retry = new_tat - now - period
+if retry > 0 then return math.ceil(retry) end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil(new_tat - now))
+return 0
+"""
+
+
+class StateBackend(ABC):
+    """Хранилище небольших значений с TTL. In-memory — для одного процесса, Redis — для нескольких."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        ...
+
+    @abstractmethod
+    async def gcra(self, key: str, period: float, limit: int, cost: float = 1.0) -> float:
+        """
+        Учесть запрос в лимите «limit запросов за period секунд» (GCRA, одно значение на ключ).
+        Возвращает 0, если запрос разрешён, иначе — через сколько секунд можно повторить.
+        Ключ живёт, пока пользователь не «накопил» полный лимит, — простаивающие удаляются по TTL.
+        """
+
+    @abstractmethod
+    async def list_push(self, key: str, value: str, max_len: int, ttl: float) -> None:
+        """Добавить в конец списка и оставить последние max_len элементов."""
+
+    @abstractmethod
+    async def list_get(self, key: str) -> list[str]:
+        ...
+
+    @abstractmethod
+    async def list_trim(self, key: str, keep_last: int) -> None:
+        """Оставить в списке последние keep_last элементов."""
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryStateBackend(StateBackend):
+    """Словарь в памяти процесса (по умолчанию; подходит, пока бот запущен в одном процессе)."""
+
+    # Просроченные ключи, которые больше не читаются (ушедшие пользователи), удаляются раз в интервал
+    _SWEEP_INTERVAL = 60.0
+
+    def __init__(self):
+        self._data: dict[str, tuple[object, Optional[float]]] = {}
+        self._next_sweep = time.monotonic() + self._SWEEP_INTERVAL
+
+    def _expiry(self, ttl: Optional[float]) -> Optional[float]:
+        return time.monotonic() + ttl if ttl is not None else None
+
+    def _load(self, key: str):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expiry = item
+        if expiry is not None and time.monotonic() > expiry:
+            del self._data[key]
+            return None
+        return value
+
+    def _store(self, key: str, value: object, expiry: Optional[float]) -> None:
+        self._data[key] = (value, expiry)
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self._next_sweep = now + self._SWEEP_INTERVAL
+            self._data = {
+                k: (v, exp) for k, (v, exp) in self._data.items() if exp is None or exp > now
+            }
+
+    async def get(self, key: str) -> Optional[str]:
+        value = self._load(key)
+        return value if isinstance(value, str) else None
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        self._store(key, value, self._expiry(ttl))
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    async def gcra(self, key: str, period: float, limit: int, cost: float = 1.0) -> float:
+        now = time.monotonic()
+        tat = max(self._load(key) or now, now)
+        new_tat = tat + period / limit * cost
+        retry_after = new_tat - now - period
+        if retry_after > 0:
+            return retry_after
+        self._store(key, new_tat, new_tat)
+        return 0.0
+
+    async def list_push(self, key: str, value: str, max_len: int, ttl: float) -> None:
+        items = list(self._load(key) or [])
+        items.append(value)
+        self._store(key, items[-max_len:], self._expiry(ttl))
+
+    async def list_get(self, key: str) -> list[str]:
+        return list(self._load(key) or [])
+
+    async def list_trim(self, key: str, keep_last: int) -> None:
+        items = self._load(key)
+        if items is None:
+            return
+        _old, expiry = self._data[key]
+        self._data[key] = (items[-keep_last:] if keep_last > 0 else [], expiry)
+
+
+class RedisStateBackend(StateBackend):
+    """Redis (или совместимый сервер): общее состояние для нескольких процессов бота."""
+
+    def __init__(self, url: str):
+        try:
+            from redis.asyncio import Redis
+        except ImportError as e:
+            raise RuntimeError(
+                "Для STATE_BACKEND_URL=redis://... установите пакет redis: pip install redis"
+            ) from e
+        self._redis = Redis.from_url(url, decode_responses=True)
+        self._gcra = self._redis.register_script(_GCRA_SCRIPT)
+
+    @property
+    def client(self):
+        return self._redis
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._redis.get(_KEY_PREFIX + key)
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        px = int(ttl * 1000) if ttl is not None else None
+        await self._redis.set(_KEY_PREFIX + key, value, px=px)
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._redis.delete(*(_KEY_PREFIX + k for k in keys))
+
+    async def gcra(self, key: str, period: float, limit: int, cost: float = 1.0) -> float:
+        retry_ms = await self._gcra(keys=[_KEY_PREFIX + key], args=[int(period * 1000), limit, cost])
+        return int(retry_ms) / 1000
+
+    async def list_push(self, key: str, value: str, max_len: int, ttl: float) -> None:
+        full_key = _KEY_PREFIX + key
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(full_key, value)
+            pipe.ltrim(full_key, -max_len, -1)
+            pipe.pexpire(full_key, int(ttl * 1000))
+            await pipe.execute()
+
+    async def list_get(self, key: str) -> list[str]:
+        return await self._redis.lrange(_KEY_PREFIX + key, 0, -1)
+
+    async def list_trim(self, key: str, keep_last: int) -> None:
+        if keep_last > 0:
+            await self._redis.ltrim(_KEY_PREFIX + key, -keep_last, -1)
+        else:
+            await self._redis.delete(_KEY_PREFIX + key)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+def _is_redis_url(url: str) -> bool:
+    return url.startswith(("redis://", "rediss://", "unix://"))
+
+
+_backend: Optional[StateBackend] = None
+
+
+def get_state_backend() -> StateBackend:
+    """Backend процесса по STATE_BACKEND_URL (пусто или memory:// — в памяти)."""
+    global _backend
+    if _backend is None:
+        url = settings.STATE_BACKEND_URL.strip()
+        if _is_redis_url(url):
+            _backend = RedisStateBackend(url)
+            logger.info("State backend: Redis")
+        else:
+            _backend = MemoryStateBackend()
+            logger.info("State backend: memory (single process)")
+    return _backend
+
+
+def create_fsm_storage() -> BaseStorage:
+    """Хранилище FSM aiogram: RedisStorage при Redis-backend'е, иначе MemoryStorage."""
+    url = settings.STATE_BACKEND_URL.strip()
+    if _is_redis_url(url):
+        from aiogram.fsm.storage.redis import DefaultKeyBuilder, RedisStorage
+        # Данные FSM (регистрация) сериализуются в JSON, поэтому date храним строкой ISO
+        return RedisStorage.from_url(
+            url,
+            key_builder=DefaultKeyBuilder(prefix=_KEY_PREFIX + "fsm"),
+            state_ttl=settings.FSM_STATE_TTL,
+            data_ttl=settings.FSM_STATE_TTL,
+        )
+    return MemoryStorage()
+
+
+async def close_state_backend() -> None:
+    global _backend
+    if _backend is not None:
+        await _backend.close()
+        _backend = None
@@ -1,42 +1,13 @@
-# web/database.py — синхронная сессия БД для веб-админки (та же БД, что и бот)
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+# web/database.py — асинхронная сессия БД для веб-админки (тот же engine и пул, что и у бота)
+from typing import AsyncGenerator
 
-from config import settings
-from database.models import Base, User, Tender, TenderApplication, Review
+from sqlalchemy.ext.asyncio import AsyncSession
 
-# Синхронный URL (без asyncpg/aiosqlite)
-_db_url = settings.DATABASE_URL
-if "+asyncpg" in _db_url:
-    _db_url = _db_url.replace("+asyncpg", "")
-if "+aiosqlite" in _db_url:
-    _db_url = _db_url.replace("+aiosqlite", "")
+from database.session import get_async_session_maker
 
-from config import settings
 
-# Настройка пула соединений для синхронного движка
-if "sqlite" in _db_url:
-    engine = create_engine(
-        _db_url,
-        echo=False,
-        pool_pre_ping=False,  # SQLite не поддерживает
-        connect_args={"check_same_thread": False},
-    )
-else:
-    engine = create_engine(
-        _db_url,
-        echo=False,
-        pool_size=settings.DB_POOL_SIZE,
-        max_overflow=settings.DB_MAX_OVERFLOW,
-        pool_recycle=settings.DB_POOL_RECYCLE,
-        pool_pre_ping=settings.DB_POOL_PRE_PING,
-    )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    """Сессия на запрос. Коммит делают сами роуты; незакоммиченное откатывается при закрытии."""
+    session_maker = get_async_session_maker()
+    async with session_maker() as db:
         yield db
-    finally:
-        db.close()
@@ -0,0 +1,226 @@
+# web/document_cache.py — документы пользователей из Telegram: дисковый кэш и потоковая отдача
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import anyio
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+
+from config import settings
+from services.telegram_files import TelegramFileService
+from web.miniapp.notify import get_http_client
+from web.utils.http_cache import etag_matches
+
+logger = logging.getLogger(__name__)
+
+_CHUNK_SIZE = 64 * 1024
+# Как часто удалять файлы старше срока хранения и сверх лимита размера, секунд
+_PURGE_INTERVAL = 3600
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class DocumentUnavailable(Exception):
+    """Telegram не отдал файл (удалён, недоступен или ошибка сети)."""
+
+
+async def fetch_file_path(file_id: str) -> Optional[str]:
+    """getFile через общий HTTP-клиент веб-приложения (для TelegramFileService)."""
+    r = await get_http_client().get("getFile", params={"file_id": file_id})
+    data = r.json()
+    if not data.get("ok"):
+        logger.warning(f"getFile failed for {file_id}: {data.get('description')}")
+        return None
+    return data["result"]["file_path"]
+
+
+class DocumentCache:
+    """
+    Файлы по file_id на локальном диске.
+
+    Время изменения файла — момент загрузки (по нему файлы удаляются через DOCUMENT_CACHE_RETENTION_DAYS,
+    как обещано пользователю при регистрации), время доступа обновляется при каждой отдаче —
+    по нему при превышении DOCUMENT_CACHE_MAX_BYTES вытесняются давно не открывавшиеся файлы.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, retention: float):
+        self._dir = directory
+        self._max_bytes = max_bytes
+        self._retention = retention
+        self._downloads: dict[str, asyncio.Task] = {}
+        self._next_purge = 0.0
+
+    @staticmethod
+    def etag(file_id: str) -> str:
+        """Содержимое файла с данным file_id не меняется — ETag от самого file_id."""
+        return '"' + hashlib.sha256(file_id.encode()).hexdigest()[:32] + '"'
+
+    def _path(self, file_id: str) -> Path:
+        digest = hashlib.sha256(file_id.encode()).hexdigest()
+        return self._dir / digest[:2] / digest
+
+    async def get(self, file_id: str) -> Path:
+        """Путь к файлу в кэше; при промахе — скачать потоково (одна загрузка на file_id)."""
+        path = self._path(file_id)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            stat = None
+        if stat is not None and time.time() - stat.st_mtime < self._retention:
+            os.utime(path, (time.time(), stat.st_mtime))
+        else:
+            task = self._downloads.get(file_id)
+            if task is None:
+                task = asyncio.ensure_future(self._download(file_id, path))
+                self._downloads[file_id] = task
+                task.add_done_callback(lambda _t: self._downloads.pop(file_id, None))
+            await asyncio.shield(task)
+        if time.monotonic() >= self._next_purge:
+            self._next_purge = time.monotonic() + _PURGE_INTERVAL
+            await anyio.to_thread.run_sync(self._purge)
+        return path
+
+    async def _download(self, file_id: str, path: Path) -> None:
+        try:
+            file_path = await TelegramFileService.get_file_path(file_id, fetch_file_path)
+        except Exception as e:
+            raise DocumentUnavailable(f"getFile failed: {e}") from e
+        if not file_path:
+            raise DocumentUnavailable("getFile returned no file_path")
+        file_url = f"https://api.telegram.org/file/bot{settings.BOT_TOKEN}/{file_path}"
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.part")
+        try:
+            async with get_http_client().stream("GET", file_url) as response:
+                if response.status_code != 200:
+                    # Закэшированный file_path мог истечь — следующий запрос заново вызовет getFile
+                    TelegramFileService.invalidate(file_id)
+                    raise DocumentUnavailable(f"file download returned {response.status_code}")
+                async with await anyio.open_file(tmp_path, "wb") as f:
+                    async for chunk in response.aiter_bytes(_CHUNK_SIZE):
+                        await f.write(chunk)
+            os.replace(tmp_path, path)
+        except DocumentUnavailable:
+            raise
+        except Exception as e:
+            raise DocumentUnavailable(f"file download failed: {e}") from e
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink(missing_ok=True)
+
+    def _purge(self) -> None:
+        """Удалить файлы старше срока хранения, затем — давно не открывавшиеся сверх лимита размера."""
+        if not self._dir.exists():
+            return
+        now = time.time()
+        files = []
+        for path in self._dir.glob("*/*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.name.endswith(".part"):
+                # Оборванная загрузка (например, процесс был остановлен)
+                if now - stat.st_mtime > 3600:
+                    path.unlink(missing_ok=True)
+                continue
+            if now - stat.st_mtime >= self._retention:
+                path.unlink(missing_ok=True)
+                continue
+            files.append((stat.st_atime, stat.st_size, path))
+        total = sum(size for _atime, size, _path in files)
+        if total <= self._max_bytes:
+            return
+        for _atime, size, path in sorted(files):
+            path.unlink(missing_ok=True)
+            total -= size
+            if total <= self._max_bytes:
+                break
+        logger.info(f"Document cache trimmed to {total} bytes")
+
+
+_cache: Optional[DocumentCache] = None
+
+
+def get_document_cache() -> DocumentCache:
+    global _cache
+    if _cache is None:
+        _cache = DocumentCache(
+            Path(settings.DOCUMENT_CACHE_DIR),
+            settings.DOCUMENT_CACHE_MAX_BYTES,
+            settings.DOCUMENT_CACHE_RETENTION_DAYS * 86400,
+        )
+    return _cache
+
+
+def _parse_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """Один диапазон bytes=… → (начало, конец включительно); None — заголовок не поддерживается (отдаём весь файл)."""
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    start_s, end_s = match.groups()
+    if not start_s and not end_s:
+        return None
+    if not start_s:
+        length = int(end_s)
+        return (max(size - length, 0), size - 1) if length else (size, size - 1)
+    start = int(start_s)
+    end = min(int(end_s), size - 1) if end_s else size - 1
+    return start, end
+
+
+async def _read_file(path: Path, start: int, length: int) -> AsyncIterator[bytes]:
+    async with await anyio.open_file(path, "rb") as f:
+        await f.seek(start)
+        while length > 0:
+            chunk = await f.read(min(_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def file_response(
+    request: Request,
+    path: Path,
+    etag: str,
+    media_type: str,
+    content_disposition: str,
+) -> Response:
+    """Отдать файл кусками: If-None-Match → 304, Range → 206 (один диапазон)."""
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, max-age=86400",
+        "Content-Disposition": content_disposition,
+    }
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    size = path.stat().st_size
+    start, end = 0, size - 1
+    status_code = 200
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == etag):
+        byte_range = _parse_range(range_header, size)
+        if byte_range is not None:
+            start, end = byte_range
+            if start > end or start >= size:
+                return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    length = end - start + 1 if size else 0
+    headers["Content-Length"] = str(length)
+    return StreamingResponse(
+        _read_file(path, start, length),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers,
+    )
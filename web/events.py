@@ -0,0 +1,141 @@
+# web/events.py — живые обновления: события шины → Server-Sent Events для Mini App и веб-панели
+import asyncio
+import json
+import logging
+import time
+from typing import AsyncIterator, Iterable, Optional
+
+from fastapi.responses import StreamingResponse
+
+from config import settings
+from services.cache_bus import add_event_handler, remove_event_handler, start_cache_listener, stop_cache_listener
+
+logger = logging.getLogger(__name__)
+
+# Маркер в очереди подписчика: соединение закрывается, клиент переподключается и перечитывает данные
+_CLOSE = object()
+# Через сколько EventSource переподключается после обрыва, мс
+_RETRY_MS = 3000
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # nginx: не буферизовать поток
+    "X-Accel-Buffering": "no",
+}
+
+
+class _Subscriber:
+    __slots__ = ("topics", "queue", "last_activity")
+
+    def __init__(self, topics: tuple[str, ...], queue_size: int):
+        self.topics = topics
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.last_activity = time.monotonic()
+
+    def close(self) -> None:
+        """Отбросить накопленное и завершить поток при следующем чтении."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(_CLOSE)
+
+
+class EventHub:
+    """
+    Подписчики SSE в процессе веб-приложения: топик → соединения.
+    Медленный клиент не копит события бесконечно — при переполнении очереди соединение закрывается.
+    Сверх лимита соединений новое вытесняет то, где дольше всего не было событий.
+    """
+
+    def __init__(self, max_connections: int, queue_size: int):
+        self._max_connections = max_connections
+        self._queue_size = queue_size
+        self._by_topic: dict[str, set[_Subscriber]] = {}
+        self._subscribers: set[_Subscriber] = set()
+
+    @property
+    def connections(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, topic: str, payload: dict) -> None:
+        for sub in list(self._by_topic.get(topic, ())):
+            try:
+                sub.queue.put_nowait(payload)
+                sub.last_activity = time.monotonic()
+            except asyncio.QueueFull:
+                logger.warning(f"SSE subscriber on {topic} is too slow, closing connection")
+                self._unsubscribe(sub)
+                sub.close()
+
+    def _subscribe(self, topics: Iterable[str]) -> _Subscriber:
+        if len(self._subscribers) >= self._max_connections:
+            idle = min(self._subscribers, key=lambda s: s.last_activity)
+            self._unsubscribe(idle)
+            idle.close()
+        sub = _Subscriber(tuple(topics), self._queue_size)
+        self._subscribers.add(sub)
+        for topic in sub.topics:
+            self._by_topic.setdefault(topic, set()).add(sub)
+        return sub
+
+    def _unsubscribe(self, sub: _Subscriber) -> None:
+        self._subscribers.discard(sub)
+        for topic in sub.topics:
+            subs = self._by_topic.get(topic)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._by_topic[topic]
+
+    async def _stream(self, sub: _Subscriber) -> AsyncIterator[str]:
+        try:
+            yield f"retry: {_RETRY_MS}\n\n"
+            while True:
+                try:
+                    item = await asyncio.wait_for(sub.queue.get(), timeout=settings.SSE_PING_INTERVAL)
+                except asyncio.TimeoutError:
+                    # Комментарий держит соединение через прокси и выявляет ушедших клиентов
+                    yield ": ping\n\n"
+                    continue
+                if item is _CLOSE:
+                    break
+                data = json.dumps(item, ensure_ascii=False)
+                yield f"event: {item.get('type', 'message')}\ndata: {data}\n\n"
+        finally:
+            self._unsubscribe(sub)
+
+    def close_all(self) -> None:
+        """Завершить все потоки (остановка приложения не ждёт открытых соединений)."""
+        for sub in list(self._subscribers):
+            self._unsubscribe(sub)
+            sub.close()
+
+    def response(self, topics: Iterable[str]) -> StreamingResponse:
+        """Ответ text/event-stream с событиями указанных топиков."""
+        sub = self._subscribe(topics)
+        return StreamingResponse(self._stream(sub), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+_hub: Optional[EventHub] = None
+
+
+def get_event_hub() -> EventHub:
+    global _hub
+    if _hub is None:
+        _hub = EventHub(settings.SSE_MAX_CONNECTIONS, settings.SSE_QUEUE_SIZE)
+    return _hub
+
+
+def _on_bus_event(topic: str, payload: dict) -> None:
+    get_event_hub().publish(topic, payload)
+
+
+async def start_event_hub() -> None:
+    """Подписаться на события шины (из процесса бота и этого процесса)."""
+    add_event_handler(_on_bus_event)
+    start_cache_listener()
+
+
+async def stop_event_hub() -> None:
+    remove_event_handler(_on_bus_event)
+    get_event_hub().close_all()
+    await stop_cache_listener()
@@ -1,10 +1,12 @@
 # web/main.py — FastAPI веб-админка для тендеров
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, Request
 from fastapi.responses import RedirectResponse
 from fastapi.staticfiles import StaticFiles
 
+from config import settings
 from web.auth import get_session_user
 from web.routes import (
     login_router, dashboard_router, users_router, tenders_router,
@@ -14,8 +16,37 @@ from web.routes.moderation import router as moderation_router
 from web.routes.applications_manage import router as applications_manage_router
 from web.routes.health import router as health_router
 from web.miniapp.routes import router as miniapp_router
+from web.miniapp.notify import start_notifier, stop_notifier
+from web.events import start_event_hub, stop_event_hub
+from web.webhook import BotWebhookRuntime, router as webhook_router
 
-app = FastAPI(title="TenderBot Admin")
+# Бот в режиме webhook принимает обновления в этом же процессе
+_BOT_IN_WEB = settings.BOT_MODE == "webhook" and settings.WEBHOOK_IN_WEB
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    bot_runtime = None
+    if _BOT_IN_WEB:
+        import asyncio
+        from database.migrations import run_migrations
+        await asyncio.to_thread(run_migrations)
+        bot_runtime = BotWebhookRuntime()
+        await bot_runtime.start()
+    # Очередь уведомлений Bot API: запуск и дренаж при остановке
+    await start_notifier()
+    # События шины (статусы откликов, поддержка) → SSE
+    await start_event_hub()
+    try:
+        yield
+    finally:
+        await stop_event_hub()
+        if bot_runtime is not None:
+            await bot_runtime.stop()
+        await stop_notifier()
+
+
+app = FastAPI(title="TenderBot Admin", lifespan=lifespan)
 app.mount("/static", StaticFiles(directory=Path(__file__).parent / "static"), name="static")
 
 app.include_router(health_router, tags=["health"])
@@ -29,6 +60,8 @@ app.include_router(reviews_router, prefix="/reviews", tags=["reviews"])
 app.include_router(moderation_router, tags=["moderation"])
 app.include_router(applications_manage_router, tags=["applications_manage"])
 app.include_router(miniapp_router)
+if _BOT_IN_WEB:
+    app.include_router(webhook_router, tags=["telegram"])
 
 
 @app.get("/")
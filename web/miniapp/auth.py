@@ -1,11 +1,67 @@
-# web/miniapp/auth.py — проверка initData от Telegram Web App
+# web/miniapp/auth.py — проверка initData от Telegram Web App и сессионный токен Mini App
 import hmac
 import hashlib
 import json
+import time
+from dataclasses import asdict, dataclass
+from functools import lru_cache
 from urllib.parse import parse_qsl
 from typing import Optional
 
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
 from config import settings
+from utils.cache import get_cache
+
+# Проверенные initData в общем кэше процесса: повторные запросы с тем же initData не считают HMAC
+_VERIFIED_PREFIX = "miniapp_init"
+
+_session_serializer = URLSafeTimedSerializer(settings.WEB_SECRET_KEY, salt="miniapp-session")
+
+
+@lru_cache(maxsize=1)
+def _webapp_secret(bot_token: str) -> bytes:
+    """secret_key = HMAC_SHA256(bot_token, "WebAppData") — один раз на токен бота."""
+    return hmac.new(b"WebAppData", bot_token.encode(), hashlib.sha256).digest()
+
+
+def _is_fresh(parsed: dict, max_age_sec: Optional[int]) -> bool:
+    """auth_date не старше max_age_sec (если проверка включена)."""
+    if max_age_sec is None:
+        return True
+    auth_date = parsed.get("auth_date")
+    if not auth_date:
+        return True
+    try:
+        return abs(time.time() - int(auth_date)) <= max_age_sec
+    except (ValueError, TypeError):
+        return False
+
+
+def _verify(init_data: str) -> Optional[dict]:
+    parsed = dict(parse_qsl(init_data, keep_blank_values=True))
+    received_hash = parsed.pop("hash", None)
+    if not received_hash:
+        return None
+    # Сортируем и склеиваем key=value через \n
+    data_check = "\n".join(
+        f"{k}={v}" for k, v in sorted(parsed.items(), key=lambda x: x[0])
+    )
+    # calculated_hash = HMAC_SHA256(secret_key, data_check)
+    calculated_hash = hmac.new(
+        _webapp_secret(settings.BOT_TOKEN),
+        data_check.encode(),
+        hashlib.sha256,
+    ).hexdigest()
+    if not hmac.compare_digest(calculated_hash, received_hash):
+        return None
+    # user приходит как JSON-строка
+    if "user" in parsed:
+        try:
+            parsed["user"] = json.loads(parsed["user"])
+        except (json.JSONDecodeError, TypeError):
+            pass
+    return parsed
 
 
 def validate_init_data(init_data: str, max_age_sec: Optional[int] = 86400) -> Optional[dict]:
@@ -13,53 +69,26 @@ def validate_init_data(init_data: str, max_age_sec: Optional[int] = 86400) -> Op
     Проверяет подпись initData от Telegram Web App.
     https://core.telegram.org/bots/webapps#validating-data-received-via-the-mini-app
 
-    Возвращает распарсенный dict с полями user, auth_date, hash и т.д. или None при ошибке.
+    Возвращает распарсенный dict с полями user, auth_date и т.д. или None при ошибке.
+    Успешно проверенные initData запоминаются на MINIAPP_INIT_DATA_CACHE_TTL секунд
+    (ключ — хэш всей строки, поэтому изменённые данные с чужим hash в кэш не попадут).
     """
     if not init_data or not settings.BOT_TOKEN:
         return None
-    try:
-        parsed = dict(parse_qsl(init_data, keep_blank_values=True))
-        received_hash = parsed.pop("hash", None)
-        if not received_hash:
+    cache = get_cache()
+    cache_key = f"{_VERIFIED_PREFIX}:{hashlib.sha256(init_data.encode()).hexdigest()}"
+    parsed = cache.get(cache_key)
+    if parsed is None:
+        try:
+            parsed = _verify(init_data)
+        except Exception:
             return None
-        # Сортируем и склеиваем key=value через \n
-        data_check = "\n".join(
-            f"{k}={v}" for k, v in sorted(parsed.items(), key=lambda x: x[0])
-        )
-        # secret_key = HMAC_SHA256(bot_token, "WebAppData")
-        secret_key = hmac.new(
-            b"WebAppData",
-            settings.BOT_TOKEN.encode(),
-            hashlib.sha256,
-        ).digest()
-        # calculated_hash = HMAC_SHA256(secret_key, data_check)
-        calculated_hash = hmac.new(
-            secret_key,
-            data_check.encode(),
-            hashlib.sha256,
-        ).hexdigest()
-        if not hmac.compare_digest(calculated_hash, received_hash):
+        if parsed is None:
             return None
-        # Опционально проверка auth_date (не старше max_age_sec)
-        if max_age_sec is not None:
-            auth_date = parsed.get("auth_date")
-            if auth_date:
-                import time
-                try:
-                    ts = int(auth_date)
-                    if abs(time.time() - ts) > max_age_sec:
-                        return None
-                except (ValueError, TypeError):
-                    return None
-        # user приходит как JSON-строка
-        if "user" in parsed:
-            try:
-                parsed["user"] = json.loads(parsed["user"])
-            except (json.JSONDecodeError, TypeError):
-                pass
-        return parsed
-    except Exception:
+        cache.set(cache_key, parsed, settings.MINIAPP_INIT_DATA_CACHE_TTL)
+    if not _is_fresh(parsed, max_age_sec):
         return None
+    return parsed
 
 
 def get_tg_id_from_init_data(init_data: str) -> Optional[int]:
@@ -71,3 +100,38 @@ def get_tg_id_from_init_data(init_data: str) -> Optional[int]:
     if isinstance(user, dict) and "id" in user:
         return int(user["id"])
     return None
+
+
+@dataclass(frozen=True)
+class MiniAppSession:
+    """
+    Пользователь Mini App из подписанного токена — без проверки initData и запроса в БД.
+    Данные актуальны на момент выдачи: смена статуса в админке вступает в силу
+    не позднее чем через MINIAPP_SESSION_TTL секунд.
+    """
+    user_id: int
+    tg_id: int
+    status: str
+    role: str
+    city: Optional[str]
+
+
+def issue_session_token(user) -> str:
+    """Токен для заголовка X-Miniapp-Session по пользователю из БД."""
+    return _session_serializer.dumps(asdict(MiniAppSession(
+        user_id=user.id,
+        tg_id=user.tg_id,
+        status=user.status,
+        role=user.role,
+        city=user.city,
+    )))
+
+
+def load_session_token(token: str) -> Optional[MiniAppSession]:
+    """Сессия из токена или None (нет, подпись неверна или срок истёк)."""
+    if not token:
+        return None
+    try:
+        return MiniAppSession(**_session_serializer.loads(token, max_age=settings.MINIAPP_SESSION_TTL))
+    except (BadSignature, TypeError):
+        return None
@@ -1,24 +1,58 @@
-# web/miniapp/notify.py — отправка уведомлений в Telegram через Bot API
+# web/miniapp/notify.py — отправка уведомлений в Telegram через Bot API (общий клиент и фоновая очередь)
+import asyncio
 import logging
-from typing import Optional
+from typing import Any, Optional
 
 import httpx
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Повторы при 429 (flood control) и сетевых ошибках
+_MAX_ATTEMPTS = 3
+_MAX_RETRY_AFTER = 30
 
-def send_telegram_message(
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Общий клиент процесса: keep-alive и (если установлен h2) HTTP/2 к api.telegram.org."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=f"https://api.telegram.org/bot{settings.BOT_TOKEN}/",
+            timeout=httpx.Timeout(10.0, connect=5.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0),
+            http2=_http2_available(),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def send_telegram_message(
     chat_id: int,
     text: str,
     parse_mode: str = "HTML",
     reply_markup: Optional[dict] = None,
 ) -> bool:
     """
-    Отправляет сообщение пользователю или в чат через Bot API.
-    Используется для уведомлений из Mini App (отклик принят, тендер создан и т.д.).
+    Отправляет сообщение пользователю или в чат через Bot API и ждёт ответа.
+    В роутах используйте enqueue_telegram_message, чтобы не задерживать ответ.
     """
-    url = f"https://api.telegram.org/bot{settings.BOT_TOKEN}/sendMessage"
     payload = {
         "chat_id": chat_id,
         "text": text[:4096],
@@ -26,13 +60,122 @@ def send_telegram_message(
     }
     if reply_markup:
         payload["reply_markup"] = reply_markup
-    try:
-        with httpx.Client(timeout=10.0) as client:
-            r = client.post(url, json=payload)
-            if r.is_success:
-                return True
-            logger.warning("Telegram sendMessage failed: %s %s", r.status_code, r.text)
-            return False
-    except Exception as e:
-        logger.exception("send_telegram_message error: %s", e)
+    client = get_http_client()
+    for attempt in range(1, _MAX_ATTEMPTS + 1):
+        try:
+            r = await client.post("sendMessage", json=payload)
+        except httpx.HTTPError as e:
+            if attempt == _MAX_ATTEMPTS:
+                logger.warning("send_telegram_message to %s failed: %s", chat_id, e)
+                return False
+            await asyncio.sleep(attempt)
+            continue
+        if r.is_success:
+            return True
+        if r.status_code == 429 and attempt < _MAX_ATTEMPTS:
+            try:
+                retry_after = int(r.json().get("parameters", {}).get("retry_after", 1))
+            except ValueError:
+                retry_after = 1
+            await asyncio.sleep(min(retry_after, _MAX_RETRY_AFTER))
+            continue
+        logger.warning("Telegram sendMessage failed: %s %s", r.status_code, r.text)
         return False
+    return False
+
+
+class NotificationQueue:
+    """Ограниченная очередь уведомлений веб-процесса: роут ставит задачу и сразу отвечает."""
+
+    def __init__(self, maxsize: int, workers: int):
+        self._maxsize = maxsize
+        self._workers_count = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+        self._metrics = {"enqueued": 0, "sent": 0, "failed": 0, "dropped": 0}
+
+    @property
+    def started(self) -> bool:
+        return bool(self._workers)
+
+    def start(self) -> None:
+        if self.started:
+            return
+        self._queue = asyncio.Queue(maxsize=self._maxsize)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"web-notify-{i}")
+            for i in range(self._workers_count)
+        ]
+        logger.info("Web notification queue started (%s workers)", self._workers_count)
+
+    def enqueue(self, chat_id: int, text: str, **kwargs: Any) -> bool:
+        """Поставить сообщение в очередь; False — очередь переполнена, сообщение отброшено."""
+        if not self.started:
+            self.start()
+        try:
+            self._queue.put_nowait((chat_id, text, kwargs))
+        except asyncio.QueueFull:
+            self._metrics["dropped"] += 1
+            logger.warning("Web notification queue is full, message to %s dropped", chat_id)
+            return False
+        self._metrics["enqueued"] += 1
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            chat_id, text, kwargs = await self._queue.get()
+            try:
+                ok = await send_telegram_message(chat_id, text, **kwargs)
+                self._metrics["sent" if ok else "failed"] += 1
+            except Exception as e:
+                self._metrics["failed"] += 1
+                logger.exception("Web notification to %s failed: %s", chat_id, e)
+            finally:
+                self._queue.task_done()
+
+    async def stop(self, timeout: float) -> None:
+        """Дождаться отправки оставшегося (не дольше timeout) и остановить воркеры."""
+        if not self.started:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Web notification queue: %s messages not sent on shutdown", self._queue.qsize())
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def get_metrics(self) -> dict[str, Any]:
+        return {
+            **self._metrics,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "workers": len(self._workers),
+        }
+
+
+_notifier = NotificationQueue(settings.WEB_NOTIFY_QUEUE_SIZE, settings.WEB_NOTIFY_WORKERS)
+
+
+def enqueue_telegram_message(
+    chat_id: int,
+    text: str,
+    parse_mode: str = "HTML",
+    reply_markup: Optional[dict] = None,
+) -> bool:
+    """Отправить уведомление в фоне (не блокирует ответ роута)."""
+    return _notifier.enqueue(chat_id, text, parse_mode=parse_mode, reply_markup=reply_markup)
+
+
+def get_notifier_metrics() -> dict[str, Any]:
+    return _notifier.get_metrics()
+
+
+async def start_notifier() -> None:
+    _notifier.start()
+
+
+async def stop_notifier() -> None:
+    await _notifier.stop(settings.WEB_NOTIFY_DRAIN_TIMEOUT)
+    await close_http_client()
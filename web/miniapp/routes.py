@@ -2,17 +2,30 @@
 from datetime import datetime, timezone
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Body
+from fastapi import APIRouter, Depends, Header, HTTPException, Body, Query, Request, Response
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
-from sqlalchemy import select
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import and_, func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from pathlib import Path
 
 from config import settings
 from web.database import get_db
-from web.miniapp.auth import get_tg_id_from_init_data
-from web.miniapp.notify import send_telegram_message
+from web.miniapp.auth import (
+    MiniAppSession,
+    get_tg_id_from_init_data,
+    issue_session_token,
+    load_session_token,
+)
+from web.miniapp.notify import enqueue_telegram_message
+from web.events import get_event_hub
+from web.utils.http_cache import not_modified, weak_etag
+from services.cache_bus import CacheBus
+from services.realtime import user_topic
+from services.tender_search import TenderSearchService
+from services.tender_service import TenderService
+from services.user_service import UserService
 from database.models import (
     User,
     Tender,
@@ -25,6 +38,10 @@ from database.models import (
 
 router = APIRouter(prefix="/miniapp", tags=["miniapp"])
 
+# Сессионный токен: выдаётся в ответе после проверки initData, клиент присылает его в следующих запросах
+SESSION_HEADER = "X-Miniapp-Session"
+
+
 # Зависимость: текущий пользователь по X-Telegram-Init-Data
 def get_current_tg_id(
     x_telegram_init_data: Optional[str] = Header(None, alias="X-Telegram-Init-Data"),
@@ -35,29 +52,62 @@ def get_current_tg_id(
     return tg_id
 
 
-def get_current_user(
-    tg_id: int = Depends(get_current_tg_id),
-    db: Session = Depends(get_db),
-) -> User:
-    result = db.execute(select(User).where(User.tg_id == tg_id))
+async def _load_user(db: AsyncSession, tg_id: int) -> User:
+    result = await db.execute(select(User).where(User.tg_id == tg_id))
     user = result.scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=404, detail="User not found. Complete registration in the bot first.")
     return user
 
 
-def require_active(user: User = Depends(get_current_user)) -> User:
+async def get_current_user(
+    response: Response,
+    tg_id: int = Depends(get_current_tg_id),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """Пользователь из БД (для запросов, которым нужен весь профиль); заодно обновляет токен сессии."""
+    user = await _load_user(db, tg_id)
+    response.headers[SESSION_HEADER] = issue_session_token(user)
+    return user
+
+
+async def get_current_session(
+    response: Response,
+    x_miniapp_session: Optional[str] = Header(None, alias=SESSION_HEADER),
+    x_telegram_init_data: Optional[str] = Header(None, alias="X-Telegram-Init-Data"),
+    db: AsyncSession = Depends(get_db),
+) -> MiniAppSession:
+    """
+    Пользователь из токена X-Miniapp-Session — без проверки initData и запроса в БД.
+    Без токена (или с истёкшим) — как get_current_user, и в ответе выдаётся новый токен.
+    """
+    session = load_session_token(x_miniapp_session or "")
+    if session is not None:
+        return session
+    await get_current_user(response, get_current_tg_id(x_telegram_init_data), db)
+    return load_session_token(response.headers[SESSION_HEADER])
+
+
+async def require_active(user: User = Depends(get_current_user)) -> User:
     if user.status == UserStatus.BANNED.value:
         raise HTTPException(status_code=403, detail="Account blocked")
     return user
 
 
+async def require_active_session(
+    session: MiniAppSession = Depends(get_current_session),
+) -> MiniAppSession:
+    if session.status == UserStatus.BANNED.value:
+        raise HTTPException(status_code=403, detail="Account blocked")
+    return session
+
+
 # ——— Раздача главной страницы Mini App ———
 _MINIAPP_STATIC = Path(__file__).parent.parent / "static" / "miniapp"
 
 
 @router.get("/", response_class=FileResponse)
-def miniapp_index():
+async def miniapp_index():
     """Отдаёт index.html Mini App."""
     index_path = _MINIAPP_STATIC / "index.html"
     if not index_path.exists():
@@ -66,7 +116,7 @@ def miniapp_index():
 
 
 @router.get("/styles.css", response_class=FileResponse)
-def miniapp_css():
+async def miniapp_css():
     p = _MINIAPP_STATIC / "styles.css"
     if not p.exists():
         raise HTTPException(status_code=404)
@@ -74,19 +124,22 @@ def miniapp_css():
 
 
 @router.get("/app.js", response_class=FileResponse)
-def miniapp_js():
+async def miniapp_js():
     p = _MINIAPP_STATIC / "app.js"
     if not p.exists():
         raise HTTPException(status_code=404)
     return FileResponse(p, media_type="application/javascript")
 
 
-# ——— API: я (текущий пользователь) ———
-@router.get("/api/me")
-def api_me(
-    user: User = Depends(get_current_user),
-):
-    """Текущий пользователь: есть ли в БД, статус, роль."""
+def _deadline_iso(deadline: Optional[datetime]) -> Optional[str]:
+    if not deadline:
+        return None
+    if deadline.tzinfo is None:
+        deadline = deadline.replace(tzinfo=timezone.utc)
+    return deadline.isoformat()
+
+
+def _me_payload(user: User) -> dict:
     return {
         "id": user.id,
         "tg_id": user.tg_id,
@@ -101,9 +154,150 @@ def api_me(
     }
 
 
+def _open_tenders_filter(city: Optional[str], category: Optional[str] = None) -> list:
+    conditions = [Tender.status == TenderStatus.OPEN.value, Tender.city == city]
+    if category:
+        conditions.append(Tender.category == category)
+    return conditions
+
+
+def _open_tenders_query(city: Optional[str], category: Optional[str] = None):
+    return (
+        select(Tender)
+        .where(*_open_tenders_filter(city, category))
+        .order_by(Tender.id.desc())
+        .limit(50)
+    )
+
+
+# Версии данных для ETag: одна агрегатная выборка по индексу вместо сборки всего ответа.
+# count ловит удаления и выход из выборки, max(updated_at) — добавления и любые изменения строк.
+def _tenders_version_query(user_id: int, city: Optional[str], category: Optional[str]):
+    tenders = (
+        select(func.count(Tender.id).label("n"), func.max(Tender.updated_at).label("changed"))
+        .where(*_open_tenders_filter(city, category))
+        .subquery()
+    )
+    # has_applied в списке зависит от откликов пользователя
+    applications = (
+        select(func.count(TenderApplication.id).label("n"), func.max(TenderApplication.updated_at).label("changed"))
+        .where(TenderApplication.user_id == user_id)
+        .subquery()
+    )
+    return select(tenders.c.n, tenders.c.changed, applications.c.n, applications.c.changed).select_from(
+        tenders.join(applications, true())
+    )
+
+
+def _applications_version_query(user_id: int):
+    return (
+        select(
+            func.count(TenderApplication.id),
+            func.max(TenderApplication.updated_at),
+            func.max(Tender.updated_at),
+        )
+        .join(Tender, TenderApplication.tender_id == Tender.id)
+        .where(TenderApplication.user_id == user_id)
+    )
+
+
+def _tender_version_query(user_id: int, tender_id: int):
+    return (
+        select(Tender.updated_at, TenderApplication.id, TenderApplication.updated_at)
+        .outerjoin(
+            TenderApplication,
+            and_(TenderApplication.tender_id == Tender.id, TenderApplication.user_id == user_id),
+        )
+        .where(Tender.id == tender_id)
+    )
+
+
+def _tender_list_item(t: Tender, has_applied: bool) -> dict:
+    return {
+        "id": t.id,
+        "title": t.title,
+        "city": t.city,
+        "category": t.category,
+        "budget": t.budget,
+        "description": t.description[:500] if t.description else "",
+        "deadline": _deadline_iso(t.deadline),
+        "status": t.status,
+        "has_applied": has_applied,
+    }
+
+
+def _my_applications_query(user_id: int):
+    return (
+        select(TenderApplication, Tender)
+        .join(Tender, TenderApplication.tender_id == Tender.id)
+        .where(TenderApplication.user_id == user_id)
+        .order_by(TenderApplication.id.desc())
+    )
+
+
+def _application_list_item(app: TenderApplication, tender: Tender) -> dict:
+    return {
+        "id": app.id,
+        "tender_id": tender.id,
+        "tender_title": tender.title,
+        "tender_city": tender.city,
+        "tender_category": tender.category,
+        "tender_budget": tender.budget,
+        "status": app.status,
+        "created_at": app.created_at.isoformat() if app.created_at else None,
+        "deadline": _deadline_iso(tender.deadline),
+    }
+
+
+# ——— API: я (текущий пользователь) ———
+@router.get("/api/me")
+async def api_me(
+    user: User = Depends(get_current_user),
+):
+    """Текущий пользователь: есть ли в БД, статус, роль."""
+    return _me_payload(user)
+
+
+# ——— API: стартовые данные Mini App одним запросом ———
+@router.get("/api/bootstrap")
+async def api_bootstrap(
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    То, что нужно при открытии приложения: пользователь, навыки, заказы в его городе и его отклики.
+    Три запроса (пользователь, тендеры, отклики); has_applied берётся из откликов без отдельного запроса.
+    Заблокированному — только профиль, как и в остальных API.
+    """
+    data = {"me": _me_payload(user), "skills": settings.SKILL_TAGS, "tenders": [], "applications": []}
+    if user.status == UserStatus.BANNED.value:
+        return data
+    tenders = (await db.execute(_open_tenders_query(user.city))).scalars().all()
+    rows = (await db.execute(_my_applications_query(user.id))).all()
+    applied = {tender.id for _app, tender in rows}
+    data["tenders"] = [_tender_list_item(t, t.id in applied) for t in tenders]
+    data["applications"] = [_application_list_item(app, tender) for app, tender in rows]
+    return data
+
+
+# ——— API: живые обновления (SSE) ———
+@router.get("/api/events")
+async def api_events(token: str = Query(..., description="Токен из заголовка X-Miniapp-Session")):
+    """
+    Поток событий пользователя (смена статуса откликов). EventSource не умеет слать заголовки,
+    поэтому токен сессии передаётся в query; проверяется при подключении.
+    """
+    session = load_session_token(token)
+    if session is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired session token")
+    if session.status == UserStatus.BANNED.value:
+        raise HTTPException(status_code=403, detail="Account blocked")
+    return get_event_hub().response([user_topic(session.user_id)])
+
+
 # ——— API: профиль (GET/PATCH) ———
 @router.get("/api/profile")
-def api_profile_get(user: User = Depends(require_active)):
+async def api_profile_get(user: User = Depends(require_active)):
     return {
         "full_name": user.full_name,
         "city": user.city,
@@ -123,10 +317,11 @@ class ProfileUpdate(BaseModel):
 
 
 @router.patch("/api/profile")
-def api_profile_patch(
+async def api_profile_patch(
+    response: Response,
     body: ProfileUpdate = Body(default=ProfileUpdate()),
     user: User = Depends(require_active),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     if body.full_name is not None:
         user.full_name = body.full_name.strip()[:256]
@@ -135,89 +330,88 @@ def api_profile_patch(
     if body.phone is not None:
         user.phone = body.phone.strip()[:64]
     if body.skills is not None:
-        user.skills = [s for s in body.skills if s][:20] or None
-    db.commit()
+        await UserService.set_user_skills(db, user, [s for s in body.skills if s][:20])
+    await CacheBus.publish(db, UserService.cache_key(user.tg_id))
+    await db.commit()
+    # Город в токене влияет на список тендеров — выдаём токен с новыми данными
+    response.headers[SESSION_HEADER] = issue_session_token(user)
     return {"ok": True}
 
 
 # ——— API: список тендеров (открытые, по городу пользователя) ———
 @router.get("/api/tenders")
-def api_tenders_list(
+async def api_tenders_list(
+    request: Request,
+    response: Response,
     city: Optional[str] = None,
     category: Optional[str] = None,
-    user: User = Depends(require_active),
-    db: Session = Depends(get_db),
+    user: MiniAppSession = Depends(require_active_session),
+    db: AsyncSession = Depends(get_db),
 ):
-    q = (
-        select(Tender)
-        .where(Tender.status == TenderStatus.OPEN.value)
-        .order_by(Tender.id.desc())
-    )
-    if city:
-        q = q.where(Tender.city == city)
-    else:
-        q = q.where(Tender.city == user.city)
-    if category:
-        q = q.where(Tender.category == category)
-    q = q.limit(50)
-    result = db.execute(q)
+    city = city or user.city
+    version = (await db.execute(_tenders_version_query(user.user_id, city, category))).one()
+    cached_response = not_modified(request, response, weak_etag("tenders", user.user_id, city, category, *version))
+    if cached_response is not None:
+        return cached_response
+    result = await db.execute(_open_tenders_query(city, category))
     tenders = result.scalars().all()
-    # Проверяем, откликался ли текущий пользователь на каждый
-    out = []
-    for t in tenders:
-        app_result = db.execute(
-            select(TenderApplication.id).where(
-                TenderApplication.tender_id == t.id,
-                TenderApplication.user_id == user.id,
-            )
-        )
-        has_applied = app_result.scalar_one_or_none() is not None
-        deadline_str = None
-        if t.deadline:
-            d = t.deadline
-            if d.tzinfo is None:
-                d = d.replace(tzinfo=timezone.utc)
-            deadline_str = d.isoformat()
-        out.append({
-            "id": t.id,
-            "title": t.title,
-            "city": t.city,
-            "category": t.category,
-            "budget": t.budget,
-            "description": t.description[:500] if t.description else "",
-            "deadline": deadline_str,
-            "status": t.status,
-            "has_applied": has_applied,
-        })
-    return {"tenders": out}
+    # Отклики текущего пользователя на всю страницу — одним запросом
+    viewer_states = await TenderService.get_viewer_states(db, user.user_id, [t.id for t in tenders])
+    return {"tenders": [_tender_list_item(t, viewer_states[t.id].has_applied) for t in tenders]}
+
+
+# ——— API: поиск тендеров (объявлен до /api/tenders/{tender_id}) ———
+_SEARCH_PAGE_SIZE = 20
+_SEARCH_MAX_PAGE = 50
+
+
+@router.get("/api/tenders/search")
+async def api_tenders_search(
+    q: str = Query("", max_length=200),
+    city: Optional[str] = None,
+    category: Optional[str] = None,
+    page: int = Query(1, ge=1, le=_SEARCH_MAX_PAGE),
+    user: MiniAppSession = Depends(require_active_session),
+    db: AsyncSession = Depends(get_db),
+):
+    """Открытые тендеры по словам из заголовка и описания, по убыванию релевантности."""
+    tenders, has_more = await TenderSearchService.search(
+        db,
+        q,
+        city=city or user.city,
+        category=category,
+        limit=_SEARCH_PAGE_SIZE,
+        offset=(page - 1) * _SEARCH_PAGE_SIZE,
+    )
+    viewer_states = await TenderService.get_viewer_states(db, user.user_id, [t.id for t in tenders])
+    return {
+        "tenders": [_tender_list_item(t, viewer_states[t.id].has_applied) for t in tenders],
+        "page": page,
+        "has_more": has_more and page < _SEARCH_MAX_PAGE,
+    }
 
 
 # ——— API: один тендер ———
 @router.get("/api/tenders/{tender_id}")
-def api_tender_detail(
+async def api_tender_detail(
+    request: Request,
+    response: Response,
     tender_id: int,
-    user: User = Depends(require_active),
-    db: Session = Depends(get_db),
+    user: MiniAppSession = Depends(require_active_session),
+    db: AsyncSession = Depends(get_db),
 ):
-    result = db.execute(
+    version = (await db.execute(_tender_version_query(user.user_id, tender_id))).first()
+    if version is not None:
+        cached_response = not_modified(request, response, weak_etag("tender", user.user_id, tender_id, *version))
+        if cached_response is not None:
+            return cached_response
+    result = await db.execute(
         select(Tender).where(Tender.id == tender_id)
     )
     tender = result.scalar_one_or_none()
     if not tender:
         raise HTTPException(status_code=404, detail="Tender not found")
-    app_result = db.execute(
-        select(TenderApplication).where(
-            TenderApplication.tender_id == tender_id,
-            TenderApplication.user_id == user.id,
-        )
-    )
-    my_application = app_result.scalar_one_or_none()
-    deadline_str = None
-    if tender.deadline:
-        d = tender.deadline
-        if d.tzinfo is None:
-            d = d.replace(tzinfo=timezone.utc)
-        deadline_str = d.isoformat()
+    viewer_state = (await TenderService.get_viewer_states(db, user.user_id, [tender.id]))[tender.id]
     return {
         "id": tender.id,
         "title": tender.title,
@@ -225,24 +419,24 @@ def api_tender_detail(
         "category": tender.category,
         "budget": tender.budget,
         "description": tender.description,
-        "deadline": deadline_str,
+        "deadline": _deadline_iso(tender.deadline),
         "status": tender.status,
-        "has_applied": my_application is not None,
-        "application_id": my_application.id if my_application else None,
-        "application_status": my_application.status if my_application else None,
+        "has_applied": viewer_state.has_applied,
+        "application_id": viewer_state.application_id,
+        "application_status": viewer_state.application_status,
     }
 
 
 # ——— API: откликнуться на тендер ———
 @router.post("/api/tenders/{tender_id}/apply")
-def api_tender_apply(
+async def api_tender_apply(
   tender_id: int,
   user: User = Depends(require_active),
-  db: Session = Depends(get_db),
+  db: AsyncSession = Depends(get_db),
 ):
     if user.role not in (UserRole.EXECUTOR.value, UserRole.BOTH.value):
         raise HTTPException(status_code=403, detail="Only executors can apply")
-    result = db.execute(
+    result = await db.execute(
         select(Tender)
         .options(selectinload(Tender.creator))
         .where(Tender.id == tender_id, Tender.status == TenderStatus.OPEN.value)
@@ -256,12 +450,12 @@ def api_tender_apply(
             deadline_utc = deadline_utc.replace(tzinfo=timezone.utc)
         if datetime.now(timezone.utc) > deadline_utc:
             raise HTTPException(status_code=400, detail="Deadline passed")
-    existing = db.execute(
+    existing = (await db.execute(
         select(TenderApplication).where(
             TenderApplication.tender_id == tender_id,
             TenderApplication.user_id == user.id,
         )
-    ).scalar_one_or_none()
+    )).scalar_one_or_none()
     if existing:
         raise HTTPException(status_code=400, detail="Already applied")
     app = TenderApplication(
@@ -270,10 +464,10 @@ def api_tender_apply(
         status="applied",
     )
     db.add(app)
-    db.commit()
-    db.refresh(app)
-    # Уведомление пользователю в чат
-    send_telegram_message(
+    await db.commit()
+    await db.refresh(app)
+    # Уведомления уходят в фоне, ответ Mini App не ждёт Bot API
+    enqueue_telegram_message(
         user.tg_id,
         f"✅ <b>Отклик отправлен</b>\n\n"
         f"Ваш отклик на тендер «{tender.title}» принят. "
@@ -290,86 +484,50 @@ def api_tender_apply(
         f"Навыки: {skills_str}\n"
         f"TG ID: {user.tg_id}"
     )
-    send_telegram_message(settings.ADMIN_ID, admin_text)
+    enqueue_telegram_message(settings.ADMIN_ID, admin_text)
     if tender.creator and tender.creator.tg_id != settings.ADMIN_ID:
-        send_telegram_message(tender.creator.tg_id, admin_text)
+        enqueue_telegram_message(tender.creator.tg_id, admin_text)
     return {"ok": True, "application_id": app.id}
 
 
 # ——— API: мои отклики ———
 @router.get("/api/applications")
-def api_my_applications(
-    user: User = Depends(require_active),
-    db: Session = Depends(get_db),
+async def api_my_applications(
+    request: Request,
+    response: Response,
+    user: MiniAppSession = Depends(require_active_session),
+    db: AsyncSession = Depends(get_db),
 ):
-    result = db.execute(
-        select(TenderApplication, Tender)
-        .join(Tender, TenderApplication.tender_id == Tender.id)
-        .where(TenderApplication.user_id == user.id)
-        .order_by(TenderApplication.id.desc())
-    )
-    rows = result.all()
-    out = []
-    for app, tender in rows:
-        deadline_str = None
-        if tender.deadline:
-            d = tender.deadline
-            if d.tzinfo is None:
-                d = d.replace(tzinfo=timezone.utc)
-            deadline_str = d.isoformat()
-        out.append({
-            "id": app.id,
-            "tender_id": tender.id,
-            "tender_title": tender.title,
-            "tender_city": tender.city,
-            "tender_category": tender.category,
-            "tender_budget": tender.budget,
-            "status": app.status,
-            "created_at": app.created_at.isoformat() if app.created_at else None,
-            "deadline": deadline_str,
-        })
-    return {"applications": out}
+    version = (await db.execute(_applications_version_query(user.user_id))).one()
+    cached_response = not_modified(request, response, weak_etag("applications", user.user_id, *version))
+    if cached_response is not None:
+        return cached_response
+    result = await db.execute(_my_applications_query(user.user_id))
+    return {"applications": [_application_list_item(app, tender) for app, tender in result.all()]}
 
 
 @router.get("/api/applications/{application_id}")
-def api_application_detail(
+async def api_application_detail(
     application_id: int,
-    user: User = Depends(require_active),
-    db: Session = Depends(get_db),
+    user: MiniAppSession = Depends(require_active_session),
+    db: AsyncSession = Depends(get_db),
 ):
-    result = db.execute(
+    result = await db.execute(
         select(TenderApplication, Tender)
         .join(Tender, TenderApplication.tender_id == Tender.id)
         .where(
             TenderApplication.id == application_id,
-            TenderApplication.user_id == user.id,
+            TenderApplication.user_id == user.user_id,
         )
     )
     row = result.one_or_none()
     if not row:
         raise HTTPException(status_code=404, detail="Application not found")
     app, tender = row
-    deadline_str = None
-    if tender.deadline:
-        d = tender.deadline
-        if d.tzinfo is None:
-            d = d.replace(tzinfo=timezone.utc)
-        deadline_str = d.isoformat()
-    return {
-        "id": app.id,
-        "tender_id": tender.id,
-        "tender_title": tender.title,
-        "tender_city": tender.city,
-        "tender_category": tender.category,
-        "tender_budget": tender.budget,
-        "tender_description": tender.description,
-        "status": app.status,
-        "created_at": app.created_at.isoformat() if app.created_at else None,
-        "deadline": deadline_str,
-    }
+    return {**_application_list_item(app, tender), "tender_description": tender.description}
 
 
 # ——— API: навыки (категории) для выбора в профиле ———
 @router.get("/api/skills")
-def api_skills():
+async def api_skills():
     return {"skills": settings.SKILL_TAGS}
@@ -2,12 +2,15 @@
 from fastapi import APIRouter, Request, Depends, Query
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy import select
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from web.database import get_db
 from web.auth import get_session_user
 from web.templates_loader import templates
-from database.models import TenderApplication
+from web.utils.pagination import paginate
+from database.models import TenderApplication, Review
+from services.review_service import ReviewService
 
 router = APIRouter()
 
@@ -16,16 +19,17 @@ router = APIRouter()
 async def application_delete(
     request: Request,
     application_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Удалить отклик (например ошибочный или спам)."""
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
-    app = db.execute(select(TenderApplication).where(TenderApplication.id == application_id)).scalar_one_or_none()
+    app = (await db.execute(select(TenderApplication).where(TenderApplication.id == application_id))).scalar_one_or_none()
     if app:
         tender_id = app.tender_id
-        db.delete(app)
-        db.commit()
+        await ReviewService.delete_reviews_where(db, Review.application_id == application_id)
+        await db.delete(app)
+        await db.commit()
         return RedirectResponse(url=f"/tenders/{tender_id}", status_code=302)
     return RedirectResponse(url="/applications", status_code=302)
 
@@ -33,8 +37,10 @@ async def application_delete(
 @router.get("", response_class=HTMLResponse)
 async def applications_list(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     status: str | None = Query(None),
+    after: int | None = Query(None),
+    before: int | None = Query(None),
 ):
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
@@ -44,12 +50,14 @@ async def applications_list(
             selectinload(TenderApplication.tender),
             selectinload(TenderApplication.user),
         )
-        .order_by(TenderApplication.id.desc())
     )
     if status:
         q = q.where(TenderApplication.status == status)
-    applications = db.execute(q).scalars().all()
+    page = await paginate(
+        request, db, q, TenderApplication.id, after=after, before=before,
+        count_key=f"count:applications:{status or ''}",
+    )
     return templates.TemplateResponse(
         "applications.html",
-        {"request": request, "applications": applications},
+        {"request": request, "applications": page.items, "page": page},
     )
@@ -3,12 +3,14 @@ import logging
 from fastapi import APIRouter, Request, Depends, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy import select
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import Annotated
 
 from web.database import get_db
 from web.auth import get_session_user
-from web.miniapp.notify import send_telegram_message
+from web.miniapp.notify import enqueue_telegram_message
+from services.realtime import RealtimeEvents
 from database.models import TenderApplication, Tender, TenderStatus
 
 logger = logging.getLogger(__name__)
@@ -20,22 +22,24 @@ router = APIRouter()
 async def select_application(
     request: Request,
     application_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Выбрать исполнителя по отклику."""
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
     
-    app = db.execute(
+    app = (await db.execute(
         select(TenderApplication)
         .options(selectinload(TenderApplication.tender), selectinload(TenderApplication.user))
         .where(TenderApplication.id == application_id)
-    ).scalar_one_or_none()
+    )).scalar_one_or_none()
     
     if not app:
         logger.warning(f"Attempt to select non-existent application {application_id}")
         return RedirectResponse(url="/applications", status_code=302)
     
+    # После rollback атрибуты истекают, а ленивой подгрузки в AsyncSession нет
+    tender_id = app.tender_id
     try:
         # Обновляем статус отклика
         app.status = "selected"
@@ -44,49 +48,53 @@ async def select_application(
         app.tender.status = TenderStatus.IN_PROGRESS.value
         
         # Отклоняем остальные отклики
-        other_apps = db.execute(
+        other_apps = (await db.execute(
             select(TenderApplication).where(
                 TenderApplication.tender_id == app.tender_id,
                 TenderApplication.id != app.id,
             )
-        ).scalars().all()
+        )).scalars().all()
         for other in other_apps:
             other.status = "rejected"
         
-        db.commit()
+        for changed in (app, *other_apps):
+            await RealtimeEvents.application_status(db, changed)
+        await db.commit()
         logger.info(f"Application {application_id} selected for tender {app.tender_id}")
         return RedirectResponse(url=f"/tenders/{app.tender_id}", status_code=302)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error selecting application {application_id}: {e}")
-        return RedirectResponse(url=f"/tenders/{app.tender_id}?error=Ошибка выбора исполнителя", status_code=302)
+        return RedirectResponse(url=f"/tenders/{tender_id}?error=Ошибка выбора исполнителя", status_code=302)
 
 
 @router.post("/applications/{application_id}/reject", response_class=HTMLResponse)
 async def reject_application(
     request: Request,
     application_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Отклонить отклик."""
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
     
-    app = db.execute(
+    app = (await db.execute(
         select(TenderApplication)
         .options(selectinload(TenderApplication.tender), selectinload(TenderApplication.user))
         .where(TenderApplication.id == application_id)
-    ).scalar_one_or_none()
+    )).scalar_one_or_none()
     
     if not app:
         logger.warning(f"Attempt to reject non-existent application {application_id}")
         return RedirectResponse(url="/applications", status_code=302)
     
+    tender_id = app.tender_id
     try:
         app.status = "rejected"
-        db.commit()
+        await RealtimeEvents.application_status(db, app)
+        await db.commit()
         # Уведомление в чат исполнителю
-        send_telegram_message(
+        enqueue_telegram_message(
             app.user.tg_id,
             f"❌ <b>Отклик отклонён</b>\n\n"
             f"К сожалению, ваш отклик на тендер «{app.tender.title}» не принят.\n\n"
@@ -95,7 +103,7 @@ async def reject_application(
         logger.info(f"Application {application_id} rejected")
         return RedirectResponse(url=f"/tenders/{app.tender_id}", status_code=302)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error rejecting application {application_id}: {e}")
-        return RedirectResponse(url=f"/tenders/{app.tender_id}?error=Ошибка отклонения отклика", status_code=302)
+        return RedirectResponse(url=f"/tenders/{tender_id}?error=Ошибка отклонения отклика", status_code=302)
 
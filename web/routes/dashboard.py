@@ -1,15 +1,14 @@
 # web/routes/dashboard.py
-from datetime import datetime, timedelta, timezone
-
 from fastapi import APIRouter, Request, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse
-from sqlalchemy import select, func
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from web.database import get_db
 from web.auth import get_session_user
 from web.templates_loader import templates
-from database.models import User, Tender, TenderApplication, Review
+from database.models import User, Tender
+from services.stats_service import StatsService
 
 router = APIRouter()
 
@@ -17,43 +16,28 @@ router = APIRouter()
 @router.get("/dashboard", response_class=HTMLResponse)
 async def dashboard(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
-    now = datetime.now(timezone.utc)
-    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    week_ago = today - timedelta(days=7)
-    users_total = db.execute(select(func.count(User.id))).scalar() or 0
-    tenders_total = db.execute(select(func.count(Tender.id))).scalar() or 0
-    apps_today = db.execute(
-        select(func.count(TenderApplication.id)).where(TenderApplication.created_at >= today)
-    ).scalar() or 0
-    apps_week = db.execute(
-        select(func.count(TenderApplication.id)).where(TenderApplication.created_at >= week_ago)
-    ).scalar() or 0
-    users_by_role = db.execute(
-        select(User.role, func.count(User.id)).group_by(User.role)
-    ).all()
-    tenders_by_status = db.execute(
-        select(Tender.status, func.count(Tender.id)).group_by(Tender.status)
-    ).all()
-    recent_users = db.execute(
-        select(User).order_by(User.created_at.desc()).limit(5)
-    ).scalars().all()
-    recent_tenders = db.execute(
-        select(Tender).order_by(Tender.created_at.desc()).limit(5)
-    ).scalars().all()
+    # Счётчики — из общего снимка (один запрос к БД раз в STATS_CACHE_TTL)
+    stats = await StatsService.get_snapshot()
+    recent_users = (await db.execute(
+        select(User).order_by(User.id.desc()).limit(5)
+    )).scalars().all()
+    recent_tenders = (await db.execute(
+        select(Tender).order_by(Tender.id.desc()).limit(5)
+    )).scalars().all()
     return templates.TemplateResponse(
         "dashboard.html",
         {
             "request": request,
-            "users_total": users_total,
-            "tenders_total": tenders_total,
-            "apps_today": apps_today,
-            "apps_week": apps_week,
-            "users_by_role": users_by_role,
-            "tenders_by_status": tenders_by_status,
+            "users_total": stats.users_total,
+            "tenders_total": stats.tenders_total,
+            "apps_today": stats.apps_today,
+            "apps_week": stats.apps_week,
+            "users_by_role": stats.users_by_role,
+            "tenders_by_status": sorted(stats.tenders_by_status.items()),
             "recent_users": recent_users,
             "recent_tenders": recent_tenders,
         },
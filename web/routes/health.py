@@ -2,19 +2,20 @@
 from fastapi import APIRouter, Depends
 from fastapi.responses import JSONResponse
 from sqlalchemy import text
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from web.database import get_db
+from web.miniapp.notify import get_notifier_metrics
 
 router = APIRouter()
 
 
 @router.get("/health")
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_db)):
     """Проверка состояния системы."""
     try:
         # Проверяем подключение к БД
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
         db_status = "ok"
     except Exception as e:
         db_status = f"error: {str(e)}"
@@ -23,6 +24,7 @@ async def health_check(db: Session = Depends(get_db)):
         "status": "ok" if db_status == "ok" else "degraded",
         "database": db_status,
         "service": "tenderbot",
+        "notifications": get_notifier_metrics(),
     })
 
 
@@ -33,10 +35,10 @@ async def liveness_check():
 
 
 @router.get("/health/ready")
-async def readiness_check(db: Session = Depends(get_db)):
+async def readiness_check(db: AsyncSession = Depends(get_db)):
     """Readiness probe для Kubernetes/Docker."""
     try:
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
         return JSONResponse({"status": "ready"})
     except Exception:
         return JSONResponse({"status": "not_ready"}, status_code=503)
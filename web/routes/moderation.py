@@ -2,13 +2,15 @@
 from fastapi import APIRouter, Request, Depends, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated
 
 from web.database import get_db
 from web.auth import get_session_user
 from web.templates_loader import templates
 from database.models import User, UserStatus
+from services.cache_bus import CacheBus
+from services.user_service import UserService
 
 router = APIRouter()
 
@@ -17,15 +19,16 @@ router = APIRouter()
 async def approve_user(
     request: Request,
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
     
-    user = db.execute(select(User).where(User.id == user_id)).scalar_one_or_none()
+    user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
     if user:
         user.status = UserStatus.ACTIVE.value
-        db.commit()
+        await CacheBus.publish(db, UserService.cache_key(user.tg_id))
+        await db.commit()
     
     return RedirectResponse(url=f"/users/{user_id}", status_code=302)
 
@@ -34,15 +37,16 @@ async def approve_user(
 async def reject_user(
     request: Request,
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
     
-    user = db.execute(select(User).where(User.id == user_id)).scalar_one_or_none()
+    user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
     if user:
         user.status = UserStatus.BANNED.value
-        db.commit()
+        await CacheBus.publish(db, UserService.cache_key(user.tg_id))
+        await db.commit()
     
     return RedirectResponse(url=f"/users/{user_id}", status_code=302)
 
@@ -51,15 +55,16 @@ async def reject_user(
 async def ban_user(
     request: Request,
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
     
-    user = db.execute(select(User).where(User.id == user_id)).scalar_one_or_none()
+    user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
     if user:
         user.status = UserStatus.BANNED.value
-        db.commit()
+        await CacheBus.publish(db, UserService.cache_key(user.tg_id))
+        await db.commit()
     
     return RedirectResponse(url=f"/users/{user_id}", status_code=302)
 
@@ -68,15 +73,16 @@ async def ban_user(
 async def unban_user(
     request: Request,
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
     
-    user = db.execute(select(User).where(User.id == user_id)).scalar_one_or_none()
+    user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
     if user:
         user.status = UserStatus.ACTIVE.value
-        db.commit()
+        await CacheBus.publish(db, UserService.cache_key(user.tg_id))
+        await db.commit()
     
     return RedirectResponse(url=f"/users/{user_id}", status_code=302)
 
@@ -1,13 +1,15 @@
 # web/routes/reviews.py
-from fastapi import APIRouter, Request, Depends
+from fastapi import APIRouter, Request, Depends, Query
 from fastapi.responses import HTMLResponse, RedirectResponse
-from sqlalchemy import select, func
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from web.database import get_db
 from web.auth import get_session_user
 from web.templates_loader import templates
+from web.utils.pagination import paginate
 from database.models import Review, User
+from services.review_service import ReviewService
 
 router = APIRouter()
 
@@ -16,34 +18,42 @@ router = APIRouter()
 async def review_delete(
     request: Request,
     review_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Удалить отзыв (например некорректный)."""
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
-    review = db.execute(select(Review).where(Review.id == review_id)).scalar_one_or_none()
+    review = (await db.execute(select(Review).where(Review.id == review_id))).scalar_one_or_none()
     if review:
-        db.delete(review)
-        db.commit()
+        await ReviewService.delete_review(db, review)
+        await db.commit()
     return RedirectResponse(url="/reviews", status_code=302)
 
 
 @router.get("", response_class=HTMLResponse)
 async def reviews_list(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    after: int | None = Query(None),
+    before: int | None = Query(None),
 ):
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
-    reviews = db.execute(
-        select(Review).order_by(Review.created_at.desc()).limit(100)
-    ).scalars().all()
-    result = db.execute(
-        select(Review.to_user_id, func.avg(Review.rating), func.count(Review.id))
-        .group_by(Review.to_user_id)
+    page = await paginate(
+        request, db, select(Review), Review.id, after=after, before=before,
+        count_key="count:reviews",
     )
-    avg_by_user = {row[0]: (float(row[1]) if row[1] else 0, row[2]) for row in result.all()}
+    reviews = page.items
+    # Рейтинги только получателей показанных отзывов (агрегаты хранятся в users)
+    to_user_ids = {r.to_user_id for r in reviews}
+    avg_by_user = {}
+    if to_user_ids:
+        result = await db.execute(
+            select(User.id, User.rating_sum, User.rating_count)
+            .where(User.id.in_(to_user_ids), User.rating_count > 0)
+        )
+        avg_by_user = {row[0]: (row[1] / row[2], row[2]) for row in result.all()}
     return templates.TemplateResponse(
         "reviews.html",
-        {"request": request, "reviews": reviews, "avg_by_user": avg_by_user},
+        {"request": request, "reviews": reviews, "avg_by_user": avg_by_user, "page": page},
     )
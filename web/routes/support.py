@@ -1,16 +1,19 @@
 # web/routes/support.py — тикеты поддержки в веб-админке
-import httpx
-
 from fastapi import APIRouter, Request, Depends, Query, Form
 from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
 from sqlalchemy import select, func
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
-from config import settings
 from web.database import get_db
 from web.auth import get_session_user
 from web.templates_loader import templates
-from database.models import User, SupportTicket, SupportMessage, TicketStatus
+from web.events import get_event_hub
+from web.utils.pagination import paginate
+from database.models import User, SupportTicket, TicketStatus
+from services.realtime import ADMIN_TOPIC
+from services.support_service import SupportService
+from web.miniapp.notify import enqueue_telegram_message
 
 router = APIRouter()
 
@@ -18,41 +21,32 @@ router = APIRouter()
 @router.get("", response_class=HTMLResponse)
 async def support_list(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     status: str | None = Query(None),
+    after: int | None = Query(None),
+    before: int | None = Query(None),
 ):
     """Список тикетов: новые (красные), в процессе (жёлтые), закрытые (архив)."""
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
 
-    q = (
-        select(SupportTicket)
-        .options(selectinload(SupportTicket.user))
-        .order_by(SupportTicket.id.desc())
-    )
-    if status and status in ("new", "in_progress", "closed"):
+    q = select(SupportTicket).options(selectinload(SupportTicket.user))
+    if status not in ("new", "in_progress", "closed"):
+        status = None
+    if status:
         q = q.where(SupportTicket.status == status)
-    tickets = db.execute(q).scalars().all()
-
-    # Последнее сообщение по каждому тикету
-    last_msgs = {}
-    for t in tickets:
-        last = (
-            db.execute(
-                select(SupportMessage.text, SupportMessage.created_at)
-                .where(SupportMessage.ticket_id == t.id)
-                .order_by(SupportMessage.created_at.desc())
-                .limit(1)
-            )
-        ).first()
-        last_msgs[t.id] = last
+    page = await paginate(
+        request, db, q, SupportTicket.id, after=after, before=before,
+        count_key=f"count:support_tickets:{status or ''}",
+    )
+    tickets = page.items
 
     return templates.TemplateResponse(
         "support.html",
         {
             "request": request,
             "tickets": tickets,
-            "last_msgs": last_msgs,
+            "page": page,
             "status_filter": status,
             "statuses": [
                 ("new", "Новые"),
@@ -67,14 +61,14 @@ async def support_list(
 async def support_chat(
     request: Request,
     ticket_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Страница чата с пользователем по тикету."""
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
 
     ticket = (
-        db.execute(
+        await db.execute(
             select(SupportTicket)
             .options(
                 selectinload(SupportTicket.user),
@@ -87,6 +81,9 @@ async def support_chat(
         return RedirectResponse(url="/support", status_code=302)
 
     messages = sorted(ticket.messages, key=lambda m: m.created_at or 0)
+    if ticket.unread_count:
+        await SupportService.mark_read(db, ticket)
+        await db.commit()
     return templates.TemplateResponse(
         "support_chat.html",
         {
@@ -101,7 +98,7 @@ async def support_chat(
 async def support_reply(
     request: Request,
     ticket_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     text: str = Form(""),
 ):
     """Ответ админа: сохраняем в БД и отправляем в Telegram пользователю."""
@@ -109,7 +106,7 @@ async def support_reply(
         return RedirectResponse(url="/login", status_code=302)
 
     ticket = (
-        db.execute(
+        await db.execute(
             select(SupportTicket).options(selectinload(SupportTicket.user)).where(SupportTicket.id == ticket_id)
         )
     ).scalar_one_or_none()
@@ -120,22 +117,12 @@ async def support_reply(
     if not text:
         return RedirectResponse(url=f"/support/{ticket_id}", status_code=302)
 
-    msg = SupportMessage(ticket_id=ticket_id, author="admin", text=text)
-    db.add(msg)
+    await SupportService.add_message(db, ticket, "admin", text)
     ticket.status = TicketStatus.IN_PROGRESS.value
-    db.commit()
-
-    # Отправка в Telegram через Bot API
-    tg_id = ticket.user.tg_id
-    url = f"https://api.telegram.org/bot{settings.BOT_TOKEN}/sendMessage"
-    payload = {"chat_id": tg_id, "text": text, "parse_mode": "HTML"}
-    try:
-        async with httpx.AsyncClient() as client:
-            r = await client.post(url, json=payload, timeout=10.0)
-            if r.status_code != 200:
-                pass  # логировать при необходимости
-    except Exception:
-        pass
+    await db.commit()
+
+    # Отправка в Telegram через Bot API (в фоне)
+    enqueue_telegram_message(ticket.user.tg_id, text)
 
     return RedirectResponse(url=f"/support/{ticket_id}", status_code=302)
 
@@ -144,15 +131,15 @@ async def support_reply(
 async def support_close(
     request: Request,
     ticket_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Закрыть тикет."""
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
-    ticket = db.execute(select(SupportTicket).where(SupportTicket.id == ticket_id)).scalar_one_or_none()
+    ticket = (await db.execute(select(SupportTicket).where(SupportTicket.id == ticket_id))).scalar_one_or_none()
     if ticket:
         ticket.status = TicketStatus.CLOSED.value
-        db.commit()
+        await db.commit()
     return RedirectResponse(url="/support", status_code=302)
 
 
@@ -160,15 +147,15 @@ async def support_close(
 async def support_ticket_delete(
     request: Request,
     ticket_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Удалить тикет и все сообщения (освободить место, не копить архив)."""
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
-    ticket = db.execute(select(SupportTicket).where(SupportTicket.id == ticket_id)).scalar_one_or_none()
+    ticket = (await db.execute(select(SupportTicket).where(SupportTicket.id == ticket_id))).scalar_one_or_none()
     if ticket:
-        db.delete(ticket)
-        db.commit()
+        await db.delete(ticket)
+        await db.commit()
     return RedirectResponse(url="/support", status_code=302)
 
 
@@ -189,10 +176,18 @@ async def support_templates_api(request: Request):
 
 
 @router.get("/api/new_count", response_class=JSONResponse)
-async def support_new_count(request: Request, db: Session = Depends(get_db)):
-    """Количество тикетов со статусом «новый» — для уведомлений админа (polling + звук)."""
+async def support_new_count(request: Request, db: AsyncSession = Depends(get_db)):
+    """Количество тикетов со статусом «новый» — для уведомлений админа (запрашивается по событию из /api/events)."""
     if get_session_user(request) is None:
         return JSONResponse({"count": 0})
-    r = db.execute(select(func.count(SupportTicket.id)).where(SupportTicket.status == TicketStatus.NEW.value))
+    r = await db.execute(select(func.count(SupportTicket.id)).where(SupportTicket.status == TicketStatus.NEW.value))
     n = r.scalar() or 0
     return JSONResponse({"count": n})
+
+
+@router.get("/api/events")
+async def support_events(request: Request):
+    """SSE: новые тикеты и сообщения поддержки (вместо периодического опроса new_count)."""
+    if get_session_user(request) is None:
+        return JSONResponse({"detail": "Not authenticated"}, status_code=401)
+    return get_event_hub().response([ADMIN_TOPIC])
@@ -7,14 +7,18 @@ from fastapi import APIRouter, Request, Depends, Query, Form, HTTPException
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from web.database import get_db
 from web.auth import get_session_user
 from web.templates_loader import templates
-from database.models import Tender, User, TenderStatus, TenderApplication
+from web.utils.pagination import paginate
+from database.models import Tender, User, TenderStatus, TenderApplication, Review
 from config import settings
 from utils.validators import validate_string_length, validate_date_range
+from services.review_service import ReviewService
+from services.deadline_scheduler import DeadlineService
 
 logger = logging.getLogger(__name__)
 
@@ -24,20 +28,26 @@ router = APIRouter()
 @router.get("", response_class=HTMLResponse)
 async def tenders_list(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     status: str | None = Query(None),
+    after: int | None = Query(None),
+    before: int | None = Query(None),
 ):
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
-    q = select(Tender).options(selectinload(Tender.creator)).order_by(Tender.id.desc())
+    q = select(Tender).options(selectinload(Tender.creator))
     if status:
         q = q.where(Tender.status == status)
-    tenders = db.execute(q).scalars().all()
+    page = await paginate(
+        request, db, q, Tender.id, after=after, before=before,
+        count_key=f"count:tenders:{status or ''}",
+    )
     return templates.TemplateResponse(
         "tenders.html",
         {
             "request": request,
-            "tenders": tenders,
+            "tenders": page.items,
+            "page": page,
             "statuses": [s.value for s in TenderStatus],
         },
     )
@@ -46,7 +56,7 @@ async def tenders_list(
 @router.get("/create", response_class=HTMLResponse)
 async def tender_create_form(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
@@ -64,7 +74,7 @@ async def tender_create_form(
 @router.post("/create", response_class=HTMLResponse)
 async def tender_create(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     title: Annotated[str, Form()] = None,
     category: Annotated[str, Form()] = None,
     city: Annotated[str, Form()] = None,
@@ -174,12 +184,15 @@ async def tender_create(
             created_by_tg_id=settings.ADMIN_ID,
         )
         db.add(tender)
-        db.commit()
-        db.refresh(tender)
+        await db.flush()
+        if deadline_dt is not None:
+            await DeadlineService.publish(db, tender.id)
+        await db.commit()
+        await db.refresh(tender)
         logger.info(f"Tender {tender.id} created via web interface")
         return RedirectResponse(url=f"/tenders/{tender.id}", status_code=302)
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Database error creating tender: {e}")
         return templates.TemplateResponse(
             "tender_form.html",
@@ -197,11 +210,11 @@ async def tender_create(
 async def tender_edit_form(
     request: Request,
     tender_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
-    tender = db.execute(select(Tender).where(Tender.id == tender_id)).scalar_one_or_none()
+    tender = (await db.execute(select(Tender).where(Tender.id == tender_id))).scalar_one_or_none()
     if not tender:
         return RedirectResponse(url="/tenders", status_code=302)
     return templates.TemplateResponse(
@@ -219,7 +232,7 @@ async def tender_edit_form(
 async def tender_update(
     request: Request,
     tender_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     title: Annotated[str, Form()] = None,
     category: Annotated[str, Form()] = None,
     city: Annotated[str, Form()] = None,
@@ -231,7 +244,7 @@ async def tender_update(
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
     
-    tender = db.execute(select(Tender).where(Tender.id == tender_id)).scalar_one_or_none()
+    tender = (await db.execute(select(Tender).where(Tender.id == tender_id))).scalar_one_or_none()
     if not tender:
         logger.warning(f"Attempt to edit non-existent tender {tender_id}")
         return RedirectResponse(url="/tenders", status_code=302)
@@ -293,6 +306,7 @@ async def tender_update(
                 },
             )
     
+    previous_deadline = tender.deadline
     try:
         tender.title = title
         tender.category = category
@@ -334,11 +348,14 @@ async def tender_update(
         if status:
             tender.status = status
         
-        db.commit()
+        # Планировщик сроков перечитает тендер (новый срок или статус)
+        await DeadlineService.deadline_updated(db, tender, previous_deadline)
+        await db.commit()
         logger.info(f"Tender {tender_id} updated via web interface")
         return RedirectResponse(url=f"/tenders/{tender.id}", status_code=302)
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
+        await db.refresh(tender)
         logger.error(f"Database error updating tender {tender_id}: {e}")
         return templates.TemplateResponse(
             "tender_form.html",
@@ -356,19 +373,20 @@ async def tender_update(
 async def tender_change_status(
     request: Request,
     tender_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     new_status: Annotated[str, Form()] = None,
 ):
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
     
-    tender = db.execute(select(Tender).where(Tender.id == tender_id)).scalar_one_or_none()
+    tender = (await db.execute(select(Tender).where(Tender.id == tender_id))).scalar_one_or_none()
     if not tender:
         return RedirectResponse(url="/tenders", status_code=302)
     
     if new_status in [s.value for s in TenderStatus]:
         tender.status = new_status
-        db.commit()
+        await DeadlineService.publish(db, tender.id)
+        await db.commit()
     
     return RedirectResponse(url=f"/tenders/{tender_id}", status_code=302)
 
@@ -377,19 +395,20 @@ async def tender_change_status(
 async def tender_delete(
     request: Request,
     tender_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Удалить тендер (каскадно удалятся отклики)."""
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
-    tender = db.execute(select(Tender).where(Tender.id == tender_id)).scalar_one_or_none()
+    tender = (await db.execute(select(Tender).where(Tender.id == tender_id))).scalar_one_or_none()
     if tender:
         try:
-            db.delete(tender)
-            db.commit()
+            await ReviewService.delete_reviews_where(db, Review.tender_id == tender_id)
+            await db.delete(tender)
+            await db.commit()
             logger.info(f"Tender {tender_id} deleted via web interface")
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error deleting tender {tender_id}: {e}")
     else:
         logger.warning(f"Attempt to delete non-existent tender {tender_id}")
@@ -400,15 +419,15 @@ async def tender_delete(
 async def tender_detail(
     request: Request,
     tender_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
-    tender = db.execute(
+    tender = (await db.execute(
         select(Tender)
         .options(selectinload(Tender.creator), selectinload(Tender.applications).selectinload(TenderApplication.user))
         .where(Tender.id == tender_id)
-    ).scalar_one_or_none()
+    )).scalar_one_or_none()
     if not tender:
         return RedirectResponse(url="/tenders", status_code=302)
     return templates.TemplateResponse(
@@ -1,21 +1,28 @@
 # web/routes/users.py
 import logging
-import urllib.request
-import json
+from urllib.parse import quote
 
 from fastapi import APIRouter, Request, Depends, Query, Form
 from fastapi.responses import HTMLResponse, RedirectResponse, Response
 from typing import Annotated
-from sqlalchemy import select, func
+from sqlalchemy import select, or_
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from config import settings
 from web.database import get_db
 from web.auth import get_session_user
+from web.document_cache import (
+    DocumentCache, DocumentUnavailable, fetch_file_path, file_response, get_document_cache,
+)
 from web.templates_loader import templates
+from web.utils.pagination import paginate
 from database.models import User, Review, UserStatus, UserRole
 from utils.validators import validate_string_length
+from services.cache_bus import CacheBus
+from services.review_service import ReviewService
+from services.telegram_files import TelegramFileService
+from services.user_service import UserService
 
 logger = logging.getLogger(__name__)
 
@@ -50,26 +57,28 @@ def normalize_documents(documents) -> list:
 @router.get("", response_class=HTMLResponse)
 async def users_list(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     role: str | None = Query(None),
     status: str | None = Query(None),
+    after: int | None = Query(None),
+    before: int | None = Query(None),
 ):
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
-    q = select(User).order_by(User.id.desc())
+    q = select(User)
     if role:
         q = q.where(User.role == role)
     if status:
         q = q.where(User.status == status)
-    users = db.execute(q).scalars().all()
-    result = db.execute(
-        select(Review.to_user_id, func.avg(Review.rating), func.count(Review.id))
-        .group_by(Review.to_user_id)
+    page = await paginate(
+        request, db, q, User.id, after=after, before=before,
+        count_key=f"count:users:{role or ''}:{status or ''}",
     )
-    ratings = {row[0]: (float(row[1]) if row[1] else 0, row[2]) for row in result.all()}
+    users = page.items
+    ratings = {u.id: (u.rating_avg, u.rating_count) for u in users if u.rating_count}
     return templates.TemplateResponse(
         "users.html",
-        {"request": request, "users": users, "ratings": ratings},
+        {"request": request, "users": users, "ratings": ratings, "page": page},
     )
 
 
@@ -78,12 +87,12 @@ async def user_document_by_tg(
     request: Request,
     tg_id: int,
     index: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Прокси документа/фото по Telegram ID пользователя и индексу в списке. URL: /users/by-tg/947126451/document?index=0"""
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
-    user = db.execute(select(User).where(User.tg_id == tg_id)).scalar_one_or_none()
+    user = (await db.execute(select(User).where(User.tg_id == tg_id))).scalar_one_or_none()
     if not user:
         return Response(status_code=404)
     docs_list = normalize_documents(user.documents)
@@ -93,46 +102,41 @@ async def user_document_by_tg(
     file_id = item.get("file_id")
     if not file_id:
         return Response(status_code=404)
-    url = f"https://api.telegram.org/bot{settings.BOT_TOKEN}/getFile?file_id={file_id}"
     try:
-        with urllib.request.urlopen(url) as r:
-            data = json.loads(r.read().decode())
-        if not data.get("ok"):
-            return Response(status_code=502)
-        file_path = data["result"]["file_path"]
-        file_url = f"https://api.telegram.org/file/bot{settings.BOT_TOKEN}/{file_path}"
-        with urllib.request.urlopen(file_url) as f:
-            content = f.read()
-        doc_type = item.get("type") or "document"
-        file_name = item.get("file_name")
-        mime = item.get("mime_type") or ""
-        if doc_type == "photo":
-            media_type = "image/jpeg"
-            filename = "photo.jpg"
-        else:
-            filename = file_name or "document"
-            if mime.startswith("application/pdf") or (filename and filename.lower().endswith(".pdf")):
-                media_type = "application/pdf"
-            else:
-                media_type = mime or "application/octet-stream"
-        return Response(
-            content=content,
-            media_type=media_type,
-            headers={"Content-Disposition": f'inline; filename="{filename}"'},
-        )
-    except Exception:
+        path = await get_document_cache().get(file_id)
+    except DocumentUnavailable as e:
+        logger.warning(f"Document {index} of user {tg_id} unavailable: {e}")
         return Response(status_code=502)
+    doc_type = item.get("type") or "document"
+    file_name = item.get("file_name")
+    mime = item.get("mime_type") or ""
+    if doc_type == "photo":
+        media_type = "image/jpeg"
+        filename = "photo.jpg"
+    else:
+        filename = file_name or "document"
+        if mime.startswith("application/pdf") or (filename and filename.lower().endswith(".pdf")):
+            media_type = "application/pdf"
+        else:
+            media_type = mime or "application/octet-stream"
+    return file_response(
+        request,
+        path,
+        DocumentCache.etag(file_id),
+        media_type,
+        f"inline; filename*=UTF-8''{quote(filename)}",
+    )
 
 
 @router.get("/{user_id}/edit", response_class=HTMLResponse)
 async def user_edit_form(
     request: Request,
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
-    user = db.execute(select(User).where(User.id == user_id)).scalar_one_or_none()
+    user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
     if not user:
         return RedirectResponse(url="/users", status_code=302)
     return templates.TemplateResponse(
@@ -151,7 +155,7 @@ async def user_edit_form(
 async def user_update(
     request: Request,
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     full_name: Annotated[str, Form()] = None,
     city: Annotated[str, Form()] = None,
     phone: Annotated[str, Form()] = None,
@@ -161,7 +165,7 @@ async def user_update(
 ):
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
-    user = db.execute(select(User).where(User.id == user_id)).scalar_one_or_none()
+    user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
     if not user:
         return RedirectResponse(url="/users", status_code=302)
     
@@ -186,12 +190,13 @@ async def user_update(
         if status and status in [s.value for s in UserStatus]:
             user.status = status
         if skills is not None:
-            user.skills = [s for s in skills if s] or None
-        db.commit()
+            await UserService.set_user_skills(db, user, skills)
+        await CacheBus.publish(db, UserService.cache_key(user.tg_id))
+        await db.commit()
         logger.info(f"User {user_id} updated via web interface")
         return RedirectResponse(url=f"/users/{user_id}", status_code=302)
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Database error updating user {user_id}: {e}")
         return RedirectResponse(url=f"/users/{user_id}?error=Ошибка сохранения изменений", status_code=302)
 
@@ -200,19 +205,23 @@ async def user_update(
 async def user_delete(
     request: Request,
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Удалить пользователя (каскадно удалятся отклики, тикеты поддержки, отзывы с его участием)."""
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
-    user = db.execute(select(User).where(User.id == user_id)).scalar_one_or_none()
+    user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
     if user:
         try:
-            db.delete(user)
-            db.commit()
+            await ReviewService.delete_reviews_where(
+                db, or_(Review.from_user_id == user_id, Review.to_user_id == user_id)
+            )
+            await db.delete(user)
+            await CacheBus.publish(db, UserService.cache_key(user.tg_id))
+            await db.commit()
             logger.info(f"User {user_id} deleted via web interface")
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error deleting user {user_id}: {e}")
     else:
         logger.warning(f"Attempt to delete non-existent user {user_id}")
@@ -223,15 +232,16 @@ async def user_delete(
 async def user_documents_delete(
     request: Request,
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Удалить приложенные документы пользователя (очистить ссылки, чтобы не копились на сервере)."""
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
-    user = db.execute(select(User).where(User.id == user_id)).scalar_one_or_none()
+    user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
     if user:
         user.documents = None
-        db.commit()
+        await CacheBus.publish(db, UserService.cache_key(user.tg_id))
+        await db.commit()
     return RedirectResponse(url=f"/users/{user_id}", status_code=302)
 
 
@@ -239,14 +249,16 @@ async def user_documents_delete(
 async def user_detail(
     request: Request,
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     if get_session_user(request) is None:
         return RedirectResponse(url="/login", status_code=302)
-    user = db.execute(select(User).where(User.id == user_id)).scalar_one_or_none()
+    user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
     if not user:
         return RedirectResponse(url="/users", status_code=302)
     documents_list = normalize_documents(user.documents)
+    # Админ, скорее всего, откроет документы — разрешаем file_path заранее, пока рендерится страница
+    TelegramFileService.prefetch((d.get("file_id") for d in documents_list), fetch_file_path)
     return templates.TemplateResponse(
         "user_detail.html",
         {"request": request, "user": user, "documents_list": documents_list},
@@ -17,14 +17,20 @@
     return TG.initData || "";
   }
 
+  // Токен сессии от сервера: пока он действителен, initData повторно не проверяется
+  let sessionToken = "";
+
   function api(path, options = {}) {
     const url = (path.startsWith("http") ? path : API_BASE + path);
     const headers = {
       "Content-Type": "application/json",
       "X-Telegram-Init-Data": getInitData(),
+      ...(sessionToken ? { "X-Miniapp-Session": sessionToken } : {}),
       ...options.headers,
     };
     return fetch(url, { ...options, headers }).then(async (r) => {
+      const token = r.headers.get("X-Miniapp-Session");
+      if (token) sessionToken = token;
       const data = await r.json().catch(() => ({}));
       if (!r.ok) throw new Error(data.detail || data.message || r.statusText || "Ошибка");
       return data;
@@ -374,6 +380,17 @@
     });
   });
 
+  // Всё для стартового экрана одним запросом (пользователь, навыки, заказы, отклики)
+  function loadBootstrap() {
+    return api("/api/bootstrap").then((data) => {
+      state.user = data.me;
+      state.skills = data.skills || [];
+      state.tenders = data.tenders || [];
+      state.applications = data.applications || [];
+      return data;
+    });
+  }
+
   function loadMe() {
     return api("/api/me").then((data) => {
       state.user = data;
@@ -441,23 +458,50 @@
   }
 
   showLoader();
-  loadMe()
+  loadBootstrap()
     .then(() => {
       showApp();
       state.stack = [];
       setTabbarActive(state.screen);
-      return loadScreenData();
+      render();
+      connectEvents();
     })
-    .then(() => render())
     .catch((err) => {
       showError(err.message || "Не удалось загрузить данные. Пройдите регистрацию в боте.");
     });
 
+  // Живые обновления: смена статуса отклика приходит событием, экран перечитывается (ответ 304, если не изменилось)
+  let events = null;
+
+  function connectEvents() {
+    if (!window.EventSource || !sessionToken) return;
+    if (events) events.close();
+    events = new EventSource(API_BASE + "/api/events?token=" + encodeURIComponent(sessionToken));
+    events.addEventListener("application", (e) => {
+      const data = JSON.parse(e.data);
+      const s = state.screen;
+      let reload = null;
+      if (s === "applications" || s === "tenders") reload = loadScreenData();
+      else if (s === "application" && state.currentApplicationId === data.id) reload = loadApplicationDetail();
+      else if (s === "tender" && state.currentTenderId === data.tender_id) reload = loadTenderDetail();
+      if (reload) reload.then(() => render()).catch(() => {});
+    });
+    events.onerror = () => {
+      // Токен истёк (401) — EventSource не переподключается сам: обновляем токен и подключаемся снова
+      if (events.readyState === EventSource.CLOSED) {
+        setTimeout(() => loadMe().then(connectEvents).catch(() => {}), 5000);
+      }
+    };
+  }
+
   document.addEventListener("visibilitychange", () => {
     if (document.visibilityState === "visible" && state.user && app.classList.contains("hidden") === false) {
-      loadMe().then(() => {
-        loadScreenData().then(() => render());
-      });
+      const s = state.screen;
+      // Списки и профиль обновляются одним запросом; остальные экраны — как при переходе
+      const reload = (s === "home" || s === "tenders" || s === "applications" || s === "profile")
+        ? loadBootstrap()
+        : loadMe().then(() => loadScreenData());
+      reload.then(() => render());
     }
   });
 })();
@@ -0,0 +1,46 @@
+# web/utils/http_cache.py — условные GET: ETag, If-None-Match → 304, Cache-Control
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+# Ответ зависит от пользователя и может измениться в любой момент: браузер хранит его у себя,
+# но перед использованием переспрашивает сервер (с If-None-Match) — при совпадении получает 304
+PRIVATE_REVALIDATE = "private, no-cache"
+
+
+def weak_etag(*parts: Any) -> str:
+    """Слабый ETag по «версии» данных (счётчики, max(updated_at) и т.п.), а не по телу ответа."""
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match содержит etag (слабое сравнение, как требует RFC 9110) или «*»."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def not_modified(
+    request: Request,
+    response: Response,
+    etag: str,
+    cache_control: str = PRIVATE_REVALIDATE,
+) -> Optional[Response]:
+    """
+    Проставляет ETag и Cache-Control в ответ роута; если у клиента та же версия — возвращает 304,
+    который роут отдаёт вместо тела.
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    if etag_matches(request, etag):
+        headers = {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+        return Response(status_code=304, headers=headers)
+    return None
@@ -0,0 +1,116 @@
+# web/utils/pagination.py — постраничный вывод списков веб-панели (keyset по id DESC)
+from typing import Any, Optional
+from urllib.parse import urlencode
+
+from fastapi import Request
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from config import settings
+from database.session import get_async_session_maker
+from utils.cache import cached
+
+
+class Page:
+    """Страница списка и ссылки на соседние страницы (фильтры из query string сохраняются)."""
+
+    def __init__(
+        self,
+        request: Request,
+        items: list,
+        next_after: Optional[int],
+        prev_before: Optional[int],
+        total: int,
+    ):
+        self.items = items
+        self.total = total
+        self._request = request
+        self._next_after = next_after
+        self._prev_before = prev_before
+
+    def _url(self, **cursor: int) -> str:
+        params = [
+            (k, v) for k, v in self._request.query_params.multi_items()
+            if k not in ("after", "before")
+        ]
+        params.extend(cursor.items())
+        query = urlencode(params)
+        return f"{self._request.url.path}?{query}" if query else self._request.url.path
+
+    @property
+    def next_url(self) -> Optional[str]:
+        return self._url(after=self._next_after) if self._next_after is not None else None
+
+    @property
+    def prev_url(self) -> Optional[str]:
+        return self._url(before=self._prev_before) if self._prev_before is not None else None
+
+    @property
+    def first_url(self) -> str:
+        return self._url()
+
+
+async def _count(stmt: Select, cache_key: str) -> int:
+    """Число строк под фильтром — из кэша (оценка на PAGINATION_COUNT_TTL секунд, не точное значение)."""
+    async def load() -> int:
+        # Своя короткая сессия: загрузку ждут несколько запросов, сессию первого могут закрыть при его отмене
+        count_stmt = select(func.count()).select_from(stmt.order_by(None).subquery())
+        async with get_async_session_maker()() as session:
+            return (await session.execute(count_stmt)).scalar() or 0
+
+    return await cached(cache_key, settings.PAGINATION_COUNT_TTL, load)
+
+
+async def paginate(
+    request: Request,
+    db: AsyncSession,
+    stmt: Select,
+    id_column: Any,
+    *,
+    after: Optional[int] = None,
+    before: Optional[int] = None,
+    per_page: Optional[int] = None,
+    count_key: str,
+) -> Page:
+    """
+    Страница результатов stmt по убыванию id.
+
+    Курсор — id последней (after) или первой (before) строки соседней страницы, поэтому
+    страница читается по индексу первичного ключа без OFFSET и не «съезжает» при добавлении записей.
+
+    Args:
+        request: Запрос (для ссылок на соседние страницы)
+        db: Сессия БД
+        stmt: SELECT с фильтрами, без ORDER BY и LIMIT
+        id_column: Колонка id сущности (например, Tender.id)
+        after: Показать записи с id < after (следующая страница)
+        before: Показать записи с id > before (предыдущая страница)
+        per_page: Размер страницы (по умолчанию — PAGE_SIZE)
+        count_key: Ключ кэша количества (должен включать значения фильтров)
+
+    Returns:
+        Page
+    """
+    per_page = per_page or settings.PAGE_SIZE
+    total = await _count(stmt, count_key)
+
+    if before is not None:
+        rows = (await db.execute(
+            stmt.where(id_column > before).order_by(id_column.asc()).limit(per_page + 1)
+        )).scalars().all()
+        has_prev = len(rows) > per_page
+        items = list(reversed(rows[:per_page]))
+        has_next = True
+    else:
+        q = stmt.order_by(id_column.desc()).limit(per_page + 1)
+        if after is not None:
+            q = q.where(id_column < after)
+        rows = (await db.execute(q)).scalars().all()
+        has_next = len(rows) > per_page
+        items = list(rows[:per_page])
+        has_prev = after is not None
+
+    next_after = items[-1].id if items and has_next else None
+    prev_before = items[0].id if items and has_prev else None
+    return Page(request, items, next_after, prev_before, total)
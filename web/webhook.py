@@ -0,0 +1,115 @@
+# web/webhook.py — приём обновлений Telegram (режим BOT_MODE=webhook)
+import asyncio
+import hmac
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Request, Response
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+class WebhookReceiver:
+    """Проверяет секрет, сразу отвечает Telegram 200 и обрабатывает обновления в фоне с ограничением параллелизма."""
+
+    def __init__(self, bot: Bot, dp: Dispatcher, secret: str, max_concurrency: int):
+        self.bot = bot
+        self.dp = dp
+        self._secret = secret
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks: set[asyncio.Task] = set()
+
+    def check_secret(self, header_value: Optional[str]) -> bool:
+        return header_value is not None and hmac.compare_digest(header_value, self._secret)
+
+    async def accept(self, update: Update) -> None:
+        # Если все слоты заняты — ждём здесь: Telegram не получит ответ и не пришлёт новые обновления сверх лимита
+        await self._semaphore.acquire()
+        task = asyncio.create_task(self._process(update))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _process(self, update: Update) -> None:
+        try:
+            await self.dp.feed_update(self.bot, update)
+        except Exception as e:
+            logger.error(f"Failed to process update {update.update_id}: {e}", exc_info=True)
+        finally:
+            self._semaphore.release()
+
+    async def drain(self, timeout: float = 10.0) -> None:
+        """Дождаться обработки принятых обновлений перед остановкой."""
+        if not self._tasks:
+            return
+        _done, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+
+
+_receiver: Optional[WebhookReceiver] = None
+
+
+@router.post(settings.WEBHOOK_PATH, include_in_schema=False)
+async def telegram_webhook(request: Request) -> Response:
+    if _receiver is None:
+        return Response(status_code=503)
+    if not _receiver.check_secret(request.headers.get("X-Telegram-Bot-Api-Secret-Token")):
+        return Response(status_code=403)
+    try:
+        update = Update.model_validate(await request.json(), context={"bot": _receiver.bot})
+    except Exception as e:
+        logger.warning(f"Invalid webhook payload: {e}")
+        return Response(status_code=400)
+    await _receiver.accept(update)
+    return Response(status_code=200)
+
+
+class BotWebhookRuntime:
+    """Бот в режиме webhook внутри ASGI-приложения: запуск в lifespan, регистрация webhook, остановка."""
+
+    def __init__(self):
+        self._services = None
+
+    async def start(self) -> None:
+        global _receiver
+        from bot_setup import (
+            BotServices, check_token, create_bot, create_dispatcher,
+            get_webhook_secret, get_webhook_url,
+        )
+        from database.session import init_db
+
+        check_token()
+        await init_db()
+        bot = create_bot()
+        dp = create_dispatcher()
+        self._services = BotServices(bot)
+        self._services.start()
+        await dp.emit_startup(bot=bot)
+        secret = get_webhook_secret()
+        _receiver = WebhookReceiver(bot, dp, secret, settings.WEBHOOK_MAX_CONCURRENCY)
+        await bot.set_webhook(
+            url=get_webhook_url(),
+            secret_token=secret,
+            allowed_updates=dp.resolve_used_update_types(),
+            max_connections=min(settings.WEBHOOK_MAX_CONCURRENCY, 100),
+        )
+        logger.info(f"Bot webhook set to {get_webhook_url()}")
+
+    async def stop(self) -> None:
+        # Webhook у Telegram не удаляем: при перезапуске обновления подождут в очереди Telegram
+        global _receiver
+        receiver = _receiver
+        _receiver = None
+        if receiver is not None:
+            await receiver.drain()
+        if self._services is not None:
+            await self._services.stop()
+        if receiver is not None:
+            await receiver.dp.emit_shutdown(bot=receiver.bot)
+            await receiver.bot.session.close()